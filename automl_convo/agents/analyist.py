@@ -3,11 +3,24 @@ This file implements the user facing analyst agent.
 """
 
 from utils.logger import Logger
+from utils.metrics import Metrics
+from utils.response_schemas import ANALYSIS_SCHEMA, extract_json
 from states.auto_ml_state import AutoMLState
 from llm import LLM
+import time
+
+PLANNING_MARKERS = [
+    "Let's craft answer",
+    "Let's craft the answer",
+    "We need to synthesize",
+    "We need to",
+    "Let's outline",
+]
+
 
 def analysis_node(state: AutoMLState, llm: LLM, question: str) -> AutoMLState:
     logger = Logger()
+    metrics = Metrics()
 
     logger.info("[ANALYSIS NODE] Asking LLM for final user-facing analysis...", style="cyan")
 
@@ -19,6 +32,7 @@ def analysis_node(state: AutoMLState, llm: LLM, question: str) -> AutoMLState:
             for mname, res in h["model_results"].items()
         )
         transforms_str = ", ".join(t["name"] for t in h["transforms_applied"]) or "none"
+        pruned_str = ", ".join(f"{d['feature']} ({d['reason']})" for d in h.get("pruned_features") or []) or "none"
 
         feat_metrics = h.get("feature_metrics")
         if feat_metrics and feat_metrics.get("feature_importances"):
@@ -37,6 +51,7 @@ def analysis_node(state: AutoMLState, llm: LLM, question: str) -> AutoMLState:
             f"  - transforms_applied: {transforms_str}\n"
             f"  - model_results: {models_str}\n"
             f"  - top_feature_importances: {feat_str}\n"
+            f"  - pruned_after_iteration: {pruned_str}\n"
         )
 
     history_str = "\n".join(hist_lines)
@@ -48,7 +63,7 @@ You are given:
 - A user question about a general tabular dataset.
 - The chosen target column and task type.
 - A history of several AutoML iterations where:
-  - Each iteration has: dataset path, list of features used, transformations applied, model results (mean scores), and optional feature-level importance metrics for the best model.
+  - Each iteration has: dataset path, list of features used, transformations applied, model results (mean scores), optional feature-level importance metrics for the best model, and the features pruned afterwards (low importance or near-duplicates).
 
 Your job:
 1. Synthesize what the models learned that is relevant to the user's question.
@@ -59,7 +74,8 @@ Your job:
 6. You must not claim feature importances for models that did not have feature-importance metrics provided. If feature importances are only given for one model, clearly say so and attribute them only to that model.
 
 Output:
-- A clear, concise Markdown answer for the user.
+- Respond ONLY with JSON of the form {"answer": "<final answer in Markdown>"}.
+- The answer must be a clear, concise Markdown answer for the user.
 - Do not describe your own reasoning process or say things like "let's craft the answer".
 """
 
@@ -74,44 +90,29 @@ Iteration history:
 {history_str}
 """
 
-    raw = llm.invoke(system_prompt, human_prompt)
+    # The answer comes back in a schema-constrained "answer" field, so any planning
+    # stays in the backend's reasoning channel and no rewrite pass is needed
+    started = time.perf_counter()
+    raw = llm.invoke(system_prompt, human_prompt, response_schema=ANALYSIS_SCHEMA)
+    obj = extract_json(raw)
+    if isinstance(obj, dict) and isinstance(obj.get("answer"), str) and obj["answer"].strip():
+        content = obj["answer"]
+    else:
+        metrics.incr("analysis.unstructured_answers")
+        content = raw
+
+    metrics.incr("analysis.calls")
+    metrics.observe("analysis.latency_s", time.perf_counter() - started)
 
-    planning_markers = [
-        "Let's craft answer",
-        "Let's craft the answer",
-        "We need to synthesize",
-        "We need to",
-        "Let's outline",
-    ]
-    if any(marker in raw for marker in planning_markers):
+    # Track how often the removed rewrite pass would still have fired
+    if any(marker in content for marker in PLANNING_MARKERS):
+        metrics.incr("analysis.planning_detected")
         logger.info(
-            "[ANALYSIS NODE] Detected planning-style output; running second pass to get final Markdown answer...",
+            "[ANALYSIS NODE] Planning-style text detected in final answer "
+            f"(rate so far: {metrics.rate('analysis.planning_detected', 'analysis.calls'):.1%}).",
             style="yellow",
         )
 
-        system_prompt_2 = """
-You are an experienced data scientist.
-
-You are given some internal notes about how to answer a question.
-Your task now is:
-
-- Use those notes as background.
-- Produce only the final, polished answer in Markdown.
-- Do NOT mention the notes, your reasoning steps, or that you are crafting an answer.
-- Just write the final answer as if you were talking directly to the user.
-"""
-
-        human_prompt_2 = f"""
-Internal notes:
-{raw}
-
-Now write the final Markdown answer to the original question.
-"""
-
-        content = llm.invoke(system_prompt_2, human_prompt_2)
-    else:
-        content = raw
-
     state.final_answer = content
     logger.box_md("RESPONSE TO USER", state.final_answer, style="green")
     return state
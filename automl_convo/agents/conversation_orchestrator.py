@@ -2,28 +2,38 @@
 This file implements the conversation orchestrator agent.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.logger import Logger
-from utils.llm import summarize_automl_state_for_llm
+from utils.llm import summarize_automl_state_for_llm, summarize_run_store_for_llm
 from llm import LLM
 from states.conversation_state import ConversationState
-import json
-import re
+from utils.response_schemas import CONVERSATION_DECISION_SCHEMA
 
-def conversation_orchestrator(question: str, llm: LLM, conv_state: ConversationState) -> Dict[str, Any]:
+def conversation_orchestrator(
+    question: str,
+    llm: LLM,
+    conv_state: ConversationState,
+    dataset_fingerprint: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     LLM-based meta-orchestrator.
     Decides whether to:
-      - reuse previous AutoML results to answer the question, or
+      - reuse previous AutoML results to answer the question (choosing which stored run), or
       - run a new AutoML pipeline (possibly with a different target / task / PCA choice).
     """
 
     logger = Logger()
-    previous_runs_summary = (
-        summarize_automl_state_for_llm(conv_state.last_automl_state)
-        if conv_state.last_automl_state is not None
-        else "No previous AutoML results."
+    stored_runs = (
+        conv_state.run_store.find(dataset_fingerprint)
+        if dataset_fingerprint is not None
+        else []
     )
+    if stored_runs:
+        previous_runs_summary = summarize_run_store_for_llm(conv_state.run_store, stored_runs)
+    elif conv_state.last_automl_state is not None:
+        previous_runs_summary = summarize_automl_state_for_llm(conv_state.last_automl_state)
+    else:
+        previous_runs_summary = "No previous AutoML results."
 
     qa_history_str = "\n".join(
         f"Q: {qa['question']}\nA: {qa['answer']}\n"
@@ -35,7 +45,7 @@ You are a meta-orchestrator for a conversational AutoML assistant.
 
 You are given:
 - The user's new question.
-- A summary of previous AutoML runs (if any).
+- A summary of previous AutoML runs (if any), each with a run id, target and task type.
 - A brief Q&A history from this conversation.
 
 Your job:
@@ -49,13 +59,16 @@ Respond ONLY with JSON of the form:
 {
   "reuse": true or false,
   "reason": "short explanation",
-  "need_new_run": true or false
+  "need_new_run": true or false,
+  "run_id": "id of the previous run to reuse, or null"
 }
 
 Rules:
 - Set reuse=true when:
   - The question is essentially asking for clarification, re-explanation, or a slice
     of insight that is already supported by the previous results (same target, same task).
+  - The question returns to the target of ANY previous run listed, not only the latest one.
+    Set run_id to the id of the run whose target and task match the question.
 - Set need_new_run=true when:
   - The question requires a new target, a fundamentally different task (classification vs regression),
     or clearly different feature engineering that is NOT supported by prior results.
@@ -74,20 +87,22 @@ Recent Q&A history:
 {qa_history_str}
 """
     logger.info(f"[CONVERSATION ORCHESTRATOR] Determining whether to reuse previous results...", style="magenta")
-    resp = llm.invoke(system_prompt, human_prompt)
-
     try:
-        obj = json.loads(resp)
-    except Exception:
-        m = re.search(r"\{.*\}", resp, re.DOTALL)
-        if not m:
-            raise ValueError("Could not parse conversation orchestrator response as JSON.")
-        obj = json.loads(m.group(0))
+        obj = llm.invoke_json(system_prompt, human_prompt, CONVERSATION_DECISION_SCHEMA)
+    except ValueError as e:
+        # Fall back to the safe default: reuse if we have results, otherwise run
+        has_results = conv_state.last_automl_state is not None
+        obj = {
+            "reuse": has_results,
+            "reason": f"Fallback decision after unparseable LLM response: {e}",
+            "need_new_run": not has_results,
+        }
 
     logger.box(
         "CONVERSATION ORCHESTRATOR DECISION",
         f"reuse: {obj.get('reuse')}\n"
         f"need_new_run: {obj.get('need_new_run')}\n"
+        f"run_id: {obj.get('run_id')}\n"
         f"reason: {obj.get('reason')}",
         style="magenta",
     )
@@ -4,9 +4,10 @@ This file defines the feature critic agent.
 
 from utils.logger import Logger
 from states.auto_ml_state import AutoMLState
+from utils.schema import summarize_schema_for_llm
+from utils.llm import summarize_screening_for_llm
 from llm import LLM
-import re 
-import json 
+from utils.response_schemas import FEATURE_PLAN_SCHEMA
 
 
 def feature_critic_node(state: AutoMLState, llm: LLM) -> AutoMLState:
@@ -15,10 +16,7 @@ def feature_critic_node(state: AutoMLState, llm: LLM) -> AutoMLState:
     logger.info("[FEATURE CRITIC NODE] Critiquing features and model performance...", style='magenta')
 
     last = state.history[-1]
-    schema_str = "\n".join(
-        f"- {col}: type={meta['type']}, unique={meta['unique']}, missing={meta['missing']}"
-        for col, meta in state.schema.items()
-    )
+    schema_str = summarize_schema_for_llm(state)
 
     results_str = "\n".join(
         f"- {name}: mean={res['mean_score']:.4f}, std={res['std']:.4f}"
@@ -67,21 +65,19 @@ Last iteration:
 - Model results:
 {results_str}
 - Transforms applied: {transforms_str}
-
+- Proposals dropped by screening (no signal against the target): {summarize_screening_for_llm(state)}
+{"- All proposals of this iteration failed screening, so it was not retrained." if state.iteration_skipped else ""}
 You are at iteration {state.iteration} out of max {state.max_iterations}.
 If we are already at the maximum iteration, you MUST set apply=false.
 Otherwise, only propose additional feature engineering if it is likely to improve performance.
 """
 
-    content = llm.invoke(system_prompt, human_prompt)
-
     try:
-        obj = json.loads(content)
-    except Exception:
-        match = re.search(r"\{.*\}", content, re.DOTALL)
-        if not match:
-            raise ValueError("Could not parse feature critic response as JSON.")
-        obj = json.loads(match.group(0))
+        obj = llm.invoke_json(system_prompt, human_prompt, FEATURE_PLAN_SCHEMA)
+    except ValueError as e:
+        # A bad plan should not kill the run; skip feature engineering this round
+        logger.info(f"[FEATURE CRITIC NODE] {e}. Proceeding without new transformations.", style="yellow")
+        obj = {"apply": False, "rationale": "Unparseable LLM response.", "transformations": []}
 
     # If we've hit max iterations, force apply=false
     if state.iteration >= state.max_iterations:
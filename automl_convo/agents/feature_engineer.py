@@ -3,10 +3,11 @@ This file defines the feature engineer agent.
 """
 
 from states.auto_ml_state import AutoMLState
+from utils.schema import summarize_schema_for_llm
+from utils.llm import summarize_screening_for_llm
 from utils.logger import Logger
 from llm import LLM
-import json
-import re 
+from utils.response_schemas import FEATURE_PLAN_SCHEMA
 
 def feature_engineer_node(state: AutoMLState, llm: LLM) -> AutoMLState:
     logger = Logger()
@@ -14,10 +15,7 @@ def feature_engineer_node(state: AutoMLState, llm: LLM) -> AutoMLState:
     logger.info("[FEATURE ENGINEER NODE] Proposing new features...", style='blue')
 
     # Build compact schema summary
-    schema_str = "\n".join(
-        f"- {col}: type={meta['type']}, unique={meta['unique']}, missing={meta['missing']}"
-        for col, meta in state.schema.items()
-    )
+    schema_str = summarize_schema_for_llm(state)
 
     # Provide last iteration context to LLM
     last_result_summary = ""
@@ -37,6 +35,7 @@ Last iteration:
 - Best model: {best_model[0]} (mean_score={best_model[1]['mean_score']:.4f})
 - Used features (first 10): {last_feats}
 - Transforms applied: {last_transforms or 'none'}
+- Proposals dropped by screening (do not propose them again): {summarize_screening_for_llm(state)}
 """.strip()
 
     system_prompt = """
@@ -91,15 +90,12 @@ Dataset schema:
 Design generic transformations that could help this task, without assuming a specific domain.
 """
 
-    content = llm.invoke(system_prompt, human_prompt)
-
     try:
-        obj = json.loads(content)
-    except Exception:
-        match = re.search(r"\{.*\}", content, re.DOTALL)
-        if not match:
-            raise ValueError("Could not parse feature engineer response as JSON.")
-        obj = json.loads(match.group(0))
+        obj = llm.invoke_json(system_prompt, human_prompt, FEATURE_PLAN_SCHEMA)
+    except ValueError as e:
+        # A bad plan should not kill the run; skip feature engineering this round
+        logger.info(f"[FEATURE ENGINEER NODE] {e}. Proceeding without new transformations.", style="yellow")
+        obj = {"apply": False, "rationale": "Unparseable LLM response.", "transformations": []}
 
     state.feature_engineer_plan = obj
     return state
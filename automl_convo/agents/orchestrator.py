@@ -5,9 +5,9 @@ and the whether we want to use PCA.
 
 from utils.logger import Logger
 from states.auto_ml_state import AutoMLState
+from utils.schema import summarize_schema_for_llm
 from llm import LLM
-import json
-import re 
+from utils.response_schemas import ORCHESTRATOR_SCHEMA
 
 def orchestrator_node(state: AutoMLState, llm: LLM, question: str) -> AutoMLState:
     logger = Logger()
@@ -17,10 +17,7 @@ def orchestrator_node(state: AutoMLState, llm: LLM, question: str) -> AutoMLStat
         style="magenta",
     )
 
-    schema_str = "\n".join(
-        f"- {col}: type={meta['type']}, unique={meta['unique']}, missing={meta['missing']}"
-        for col, meta in state.schema.items()
-    )
+    schema_str = summarize_schema_for_llm(state, question=question)
 
     system_prompt = """
 You are a data scientist orchestrator for a general tabular dataset tool.
@@ -59,16 +56,7 @@ Dataset schema:
 """
 
     logger.info("[ORCHESTRATOR NODE] Sending prompt to LLM...", style="magenta")
-    resp_content = llm.invoke(system_prompt, human_prompt)
-
-    try:
-        obj = json.loads(resp_content)
-    except Exception:
-        # Try to extract JSON substring
-        match = re.search(r"\{.*\}", resp_content, re.DOTALL)
-        if not match:
-            raise ValueError("Could not parse LLM orchestrator response as JSON.")
-        obj = json.loads(match.group(0))
+    obj = llm.invoke_json(system_prompt, human_prompt, ORCHESTRATOR_SCHEMA)
 
     target_column = obj["target_column"]
     task_type = obj["task_type"]
@@ -0,0 +1,242 @@
+"""
+This file is the batch evaluation entrypoint of the conversational AutoML workflow.
+It reads a JSONL file of (dataset, question) records, answers them concurrently on a
+bounded thread pool, and writes one result record per question (answer, chosen
+target/task, model scores, node timings, LLM call counts) plus an aggregate
+throughput summary.
+
+Questions on the same dataset share a run store and answer cache and are answered
+in input order, each as a follow-up to the previous one, so results do not depend
+on which question finishes first; different datasets run concurrently. With
+--isolated every question is answered on its own, all concurrently.
+
+Input records:
+    {"csv_path": "data/titanic.csv", "question": "...", "id": "optional", "max_iterations": 3}
+
+Usage (from automl_convo/):
+    python batch.py questions.jsonl -o results.jsonl --workers 4
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from states.auto_ml_state import AutoMLState
+from states.run_store import RunStore
+from utils.drivers import ConversationalAutoMLRunner
+from utils.fingerprint import dataset_fingerprint
+from utils.metrics import Metrics, percentile
+from utils.qa_cache import QACache
+import threading
+import argparse
+import json
+import time
+import os
+
+ROUTES = ("qa_cache.hits", "conversation.reuse", "conversation.new_run", "conversation.cannot_answer")
+
+
+class SharedCaches:
+    """Run stores and answer caches shared by every question on the same dataset."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._by_dataset: Dict[str, Tuple[RunStore, QACache]] = {}
+        self._lock = threading.Lock()
+
+    def for_dataset(self, fingerprint: str) -> Tuple[Optional[RunStore], Optional[QACache]]:
+        if not self.enabled:
+            return None, None
+        with self._lock:
+            if fingerprint not in self._by_dataset:
+                self._by_dataset[fingerprint] = (RunStore(), QACache())
+            return self._by_dataset[fingerprint]
+
+
+def read_questions(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "csv_path" not in record or "question" not in record:
+                raise ValueError(f"{path}:{line_no}: each record needs 'csv_path' and 'question'.")
+            record.setdefault("id", str(line_no))
+            records.append(record)
+    return records
+
+
+def _route(counters: Dict[str, float]) -> Optional[str]:
+    for name in ROUTES:
+        if counters.get(name):
+            return "cached" if name == "qa_cache.hits" else name.split(".", 1)[1]
+    return None
+
+
+def _node_timings(observations: Dict[str, List[float]]) -> Dict[str, float]:
+    return {
+        name[len("node."):-len(".latency_s")]: round(sum(values), 4)
+        for name, values in observations.items()
+        if name.startswith("node.") and name.endswith(".latency_s")
+    }
+
+
+def _llm_calls(counters: Dict[str, float]) -> Dict[str, int]:
+    calls = {name[len("llm.calls."):]: int(n) for name, n in counters.items() if name.startswith("llm.calls.")}
+    calls["total"] = int(counters.get("llm.calls", 0))
+    return calls
+
+
+def evaluate_question(
+    record: Dict[str, Any],
+    caches: SharedCaches,
+    default_max_iterations: int,
+    temp_dir: str,
+    seed_state: Optional[AutoMLState] = None,
+) -> Tuple[Dict[str, Any], Optional[AutoMLState]]:
+    """
+    Answer one record on a fresh runner that starts from `seed_state` (the previous
+    question's run, as a follow-up in a conversation would). Returns the outcome and
+    the run the answer came from.
+    """
+    result: Dict[str, Any] = {"id": record["id"], "csv_path": record["csv_path"], "question": record["question"]}
+    state = seed_state
+
+    with Metrics().scoped() as scope:
+        started = time.perf_counter()
+        try:
+            fingerprint = dataset_fingerprint(record["csv_path"])
+            run_store, qa_cache = caches.for_dataset(fingerprint)
+            runner = ConversationalAutoMLRunner(
+                csv_path=record["csv_path"],
+                max_iterations=int(record.get("max_iterations", default_max_iterations)),
+                temp_dir=os.path.join(temp_dir, str(record["id"])),
+                qa_cache=qa_cache,
+                run_store=run_store,
+            )
+            runner.conv_state.last_automl_state = seed_state
+
+            answer = runner.ask(record["question"])
+            result.update(status="ok", answer=answer)
+
+            state = runner.conv_state.last_automl_state
+            if state is not None:
+                key = runner.conv_state.run_store.key_of(state)
+                result.update(
+                    run_id=key.run_id if key else None,
+                    target_column=state.target_column,
+                    task_type=state.task_type,
+                    use_pca=state.use_pca,
+                    iterations=state.iteration,
+                    scores={
+                        name: {"mean": res["mean_score"], "std": res["std"], "metric": res["metric"]}
+                        for name, res in (state.model_results or {}).items()
+                    },
+                )
+        except Exception as e:
+            result.update(status="error", error=f"{type(e).__name__}: {e}")
+        result["latency_s"] = round(time.perf_counter() - started, 4)
+
+    result.update(
+        route=_route(scope["counters"]),
+        node_timings_s=_node_timings(scope["observations"]),
+        llm_calls=_llm_calls(scope["counters"]),
+    )
+    return result, state
+
+
+def question_chains(records: List[Dict[str, Any]], isolated: bool) -> List[List[Dict[str, Any]]]:
+    """Records answered in sequence: one chain per dataset in input order, or one per record if isolated."""
+    if isolated:
+        return [[record] for record in records]
+    chains: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        try:
+            key = dataset_fingerprint(record["csv_path"])
+        except OSError:
+            # Reported as an error when the record is evaluated
+            key = record["csv_path"]
+        chains.setdefault(key, []).append(record)
+    return list(chains.values())
+
+
+def evaluate_chain(
+    chain: List[Dict[str, Any]],
+    caches: SharedCaches,
+    default_max_iterations: int,
+    temp_dir: str,
+    emit: Callable[[Dict[str, Any]], None],
+):
+    """Answer a chain's records in order, each seeded with the run of the one before."""
+    state = None
+    for record in chain:
+        result, state = evaluate_question(record, caches, default_max_iterations, temp_dir, seed_state=state)
+        emit(result)
+
+
+def summarize(results: List[Dict[str, Any]], elapsed_s: float, workers: int) -> Dict[str, Any]:
+    latencies = [r["latency_s"] for r in results if r["status"] == "ok"]
+    routes: Dict[str, int] = {}
+    for r in results:
+        routes[str(r.get("route"))] = routes.get(str(r.get("route")), 0) + 1
+
+    return {
+        "questions": len(results),
+        "ok": len(latencies),
+        "errors": len(results) - len(latencies),
+        "workers": workers,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_qps": round(len(results) / elapsed_s, 4) if elapsed_s > 0 else None,
+        "latency_s": {
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+        },
+        "routes": routes,
+        "llm_calls": sum(r["llm_calls"]["total"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of (dataset, question) records concurrently.")
+    parser.add_argument("questions", help="Input JSONL with csv_path and question per line.")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="Output JSONL, one record per question.")
+    parser.add_argument("--summary", default=None, help="Summary JSON path (default: <output>.summary.json).")
+    parser.add_argument("--workers", type=int, default=4, help="Datasets (or, with --isolated, questions) answered concurrently.")
+    parser.add_argument("--max-iterations", type=int, default=3)
+    parser.add_argument("--temp-dir", default="tmp_datasets/batch")
+    parser.add_argument("--isolated", action="store_true", help="Do not share run stores or answer caches between questions.")
+    args = parser.parse_args()
+
+    records = read_questions(args.questions)
+    caches = SharedCaches(enabled=not args.isolated)
+
+    results = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+
+        def emit(result: Dict[str, Any]):
+            with lock:
+                results.append(result)
+                out.write(json.dumps(result, default=str) + "\n")
+                out.flush()
+                print(f"[BATCH] {len(results)}/{len(records)} {result['id']}: {result['status']} ({result['latency_s']:.2f}s)")
+
+        futures = [
+            pool.submit(evaluate_chain, chain, caches, args.max_iterations, args.temp_dir, emit)
+            for chain in question_chains(records, args.isolated)
+        ]
+        for future in futures:
+            future.result()
+
+    summary = summarize(results, time.perf_counter() - started, args.workers)
+    summary_path = args.summary or f"{os.path.splitext(args.output)[0]}.summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+This file defines the datasets used by the benchmark suite: the bundled CSVs with
+their prediction targets, and a seeded synthetic generator that scales to millions
+of rows and thousands of columns with controllable categorical cardinality and
+missingness.
+
+Synthetic specs are written as "synthetic:<key>=<value>,..." on the command line,
+e.g. "synthetic:rows=1000000,cols=2000,cardinality=50,missing=0.05", or by one of
+the preset names in SYNTHETIC_PRESETS.
+"""
+
+from typing import Any, Dict, Optional
+from dataclasses import dataclass, asdict
+import numpy as np
+import pandas as pd
+import os
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Bundled dataset -> (target column, task type)
+BUNDLED = {
+    "titanic": ("Survived", "classification"),
+    "housing": ("Price", "regression"),
+    "student": ("GradeClass", "classification"),
+}
+
+
+@dataclass
+class SyntheticSpec:
+    rows: int = 20_000
+    cols: int = 50
+    categorical_fraction: float = 0.2  # share of feature columns that are categorical
+    cardinality: int = 10  # distinct values per categorical column
+    missing: float = 0.05  # share of missing cells in feature columns
+    informative: int = 10  # feature columns the target depends on
+    task: str = "classification"
+    seed: int = 42
+
+    @property
+    def name(self) -> str:
+        return f"synthetic-{self.rows}x{self.cols}-c{self.cardinality}-m{self.missing:g}-{self.task[:3]}"
+
+
+SYNTHETIC_PRESETS = {
+    "synthetic-small": SyntheticSpec(rows=20_000, cols=50),
+    "synthetic-medium": SyntheticSpec(rows=200_000, cols=200),
+    "synthetic-wide": SyntheticSpec(rows=10_000, cols=2_000),
+    "synthetic-large": SyntheticSpec(rows=1_000_000, cols=2_000),
+}
+
+
+def parse_synthetic(text: str) -> SyntheticSpec:
+    """Parse a preset name or "synthetic:rows=...,cols=..." into a SyntheticSpec."""
+    if text in SYNTHETIC_PRESETS:
+        return SYNTHETIC_PRESETS[text]
+    if not text.startswith("synthetic:"):
+        raise ValueError(f"Unknown synthetic dataset '{text}'.")
+
+    fields = SyntheticSpec.__dataclass_fields__
+    kwargs: Dict[str, Any] = {}
+    for item in filter(None, text.split(":", 1)[1].split(",")):
+        key, value = item.split("=", 1)
+        if key not in fields:
+            raise ValueError(f"Unknown synthetic option '{key}' (expected one of {sorted(fields)}).")
+        kwargs[key] = fields[key].type(value)
+    return SyntheticSpec(**kwargs)
+
+
+def make_synthetic(spec: SyntheticSpec) -> pd.DataFrame:
+    """
+    Generate a dataset with a "target" column driven by the first `informative`
+    feature columns. Numeric columns are float32 to keep 1M x 2000 frames tractable.
+    """
+    rng = np.random.default_rng(spec.seed)
+    n_features = spec.cols - 1
+    n_categorical = int(round(n_features * spec.categorical_fraction))
+    n_numeric = n_features - n_categorical
+    informative = min(spec.informative, n_features)
+
+    columns: Dict[str, Any] = {}
+    signal = np.zeros(spec.rows, dtype=np.float64)
+    for i in range(n_numeric):
+        values = rng.standard_normal(spec.rows, dtype=np.float32)
+        if i < informative:
+            signal += rng.uniform(0.5, 2.0) * values
+        columns[f"num_{i}"] = values
+
+    levels = np.array([f"level_{k}" for k in range(spec.cardinality)], dtype=object)
+    for i in range(n_categorical):
+        codes = rng.integers(0, spec.cardinality, size=spec.rows)
+        if n_numeric + i < informative:
+            signal += (codes % 3) - 1.0
+        columns[f"cat_{i}"] = pd.Categorical.from_codes(codes, categories=levels)
+
+    df = pd.DataFrame(columns)
+
+    if spec.missing > 0:
+        for col in df.columns:
+            mask = rng.random(spec.rows) < spec.missing
+            if mask.any():
+                df.loc[mask, col] = np.nan
+
+    noise = rng.standard_normal(spec.rows)
+    if spec.task == "classification":
+        df["target"] = (signal + noise > 0).astype(np.int64)
+    else:
+        df["target"] = signal + noise
+    return df
+
+
+def load_dataset(name: str, cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return {"name", "df", "target", "task_type", "csv_path", "spec"} for a bundled
+    name or a synthetic spec. Synthetic data is written to `cache_dir` as CSV only
+    when `cache_dir` is given (the full-graph benchmark needs a path).
+    """
+    if name in BUNDLED:
+        target, task_type = BUNDLED[name]
+        csv_path = os.path.join(DATA_DIR, f"{name}.csv")
+        return {
+            "name": name,
+            "df": pd.read_csv(csv_path),
+            "target": target,
+            "task_type": task_type,
+            "csv_path": csv_path,
+            "spec": None,
+        }
+
+    spec = parse_synthetic(name)
+    df = make_synthetic(spec)
+    csv_path = None
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        csv_path = os.path.join(cache_dir, f"{spec.name}-s{spec.seed}.csv")
+        if not os.path.exists(csv_path):
+            df.to_csv(csv_path, index=False)
+    return {
+        "name": spec.name,
+        "df": df,
+        "target": "target",
+        "task_type": spec.task,
+        "csv_path": csv_path,
+        "spec": asdict(spec),
+    }
@@ -0,0 +1,77 @@
+"""
+This file benchmarks graph construction overhead. It compares building and
+compiling AutoMLGraph / ConversationGraph for every run (the old behaviour)
+with fetching them from the process-level graph cache, in a service-like loop
+of many sessions each starting several runs.
+
+Usage (from automl_convo/):
+    python benchmarks/graph_build.py --sessions 16 --runs 4
+"""
+
+import statistics
+import argparse
+import json
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graphs.automl_graph import AutoMLGraph
+from graphs.convo_automl_graph import ConversationGraph
+from graphs.registry import get_graph, clear_graph_cache
+
+
+def per_run_overhead(sessions: int, runs: int, cached: bool) -> list:
+    """Seconds spent obtaining compiled graphs for each simulated run."""
+    timings = []
+    for _ in range(sessions):
+        # Each session builds a runner (conversation graph) once...
+        started = time.perf_counter()
+        if cached:
+            get_graph("conversation")
+        else:
+            ConversationGraph()
+        session_cost = time.perf_counter() - started
+
+        # ...and each new run needs the inner AutoML graph
+        for run in range(runs):
+            started = time.perf_counter()
+            if cached:
+                get_graph("automl", entry_point="profile")
+            else:
+                AutoMLGraph()
+            timings.append(time.perf_counter() - started + (session_cost if run == 0 else 0.0))
+    return timings
+
+
+def describe(timings: list) -> dict:
+    return {
+        "runs": len(timings),
+        "first_ms": round(timings[0] * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "mean_after_first_ms": round(statistics.fmean(timings[1:]) * 1000, 3) if len(timings) > 1 else None,
+        "total_ms": round(sum(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-run graph construction overhead.")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=4, help="New AutoML runs per session.")
+    args = parser.parse_args()
+
+    uncached = per_run_overhead(args.sessions, args.runs, cached=False)
+    clear_graph_cache()
+    cached = per_run_overhead(args.sessions, args.runs, cached=True)
+
+    print(json.dumps({
+        "sessions": args.sessions,
+        "runs_per_session": args.runs,
+        "build_every_run": describe(uncached),
+        "graph_cache": describe(cached),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+This file benchmarks cold start. Each scenario runs in a fresh interpreter, so it
+measures what a user (or a spawned worker process) actually waits for:
+
+    shell   import main and create the runner, i.e. until the "> " prompt appears
+    worker  what a spawned pool worker loads: the initializer and the run driver
+
+It reports the median wall time against a target, the slowest imports from
+`python -X importtime`, and whether any heavy module that should only load on
+first use (LangGraph, scikit-learn, the LLM client libraries) was imported.
+
+Usage (from automl_convo/):
+    python benchmarks/import_time.py --repeats 5 --shell-target 1.0 --worker-target 1.0
+
+Exits with status 1 when a target is missed or a heavy module is loaded eagerly.
+"""
+
+from typing import Any, Dict, List
+import statistics
+import subprocess
+import argparse
+import json
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "shell": "import main\nmain.load_runner('data/titanic.csv')",
+    "worker": "from llm import set_concurrency_limiter\nset_concurrency_limiter(None)\nimport utils.drivers",
+}
+
+# Modules that must not be loaded before they are needed
+DEFERRED_MODULES = ("langgraph", "sklearn", "scipy", "portkey_ai", "ollama", "rich.markdown")
+
+_REPORT = "\nimport sys, json\nprint(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+
+
+def run_once(code: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code + _REPORT.format(modules=DEFERRED_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    return {
+        "wall_s": wall,
+        "loaded": json.loads(proc.stdout.strip().splitlines()[-1]),
+        "importtime": proc.stderr,
+    }
+
+
+def slowest_imports(importtime: str, top_n: int) -> List[Dict[str, Any]]:
+    """Top-level packages by cumulative import time from -X importtime output."""
+    rows = {}
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        top = name.strip().split(".")[0]
+        # Only the outermost entry of each package carries its full cumulative time
+        rows[top] = max(rows.get(top, 0), int(cumulative))
+    ordered = sorted(rows.items(), key=lambda kv: kv[1], reverse=True)[:top_n]
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in ordered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure shell and worker cold-start time.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--shell-target", type=float, default=1.0, help="Seconds until the shell prompt.")
+    parser.add_argument("--worker-target", type=float, default=1.0, help="Seconds for a worker to be ready.")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list.")
+    args = parser.parse_args()
+
+    targets = {"shell": args.shell_target, "worker": args.worker_target}
+    report, failed = {}, False
+    for name, code in SCENARIOS.items():
+        runs = [run_once(code) for _ in range(args.repeats)]
+        median = statistics.median(r["wall_s"] for r in runs)
+        loaded = sorted({m for r in runs for m in r["loaded"]})
+        ok = median <= targets[name] and not loaded
+        failed = failed or not ok
+        report[name] = {
+            "median_s": round(median, 3),
+            "min_s": round(min(r["wall_s"] for r in runs), 3),
+            "target_s": targets[name],
+            "deferred_modules_loaded": loaded,
+            "slowest_imports": slowest_imports(runs[-1]["importtime"], args.top),
+            "ok": ok,
+        }
+
+    print(json.dumps({"serving_method": os.environ.get("SERVING_METHOD", "(config default)"), **report}, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+This file is a load-test client for the conversational AutoML service (server.py).
+It opens N concurrent sessions, asks each M questions in order, and reports
+throughput, rejection counts and p50/p95/p99 request latency.
+
+Usage (from automl_convo/):
+    python benchmarks/load_test.py --csv data/titanic.csv --sessions 8 --questions 3
+    python benchmarks/load_test.py --spawn-server --port 8081   # start a server subprocess first
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import subprocess
+import statistics
+import argparse
+import asyncio
+import json
+import time
+import sys
+import os
+
+DEFAULT_QUESTIONS = [
+    "What factors most affect survival?",
+    "Which model performed best?",
+    "Can you remind me of the top features?",
+]
+
+
+async def request(host: str, port: int, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+    reader, writer = await asyncio.open_connection(host, port)
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    payload = json.loads(await reader.readexactly(length)) if length else {}
+    writer.close()
+    return status, payload
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+async def run_session(args, questions: List[str], latencies: List[float], outcomes: Dict[str, int]):
+    status, payload = await request(args.host, args.port, "POST", "/sessions", {
+        "csv_path": args.csv, "max_iterations": args.max_iterations,
+    })
+    if status != 201:
+        outcomes[f"session_{status}"] = outcomes.get(f"session_{status}", 0) + 1
+        return
+
+    session_id = payload["session_id"]
+    for question in questions:
+        started = time.perf_counter()
+        status, payload = await request(args.host, args.port, "POST", f"/sessions/{session_id}/ask", {"question": question})
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+            outcomes["ok"] = outcomes.get("ok", 0) + 1
+        else:
+            outcomes[str(status)] = outcomes.get(str(status), 0) + 1
+
+
+async def wait_for_server(host: str, port: int, timeout_s: float = 60.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            status, _ = await request(host, port, "GET", "/health")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {host}:{port} did not become healthy within {timeout_s}s")
+
+
+async def main_async(args):
+    questions = (DEFAULT_QUESTIONS * (args.questions // len(DEFAULT_QUESTIONS) + 1))[: args.questions]
+    await wait_for_server(args.host, args.port)
+
+    latencies: List[float] = []
+    outcomes: Dict[str, int] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(args, questions, latencies, outcomes) for _ in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    _, metrics = await request(args.host, args.port, "GET", "/metrics")
+
+    report = {
+        "sessions": args.sessions,
+        "questions_per_session": args.questions,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round(len(latencies) / elapsed, 3) if elapsed > 0 else None,
+        "outcomes": outcomes,
+        "latency_s": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else None,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+        "server_metrics": metrics,
+    }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the conversational AutoML service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--csv", default="data/titanic.csv")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--max-iterations", type=int, default=1)
+    parser.add_argument("--spawn-server", action="store_true", help="Start server.py as a subprocess for the test.")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server.py")
+        server = subprocess.Popen([sys.executable, server_path, "--host", args.host, "--port", str(args.port)])
+
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
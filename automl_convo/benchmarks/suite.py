@@ -0,0 +1,311 @@
+"""
+This file is the reproducible benchmark suite. It times the compute path of an
+AutoML iteration (profile -> apply_transforms -> screen_features -> clean ->
+model_plan -> train) and, optionally, the full AutoMLGraph with the scripted LLM
+backend, on the bundled datasets and on seeded synthetic data (see
+benchmarks/datasets.py). Training uses the TrainingConfig time budgets, so the
+`train` stage times the budgeted worker path that runs use by default (set
+MODEL_TIME_BUDGET_S=0 ITERATION_TIME_BUDGET_S=0 to time in-process training).
+Results are written as JSON, and `compare` flags stages that got slower than a
+baseline.
+
+Usage (from automl_convo/):
+    python benchmarks/suite.py run -o bench/current.json
+    python benchmarks/suite.py run --datasets titanic,synthetic:rows=1000000,cols=2000 --stages compute
+    python benchmarks/suite.py compare bench/baseline.json bench/current.json --threshold 0.15
+
+`compare` exits with status 1 when a regression is found.
+"""
+
+import os
+
+# Offline and deterministic unless overridden; tracing, checkpoints and the memory
+# profiler would otherwise add their own I/O to the timings
+os.environ.setdefault("SERVING_METHOD", "scripted")
+os.environ.setdefault("TRACING_ENABLED", "0")
+os.environ.setdefault("CHECKPOINTS_ENABLED", "0")
+os.environ.setdefault("MEMORY_PROFILING", "0")
+# Plan from the cost model priors only, so results do not depend on earlier runs
+os.environ.setdefault("COST_MODEL_LEARNING", "0")
+
+from typing import Any, Dict, List, Optional
+import statistics
+import subprocess
+import platform
+import argparse
+import tempfile
+import warnings
+import shutil
+import json
+import time
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datasets import BUNDLED, load_dataset
+from states.auto_ml_state import AutoMLState
+from tools.profiler import profile_node
+from tools.transformer import apply_transformations_node
+from tools.cleaner import clean_node
+from tools.model_planner import model_plan_node
+from tools.feature_screener import screen_features_node
+from tools.trainer import train_node
+from utils.drivers import run_multi_iteration_analysis
+from utils.metrics import Metrics
+from utils import logger as logger_module
+from config import TrainingConfig
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+import sklearn
+
+DEFAULT_DATASETS = ",".join(list(BUNDLED) + ["synthetic-small"])
+COMPUTE_STAGES = ("profile", "apply_transforms", "screen_features", "clean", "model_plan", "train")
+
+
+def transform_plan(df: pd.DataFrame, target: str, limit: int = 4) -> Dict[str, Any]:
+    """
+    Deterministic stand-in for a feature engineer proposal: missingness indicators
+    for the first columns with missing values and ratios of adjacent numeric columns.
+    """
+    features = [c for c in df.columns if c != target]
+    numeric = [c for c in features if pd.api.types.is_numeric_dtype(df[c])]
+    with_missing = [c for c in features if df[c].isna().any()]
+
+    transforms = [
+        {
+            "name": "add_missing_indicator",
+            "description": f"Missingness indicator for {c}",
+            "params": {"source_column": c, "target_column": f"{c}_was_missing"},
+        }
+        for c in with_missing[: limit // 2]
+    ]
+    for a, b in list(zip(numeric, numeric[1:]))[: limit - len(transforms)]:
+        transforms.append({
+            "name": "numeric_ratio",
+            "description": f"Ratio of {a} to {b}",
+            "params": {"numerator": a, "denominator": b, "target_column": f"{a}_per_{b}"},
+        })
+    return {"apply": bool(transforms), "transformations": transforms}
+
+
+def time_compute_path(dataset: Dict[str, Any], temp_dir: str) -> Dict[str, float]:
+    """One pass over the compute nodes on a fresh state; seconds per stage."""
+    state = AutoMLState()
+    state.df_raw = dataset["df"]
+    state.df_current = dataset["df"].copy()
+    state.iteration = 1
+    state.max_iterations = 1
+    state.history = []
+    state.temp_dir = temp_dir
+    state.datasets_history = [dataset["csv_path"] or ""]
+    state.target_column = dataset["target"]
+    state.task_type = dataset["task_type"]
+    state.use_pca = False
+    # Same budgets as run_multi_iteration_analysis, so training goes through the worker path
+    state.model_time_budget_s = TrainingConfig.MODEL_TIME_BUDGET_S
+    state.iteration_time_budget_s = TrainingConfig.ITERATION_TIME_BUDGET_S
+
+    timings = {}
+    for stage in COMPUTE_STAGES:
+        if stage == "apply_transforms":
+            state.feature_engineer_plan = transform_plan(state.df_current, state.target_column)
+        started = time.perf_counter()
+        if stage == "profile":
+            state = profile_node(state)
+        elif stage == "apply_transforms":
+            state = apply_transformations_node(state)
+        elif stage == "screen_features":
+            state = screen_features_node(state)
+        elif stage == "clean":
+            state = clean_node(state)
+        elif stage == "model_plan":
+            state = model_plan_node(state)
+        else:
+            state = train_node(state)
+        timings[stage] = time.perf_counter() - started
+    timings["compute_total"] = sum(timings.values())
+    return timings
+
+
+def time_full_graph(dataset: Dict[str, Any], max_iterations: int, temp_dir: str) -> Dict[str, float]:
+    """One full AutoMLGraph run with the scripted LLM; total and per-node seconds."""
+    question = f"Which features best predict {dataset['target']}?"
+    with Metrics().scoped() as scope:
+        started = time.perf_counter()
+        run_multi_iteration_analysis(question, dataset["csv_path"], max_iterations=max_iterations, temp_dir=temp_dir)
+        total = time.perf_counter() - started
+
+    timings = {"graph_total": total}
+    for name, values in scope["observations"].items():
+        if name.startswith("node.") and name.endswith(".latency_s"):
+            timings[f"graph.{name[len('node.'):-len('.latency_s')]}"] = sum(values)
+    return timings
+
+
+def summarize_runs(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, Any]]:
+    stages = {}
+    for stage in runs[0]:
+        values = [r[stage] for r in runs if stage in r]
+        stages[stage] = {
+            "median_s": round(statistics.median(values), 6),
+            "min_s": round(min(values), 6),
+            "max_s": round(max(values), 6),
+            "runs_s": [round(v, 6) for v in values],
+        }
+    return stages
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "serving_method": os.environ.get("SERVING_METHOD"),
+    }
+
+
+def run_suite(args) -> Dict[str, Any]:
+    stages = {s.strip() for s in args.stages.split(",")}
+    work_dir = tempfile.mkdtemp(prefix="automl-bench-")
+    results: Dict[str, Any] = {}
+    try:
+        for name in filter(None, (n.strip() for n in args.datasets.split(","))):
+            dataset = load_dataset(name, cache_dir=args.data_dir if "graph" in stages else None)
+            print(f"[BENCH] {dataset['name']}: {dataset['df'].shape[0]} rows x {dataset['df'].shape[1]} cols", flush=True)
+
+            runs = []
+            for repeat in range(args.warmup + args.repeats):
+                timings: Dict[str, float] = {}
+                if "compute" in stages:
+                    timings.update(time_compute_path(dataset, os.path.join(work_dir, "compute")))
+                if "graph" in stages:
+                    timings.update(time_full_graph(dataset, args.max_iterations, os.path.join(work_dir, "graph")))
+                if repeat >= args.warmup:
+                    runs.append(timings)
+                print(f"[BENCH]   repeat {repeat + 1}/{args.warmup + args.repeats}: " + ", ".join(
+                    f"{k}={v:.3f}s" for k, v in timings.items() if k in ("compute_total", "graph_total")
+                ), flush=True)
+
+            results[dataset["name"]] = {
+                "rows": int(dataset["df"].shape[0]),
+                "cols": int(dataset["df"].shape[1]),
+                "target": dataset["target"],
+                "task_type": dataset["task_type"],
+                "synthetic": dataset["spec"],
+                "stages": summarize_runs(runs),
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "created_at": time.time(),
+        "environment": environment(),
+        "settings": {
+            "stages": sorted(stages),
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "max_iterations": args.max_iterations,
+            "model_time_budget_s": TrainingConfig.MODEL_TIME_BUDGET_S,
+            "iteration_time_budget_s": TrainingConfig.ITERATION_TIME_BUDGET_S,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, min_delta_s: float) -> List[Dict[str, Any]]:
+    """
+    Pair (dataset, stage) medians present in both files. A stage regresses when it is
+    more than `threshold` slower relatively and `min_delta_s` slower absolutely.
+    """
+    rows = []
+    for dataset, cur in current["results"].items():
+        base = baseline["results"].get(dataset)
+        if base is None:
+            continue
+        for stage, cur_stats in cur["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats is None:
+                continue
+            b, c = base_stats["median_s"], cur_stats["median_s"]
+            change = (c - b) / b if b > 0 else 0.0
+            rows.append({
+                "dataset": dataset,
+                "stage": stage,
+                "baseline_s": b,
+                "current_s": c,
+                "change": change,
+                "regression": change > threshold and c - b > min_delta_s,
+            })
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'dataset':<34}{'stage':<22}{'base s':>10}{'cur s':>10}{'change':>9}"]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        lines.append(
+            f"{r['dataset'][:33]:<34}{r['stage'][:21]:<22}{r['baseline_s']:>10.4f}"
+            f"{r['current_s']:>10.4f}{r['change']:>+9.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the AutoML compute path and graph.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the suite and write results JSON.")
+    run.add_argument("--datasets", default=DEFAULT_DATASETS,
+                     help="Comma-separated bundled names, synthetic presets or synthetic:key=value specs.")
+    run.add_argument("--stages", default="compute,graph", help="'compute', 'graph' or both.")
+    run.add_argument("--repeats", type=int, default=3)
+    run.add_argument("--warmup", type=int, default=1, help="Untimed repeats before measuring.")
+    run.add_argument("--max-iterations", type=int, default=2, help="Iterations per full-graph run.")
+    run.add_argument("--data-dir", default="tmp_datasets/bench", help="Where synthetic CSVs are written for graph runs.")
+    run.add_argument("-o", "--output", default="bench/results.json")
+    run.add_argument("--verbose", action="store_true", help="Keep the nodes' console output.")
+
+    cmp = sub.add_parser("compare", help="Flag stages slower than a baseline results file.")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown counted as a regression.")
+    cmp.add_argument("--min-delta", type=float, default=0.005, help="Ignore slowdowns smaller than this (seconds).")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if not args.verbose:
+            logger_module.console.quiet = True
+            warnings.filterwarnings("ignore", category=ConvergenceWarning)
+        report = run_suite(args)
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.min_delta)
+    print(format_comparison(rows))
+    regressions = [r for r in rows if r["regression"]]
+    print(f"\n{len(regressions)} regression(s) over {len(rows)} stage(s) "
+          f"(threshold {args.threshold:.0%}, min delta {args.min_delta}s).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
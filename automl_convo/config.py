@@ -5,14 +5,233 @@ This file defines the config.
 import os
 
 class Config:
-    SERVING_METHOD = "ollama" # To the grader: if you have access to portkey, change to "portkey"
+    SERVING_METHOD = os.getenv("SERVING_METHOD", "ollama") # To the grader: if you have access to portkey, change to "portkey". Use "scripted" for offline benchmarking
 
 class PortkeyConfig(Config):
     PORTKEY_BASE_URL = os.getenv("PORTKEY_BASE_URL", "https://portkey-api.livelab.jhuapl.edu/v1")
     PORTKEY_API_KEY = os.getenv("PORTKEY_API_KEY", "")
     PORTKEY_MODEL = os.getenv("PORTKEY_MODEL", "@opal/openai/gpt-oss-120b")
     PORTKEY_MAX_TOKENS = int(os.getenv("PORTKEY_MAX_TOKENS", "4096"))
+    # Send response schemas as response_format=json_schema (disable if the gateway rejects it)
+    PORTKEY_STRUCTURED_OUTPUT = os.getenv("PORTKEY_STRUCTURED_OUTPUT", "1") == "1"
     
 class OllamaConfig(Config):
     OLLAMA_MODEL = "gpt-oss:20b"
-    OLLAMA_MAX_TOKENS = 4096
\ No newline at end of file
+    OLLAMA_MAX_TOKENS = int(os.getenv("OLLAMA_MAX_TOKENS", "4096"))
+
+class SchemaConfig(Config):
+    # Approximate prompt-token budget for the schema block shown to the agents
+    SCHEMA_TOKEN_BUDGET = int(os.getenv("SCHEMA_TOKEN_BUDGET", "1500"))
+    # Rows sampled when computing target correlations on large datasets
+    SCHEMA_SAMPLE_ROWS = int(os.getenv("SCHEMA_SAMPLE_ROWS", "50000"))
+    # Number of rendered schema summaries kept in the shared cache
+    SCHEMA_CACHE_SIZE = 32
+
+class ScriptedConfig(Config):
+    # Optional JSON file mapping agent name -> list of canned responses (consumed in order)
+    SCRIPTED_RESPONSES_PATH = os.getenv("SCRIPTED_RESPONSES_PATH", "")
+    # Injected latency: time-to-first-token plus prompt prefill and completion token rates
+    SCRIPTED_TTFT_MEAN_S = float(os.getenv("SCRIPTED_TTFT_MEAN_S", "0.0"))
+    SCRIPTED_TTFT_JITTER_S = float(os.getenv("SCRIPTED_TTFT_JITTER_S", "0.0"))
+    SCRIPTED_PREFILL_TOKENS_PER_S = float(os.getenv("SCRIPTED_PREFILL_TOKENS_PER_S", "0"))
+    SCRIPTED_TOKENS_PER_S_MEAN = float(os.getenv("SCRIPTED_TOKENS_PER_S_MEAN", "0"))
+    SCRIPTED_TOKENS_PER_S_STD = float(os.getenv("SCRIPTED_TOKENS_PER_S_STD", "0"))
+    SCRIPTED_SEED = int(os.getenv("SCRIPTED_SEED", "0"))
+
+class GenerationConfig(Config):
+    # Per-agent generation profiles. "think" is True/False or a reasoning effort
+    # level ("low", "medium", "high"); "temperature" None keeps the backend default.
+    # "max_tokens" is capped by the backend's setting (PORTKEY_MAX_TOKENS or
+    # OLLAMA_MAX_TOKENS), which is also used when a profile leaves it out.
+    PROFILES = {
+        "default": {"think": True, "temperature": None},
+        "conversation_orchestrator": {"think": "low", "max_tokens": 1024, "temperature": 0.0},
+        "orchestrator": {"think": "low", "max_tokens": 2048, "temperature": 0.0},
+        "feature_engineer": {"think": "medium", "max_tokens": 3072, "temperature": 0.2},
+        "feature_critic": {"think": "low", "max_tokens": 2048, "temperature": 0.2},
+        "model_results_explainer": {"think": "medium", "max_tokens": 3072, "temperature": 0.3},
+        "analysis": {"think": "high", "max_tokens": 4096, "temperature": 0.3},
+        "json_repair": {"think": False, "max_tokens": 1024, "temperature": 0.0},
+    }
+    # Optional JSON table of measured profiles used to tune the above, rows of
+    # {"agent", "think", "max_tokens", "temperature", "latency_s", "quality"}
+    PROFILE_TABLE_PATH = os.getenv("GENERATION_PROFILE_TABLE_PATH", "")
+    # Accept the fastest measured profile whose quality is within this of the best one
+    PROFILE_QUALITY_TOLERANCE = float(os.getenv("GENERATION_PROFILE_QUALITY_TOLERANCE", "0.02"))
+
+class ResilienceConfig(Config):
+    # Per-call deadline and bounded retries (exponential backoff with full jitter)
+    LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "300"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BACKOFF_S = float(os.getenv("LLM_RETRY_BACKOFF_S", "1.0"))
+    # Targeted repair requests for responses that fail schema validation
+    LLM_REPAIR_ATTEMPTS = int(os.getenv("LLM_REPAIR_ATTEMPTS", "2"))
+    # Second backend for hedged requests and failover: "", "ollama", "portkey" or "scripted".
+    # With "ollama", OLLAMA_HEDGE_HOST points at a replica of the primary server.
+    LLM_HEDGE_SERVING_METHOD = os.getenv("LLM_HEDGE_SERVING_METHOD", "")
+    OLLAMA_HEDGE_HOST = os.getenv("OLLAMA_HEDGE_HOST", "")
+    # Hedge once a call runs past this percentile of the backend's recent latencies
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    LLM_HEDGE_MIN_SAMPLES = 5
+    LLM_HEDGE_DEFAULT_DELAY_S = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_S", "60"))
+    LLM_LATENCY_WINDOW = 200
+    # Circuit breaker per backend
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+    BREAKER_RESET_S = float(os.getenv("BREAKER_RESET_S", "60"))
+    LLM_MAX_WORKERS = 16
+
+class RouterConfig(Config):
+    # Use the deterministic fast-path router ahead of the conversation orchestrator LLM
+    ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+    # Minimum router confidence to skip the LLM round-trip
+    ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+
+class QACacheConfig(Config):
+    # Answer near-duplicate questions from cache (character n-gram TF-IDF cosine similarity)
+    QA_CACHE_ENABLED = os.getenv("QA_CACHE_ENABLED", "1") == "1"
+    # Hits also need the same mentioned columns, numbers and negations (see utils/qa_cache.py)
+    QA_CACHE_THRESHOLD = float(os.getenv("QA_CACHE_THRESHOLD", "0.92"))
+    QA_CACHE_MAX_ENTRIES = int(os.getenv("QA_CACHE_MAX_ENTRIES", "256"))
+
+class SessionConfig(Config):
+    # Directory holding persisted conversation sessions
+    SESSION_DIR = os.getenv("SESSION_DIR", "sessions")
+
+class ServiceConfig(Config):
+    SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8080"))
+    # Admission control: live sessions, questions queued or running, per-session queue depth
+    SERVICE_MAX_SESSIONS = int(os.getenv("SERVICE_MAX_SESSIONS", "64"))
+    SERVICE_MAX_PENDING = int(os.getenv("SERVICE_MAX_PENDING", "128"))
+    SERVICE_SESSION_QUEUE_SIZE = int(os.getenv("SERVICE_SESSION_QUEUE_SIZE", "8"))
+    # Threads running conversation turns; processes running new AutoML runs
+    SERVICE_MAX_THREADS = int(os.getenv("SERVICE_MAX_THREADS", "16"))
+    # Threads running background jobs (separate, so jobs cannot take every turn thread)
+    SERVICE_MAX_JOB_THREADS = int(os.getenv("SERVICE_MAX_JOB_THREADS", "4"))
+    SERVICE_MAX_PROCESSES = int(os.getenv("SERVICE_MAX_PROCESSES", str(max(1, (os.cpu_count() or 2) - 1))))
+    # Concurrent LLM calls allowed across all threads and worker processes
+    SERVICE_LLM_CONCURRENCY = int(os.getenv("SERVICE_LLM_CONCURRENCY", "4"))
+    # Persist each service session with the SessionStore
+    SERVICE_PERSIST_SESSIONS = os.getenv("SERVICE_PERSIST_SESSIONS", "0") == "1"
+
+class CheckpointConfig(Config):
+    # Checkpoint AutoMLGraph runs after every node so a failed run can resume. Off by
+    # default: each checkpoint pickles the changed dataframes and arrays
+    CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "0") == "1"
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+    # Keep checkpoints of completed runs (otherwise only unfinished ones are kept)
+    CHECKPOINT_KEEP_COMPLETED = os.getenv("CHECKPOINT_KEEP_COMPLETED", "0") == "1"
+
+class GraphConfig(Config):
+    # AutoMLGraph variant used for new runs (see graphs/registry.py): "automl" or "automl_single_pass"
+    AUTOML_GRAPH_VARIANT = os.getenv("AUTOML_GRAPH_VARIANT", "automl")
+
+class TracingConfig(Config):
+    # Record spans for graph nodes and LLM calls; export one trace per turn / AutoML run.
+    # Off by default; when on, TRACE_SAMPLE_RATE is the fraction of turns / runs traced
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+    TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+    # Comma-separated export formats: "chrome" (trace JSON) and/or "jsonl"
+    TRACE_EXPORT = os.getenv("TRACE_EXPORT", "chrome,jsonl")
+    # Log a slowest-spans table when a trace closes
+    TRACE_SUMMARY = os.getenv("TRACE_SUMMARY", "1") == "1"
+    TRACE_SUMMARY_TOP_N = int(os.getenv("TRACE_SUMMARY_TOP_N", "10"))
+
+class MemoryConfig(Config):
+    # Record tracemalloc peak, RSS and AutoMLState field sizes after every AutoML graph node
+    MEMORY_PROFILING = os.getenv("MEMORY_PROFILING", "0") == "1"
+    MEMORY_PROFILE_DIR = os.getenv("MEMORY_PROFILE_DIR", "memory_profiles")
+    # Flag a field whose end-of-iteration size grows by more than this fraction over the run
+    MEMORY_GROWTH_THRESHOLD = float(os.getenv("MEMORY_GROWTH_THRESHOLD", "0.1"))
+
+class TrainingConfig(Config):
+    # Default wall-clock budgets (seconds) for one model's cross-validation and for all
+    # training in one iteration; 0 disables a budget. Budgeted training runs in
+    # killable worker processes (see utils/training_workers.py), which receive a pickled
+    # copy of X over a pipe: a second full copy of the data, and allocations the
+    # memory profiler (MemoryConfig) does not see. Set both to 0 to train in-process.
+    MODEL_TIME_BUDGET_S = float(os.getenv("MODEL_TIME_BUDGET_S", "300"))
+    ITERATION_TIME_BUDGET_S = float(os.getenv("ITERATION_TIME_BUDGET_S", "900"))
+    # Idle training workers kept per process for reuse
+    TRAINING_IDLE_WORKERS = int(os.getenv("TRAINING_IDLE_WORKERS", "4"))
+
+class ScreeningConfig(Config):
+    # Score each batch of proposed features against the target before retraining
+    SCREENING_ENABLED = os.getenv("SCREENING_ENABLED", "1") == "1"
+    # Rows sampled for screening, and existing features (most target-correlated) in the linear baseline
+    SCREEN_SAMPLE_ROWS = int(os.getenv("SCREEN_SAMPLE_ROWS", "20000"))
+    SCREEN_MAX_BASE_COLUMNS = int(os.getenv("SCREEN_MAX_BASE_COLUMNS", "200"))
+    # A proposal passes when a new column's |correlation| with the target is at least
+    # max(SCREEN_MIN_CORRELATION, SCREEN_SIGNIFICANCE_Z / sqrt(rows)), or when adding it
+    # to a ridge model of the existing features raises held-out R^2 by SCREEN_MIN_GAIN
+    SCREEN_MIN_CORRELATION = float(os.getenv("SCREEN_MIN_CORRELATION", "0.02"))
+    SCREEN_SIGNIFICANCE_Z = float(os.getenv("SCREEN_SIGNIFICANCE_Z", "3.0"))
+    SCREEN_MIN_GAIN = float(os.getenv("SCREEN_MIN_GAIN", "0.001"))
+
+class PruningConfig(Config):
+    # Drop features after each trained iteration so the data does not keep widening
+    PRUNING_ENABLED = os.getenv("PRUNING_ENABLED", "1") == "1"
+    # Low importance: normalized importance below this fraction of an even share
+    # (1 / number of features) in each of the last PRUNE_WINDOW trained iterations, and a
+    # target signal below the screening threshold (see ScreeningConfig)
+    PRUNE_MIN_RELATIVE_IMPORTANCE = float(os.getenv("PRUNE_MIN_RELATIVE_IMPORTANCE", "0.1"))
+    PRUNE_WINDOW = int(os.getenv("PRUNE_WINDOW", "2"))
+    # Near-duplicates: numeric columns with |correlation| at least this on a row sample
+    PRUNE_DUPLICATE_CORRELATION = float(os.getenv("PRUNE_DUPLICATE_CORRELATION", "0.98"))
+    PRUNE_SAMPLE_ROWS = int(os.getenv("PRUNE_SAMPLE_ROWS", "5000"))
+    # Never drop more than this fraction of the features in one iteration
+    PRUNE_MAX_FRACTION = float(os.getenv("PRUNE_MAX_FRACTION", "0.5"))
+
+class SearchConfig(Config):
+    # Successive-halving hyperparameter search before each model's cross-validation
+    # (opt-in: it multiplies the training time of every model it tunes)
+    HPO_ENABLED = os.getenv("HPO_ENABLED", "0") == "1"
+    # Search time per model, also capped at this fraction of the model's budget and of
+    # its share of the remaining iteration budget (the rest is kept for the final CV),
+    # and at this multiple of the planner's estimate of the model's training time
+    HPO_MODEL_BUDGET_S = float(os.getenv("HPO_MODEL_BUDGET_S", "60"))
+    HPO_BUDGET_FRACTION = float(os.getenv("HPO_BUDGET_FRACTION", "0.5"))
+    HPO_ESTIMATE_MULTIPLE = float(os.getenv("HPO_ESTIMATE_MULTIPLE", "3"))
+    # Configurations in the first rung; each rung keeps 1/ETA of them on ETA times the resource
+    HPO_CANDIDATES = int(os.getenv("HPO_CANDIDATES", "9"))
+    HPO_ETA = int(os.getenv("HPO_ETA", "3"))
+    # Fewest training rows a row-subsampled fit may use
+    HPO_MIN_ROWS = int(os.getenv("HPO_MIN_ROWS", "100"))
+    # Parallel fits (threads) per search, at most the CPU count; every concurrent run
+    # searches in its own training worker, so keep this small under the service
+    HPO_N_JOBS = int(os.getenv("HPO_N_JOBS", "1"))
+
+class PlannerConfig(Config):
+    # Per-fold timings of previous runs; with COST_MODEL_LEARNING=1 the cost model is
+    # refitted from them. Off by default: learning lets the planned model set drift
+    # between runs of the same question, so the planner uses its priors only.
+    COST_MODEL_PATH = os.getenv("COST_MODEL_PATH", "cost_model/timings.jsonl")
+    COST_MODEL_LEARNING = os.getenv("COST_MODEL_LEARNING", "0") == "1"
+    # Most recent observations used per refit, and how strongly the priors hold against them
+    COST_MODEL_MAX_OBSERVATIONS = int(os.getenv("COST_MODEL_MAX_OBSERVATIONS", "2000"))
+    COST_MODEL_PRIOR_WEIGHT = float(os.getenv("COST_MODEL_PRIOR_WEIGHT", "3.0"))
+    # At most this many models per iteration, planned into this fraction of the
+    # iteration time budget (estimates are uncertain)
+    PLANNER_MAX_MODELS = int(os.getenv("PLANNER_MAX_MODELS", "3"))
+    PLANNER_BUDGET_FRACTION = float(os.getenv("PLANNER_BUDGET_FRACTION", "0.8"))
+    # Expected score given up per predicted second of training when comparing model sets
+    PLANNER_SECONDS_PENALTY = float(os.getenv("PLANNER_SECONDS_PENALTY", "0.0005"))
+    # Models that need dense input are not planned when densifying X would exceed this
+    PLANNER_MAX_DENSE_BYTES = int(os.getenv("PLANNER_MAX_DENSE_BYTES", str(1024 * 1024 * 1024)))
+
+class LoggingConfig(Config):
+    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+    # Hand records to a background writer thread instead of writing them in the caller
+    LOG_ASYNC = os.getenv("LOG_ASYNC", "0") == "1"
+    # "text" keeps the "[title] content" lines; "jsonl" writes one structured record per line
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    # Skip Rich console rendering entirely (headless deployments); records are still written
+    LOG_QUIET = os.getenv("LOG_QUIET", "0") == "1"
+    # Async writer: records per batch, longest wait before a batch is flushed, queue bound
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+    LOG_FLUSH_INTERVAL_S = float(os.getenv("LOG_FLUSH_INTERVAL_S", "0.5"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Rotate the log file past this size, keeping LOG_BACKUP_COUNT old files (0 disables)
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
@@ -3,26 +3,66 @@ from graphs.wrappers import (
     orchestrator_node_wrapped, 
     feature_critic_node_wrapped, 
     apply_transformations_node_wrapped,
+    screen_features_node_wrapped,
+    prune_features_node_wrapped,
     train_node_wrapped,
     clean_node_wrapped,
     analysis_node_wrapped,
     model_plan_node_wrapped,
     feature_engineer_node_wrapped, 
+    screening_route,
     should_continue
     )
 
 from states.graph_state import GraphState
-from langgraph.graph import StateGraph
+from langgraph.graph import StateGraph, END
+
+# Unconditional edges; screen_features branches through screening_route and
+# feature_critic through should_continue. prune_features only exists in the feature loop
+LINEAR_EDGES = {
+    "profile": "orchestrate",
+    "orchestrate": "feature_engineer",
+    "feature_engineer": "apply_transforms",
+    "apply_transforms": "screen_features",
+    "clean": "model_plan",
+    "model_plan": "train",
+    "train": "prune_features",
+    "prune_features": "feature_critic",
+    "analysis": END,
+}
+
 
 class AutoMLGraph:
-    def __init__(self):
+    """
+    The inner AutoML workflow. `entry_point` starts the graph at a later node (used to
+    resume checkpointed runs); `feature_loop=False` builds the single-pass variant that
+    trains once and goes straight to analysis, without feature pruning or the critic loop.
+    """
+
+    def __init__(self, entry_point: str = "profile", feature_loop: bool = True):
         # Build the graph when class is instantiated
+        self.entry_point = entry_point
+        self.feature_loop = feature_loop
         self._graph = self._build_graph()
 
     @property
     def graph(self):
         return self._graph
 
+    def next_node(self, node: str, gs: GraphState) -> str:
+        """Node that runs after `node` given the graph state it produced (END when finished)."""
+        if node == "train" and not self.feature_loop:
+            return "analysis"
+        if node == "screen_features":
+            return "clean" if screening_route(gs) == "train" else self._skip_target()
+        if node == "feature_critic":
+            return "feature_engineer" if should_continue(gs) == "continue" else "analysis"
+        return LINEAR_EDGES[node]
+
+    def _skip_target(self) -> str:
+        # A skipped iteration goes back to the critic (or straight to analysis without the loop)
+        return "feature_critic" if self.feature_loop else "analysis"
+
     def _build_graph(self):
         builder = StateGraph(GraphState)
 
@@ -30,33 +70,45 @@ class AutoMLGraph:
         builder.add_node("orchestrate", orchestrator_node_wrapped)
         builder.add_node("feature_engineer", feature_engineer_node_wrapped)
         builder.add_node("apply_transforms", apply_transformations_node_wrapped)
+        builder.add_node("screen_features", screen_features_node_wrapped)
         builder.add_node("clean", clean_node_wrapped)
         builder.add_node("model_plan", model_plan_node_wrapped)
         builder.add_node("train", train_node_wrapped)
-        builder.add_node("feature_critic", feature_critic_node_wrapped)
         builder.add_node("analysis", analysis_node_wrapped)
 
         # Entry point
-        builder.set_entry_point("profile")
+        builder.set_entry_point(self.entry_point)
 
         # Linear path
-        builder.add_edge("profile", "orchestrate")
-        builder.add_edge("orchestrate", "feature_engineer")
-        builder.add_edge("feature_engineer", "apply_transforms")
-        builder.add_edge("apply_transforms", "clean")
-        builder.add_edge("clean", "model_plan")
-        builder.add_edge("model_plan", "train")
-        builder.add_edge("train", "feature_critic")
-
-        # Loop or finish
+        for source, target in LINEAR_EDGES.items():
+            if source == "prune_features" and not self.feature_loop:
+                continue
+            if source == "train" and not self.feature_loop:
+                target = "analysis"
+            builder.add_edge(source, target)
+
         builder.add_conditional_edges(
-            "feature_critic",
-            should_continue,
+            "screen_features",
+            screening_route,
             {
-                "continue": "feature_engineer",
-                "stop": "analysis",
+                "train": "clean",
+                "skip": self._skip_target(),
             },
         )
 
+        if self.feature_loop:
+            builder.add_node("prune_features", prune_features_node_wrapped)
+            builder.add_node("feature_critic", feature_critic_node_wrapped)
+
+            # Loop or finish
+            builder.add_conditional_edges(
+                "feature_critic",
+                should_continue,
+                {
+                    "continue": "feature_engineer",
+                    "stop": "analysis",
+                },
+            )
+
         # Compile
         return builder.compile()
@@ -0,0 +1,71 @@
+"""
+This file defines the process-level cache of compiled graphs. Building and
+compiling a StateGraph costs far more than running a cached one, so every
+graph variant is compiled once per process, keyed by variant name and options,
+and shared by all runs and runners (compiled graphs hold no per-run state).
+"""
+
+from typing import Any, Callable, Dict, Hashable, Tuple
+from utils.metrics import Metrics
+import threading
+import time
+
+
+def _automl_graph(entry_point: str = "profile"):
+    from graphs.automl_graph import AutoMLGraph
+    return AutoMLGraph(entry_point=entry_point)
+
+
+def _automl_single_pass_graph(entry_point: str = "profile"):
+    from graphs.automl_graph import AutoMLGraph
+    return AutoMLGraph(entry_point=entry_point, feature_loop=False)
+
+
+def _conversation_graph():
+    from graphs.convo_automl_graph import ConversationGraph
+    return ConversationGraph()
+
+
+# Variant name -> builder returning a graph wrapper (with a compiled `.graph`)
+GRAPH_VARIANTS: Dict[str, Callable[..., Any]] = {
+    "automl": _automl_graph,
+    "automl_single_pass": _automl_single_pass_graph,
+    "conversation": _conversation_graph,
+}
+
+_CACHE: Dict[Tuple[str, Tuple[Tuple[str, Hashable], ...]], Any] = {}
+_LOCK = threading.Lock()
+
+
+def register_graph_variant(name: str, builder: Callable[..., Any]):
+    """Add or replace a variant; cached graphs built by an older builder are dropped."""
+    with _LOCK:
+        GRAPH_VARIANTS[name] = builder
+        for key in [k for k in _CACHE if k[0] == name]:
+            del _CACHE[key]
+
+
+def get_graph(variant: str, **options: Hashable) -> Any:
+    """Return the graph wrapper for `variant` built with `options`, compiling it on first use."""
+    if variant not in GRAPH_VARIANTS:
+        raise ValueError(f"Unknown graph variant '{variant}'. Expected one of {sorted(GRAPH_VARIANTS)}.")
+
+    metrics = Metrics()
+    key = (variant, tuple(sorted(options.items())))
+    with _LOCK:
+        graph = _CACHE.get(key)
+        if graph is not None:
+            metrics.incr("graph_cache.hits")
+            return graph
+
+        started = time.perf_counter()
+        graph = GRAPH_VARIANTS[variant](**options)
+        metrics.incr("graph_cache.misses")
+        metrics.observe("graph_cache.build_s", time.perf_counter() - started)
+        _CACHE[key] = graph
+        return graph
+
+
+def clear_graph_cache():
+    with _LOCK:
+        _CACHE.clear()
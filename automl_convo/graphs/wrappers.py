@@ -4,6 +4,8 @@ from tools.model_planner import model_plan_node
 from tools.profiler import profile_node
 from tools.trainer import train_node
 from tools.transformer import apply_transformations_node
+from tools.feature_screener import screen_features_node
+from tools.feature_pruner import prune_features_node
 from agents.analyist import analysis_node
 from agents.feature_critic import feature_critic_node
 from agents.feature_engineer import feature_engineer_node
@@ -12,9 +14,17 @@ from agents.conversation_orchestrator import conversation_orchestrator
 from agents.model_results_explainer import model_results_explainer
 from states.graph_state import GraphState
 from states.conversation_graph_state import ConversationGraphState
+from utils.fingerprint import dataset_fingerprint
+from utils.metrics import Metrics
+from utils.router import fast_route, router_report
+from utils.checkpoints import CheckpointStore, checkpoint_id_for
+from utils.tracing import traced_node
+from config import RouterConfig, CheckpointConfig, GraphConfig
 import pandas as pd 
 from llm import LLM
+import time
 
+@traced_node("profile")
 def profile_node_wrapped(gs: GraphState) -> GraphState:
     logger = Logger()
 
@@ -39,15 +49,17 @@ def profile_node_wrapped(gs: GraphState) -> GraphState:
     gs["state"] = s
     return gs
 
+@traced_node("orchestrate")
 def orchestrator_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
     q = gs["question"]
 
-    llm = LLM()
+    llm = LLM(agent="orchestrator")
     s = orchestrator_node(s, llm, q)
     gs["state"] = s
     return gs
 
+@traced_node("feature_engineer")
 def feature_engineer_node_wrapped(gs: GraphState) -> GraphState:
     logger = Logger()
     
@@ -57,52 +69,76 @@ def feature_engineer_node_wrapped(gs: GraphState) -> GraphState:
     s.iteration += 1
     logger.info(f"[ITERATION] Starting iteration {s.iteration}", style='grey')
 
-    llm = LLM()
+    llm = LLM(agent="feature_engineer")
     s = feature_engineer_node(s, llm)
     gs["state"] = s
     return gs
 
+@traced_node("apply_transforms")
 def apply_transformations_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
     s = apply_transformations_node(s)
     gs["state"] = s
     return gs
 
+@traced_node("screen_features")
+def screen_features_node_wrapped(gs: GraphState) -> GraphState:
+    s = gs["state"]
+    s = screen_features_node(s)
+    gs["state"] = s
+    return gs
+
+@traced_node("clean")
 def clean_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
     s = clean_node(s)
     gs["state"] = s
     return gs
 
+@traced_node("model_plan")
 def model_plan_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
     s = model_plan_node(s)
     gs["state"] = s
     return gs
 
+@traced_node("train")
 def train_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
     s = train_node(s)
     gs["state"] = s
     return gs
 
+@traced_node("prune_features")
+def prune_features_node_wrapped(gs: GraphState) -> GraphState:
+    s = gs["state"]
+    s = prune_features_node(s)
+    gs["state"] = s
+    return gs
+
+@traced_node("feature_critic")
 def feature_critic_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
 
-    llm = LLM()
+    llm = LLM(agent="feature_critic")
     s = feature_critic_node(s, llm)
     gs["state"] = s
     return gs
 
+@traced_node("analysis")
 def analysis_node_wrapped(gs: GraphState) -> GraphState:
     s = gs["state"]
     q = gs["question"]
 
-    llm = LLM()
+    llm = LLM(agent="analysis")
     s = analysis_node(s, llm, q)
     gs["state"] = s
     return gs
 
+# Conditional routing: retrain, or skip an iteration whose proposals all failed screening
+def screening_route(gs: GraphState) -> str:
+    return "skip" if gs["state"].iteration_skipped else "train"
+
 # Conditional routing: decide whether to loop or finish
 def should_continue(gs: GraphState) -> str:
     s = gs["state"]
@@ -116,12 +152,47 @@ def should_continue(gs: GraphState) -> str:
     return "continue"
 
 
+@traced_node("convo_orchestrator")
 def convo_orchestrator_wrapper(gs: ConversationGraphState) -> ConversationGraphState:
+    logger = Logger()
+    metrics = Metrics()
+
     conv_state = gs["conv_state"]
     question = gs["question"]
-
-    llm = LLM()
-    decision = conversation_orchestrator(question, llm, conv_state)
+    fingerprint = dataset_fingerprint(gs["csv_path"])
+
+    # Deterministic fast path; only pay the LLM round-trip when it is unsure
+    if RouterConfig.ROUTER_ENABLED:
+        started = time.perf_counter()
+        decision = fast_route(question, conv_state, gs["csv_path"], fingerprint)
+        metrics.incr("router.calls")
+        metrics.observe("router.latency_s", time.perf_counter() - started)
+
+        if decision["confidence"] >= RouterConfig.ROUTER_CONFIDENCE_THRESHOLD:
+            metrics.incr("router.hits")
+            report = router_report()
+            logger.box(
+                "FAST-PATH ROUTER DECISION",
+                f"reuse: {decision['reuse']}\n"
+                f"need_new_run: {decision['need_new_run']}\n"
+                f"run_id: {decision['run_id']}\n"
+                f"confidence: {decision['confidence']:.2f}\n"
+                f"reason: {decision['reason']}\n"
+                f"hit rate: {report['hit_rate']:.1%}",
+                style="magenta",
+            )
+            gs["decision"] = decision
+            return gs
+
+    started = time.perf_counter()
+    llm = LLM(agent="conversation_orchestrator")
+    decision = conversation_orchestrator(
+        question,
+        llm,
+        conv_state,
+        dataset_fingerprint=fingerprint,
+    )
+    metrics.observe("conversation_orchestrator.latency_s", time.perf_counter() - started)
     gs["decision"] = decision
     return gs
 
@@ -137,14 +208,23 @@ def convo_route_decision(gs: ConversationGraphState) -> str:
     return "cannot_answer"
 
 
+@traced_node("reuse_answer")
 def convo_reuse_node(gs: ConversationGraphState) -> ConversationGraphState:
     logger = Logger()
 
     conv_state = gs["conv_state"]
     question = gs["question"]
+    decision = gs.get("decision") or {}
 
+    # Switch to the stored run the orchestrator picked, if any
+    run_id = decision.get("run_id")
+    reused_state = conv_state.run_store.get(run_id) if run_id else None
+    if reused_state is not None:
+        conv_state.last_automl_state = reused_state
+
+    Metrics().incr("conversation.reuse")
     logger.info(
-        "[CONVERSATION GRAPH] Reusing previous AutoML results; no new training.",
+        f"[CONVERSATION GRAPH] Reusing previous AutoML results (run: {run_id or 'latest'}); no new training.",
         style="cyan",
     )
 
@@ -154,7 +234,7 @@ def convo_reuse_node(gs: ConversationGraphState) -> ConversationGraphState:
             "I would need to run a new analysis first."
         )
     else:
-        llm = LLM()
+        llm = LLM(agent="model_results_explainer")
         answer = model_results_explainer(
             question,
             llm,
@@ -173,6 +253,7 @@ def convo_reuse_node(gs: ConversationGraphState) -> ConversationGraphState:
     gs["answer"] = answer
     return gs
 
+@traced_node("new_run")
 def convo_new_run_node(gs: ConversationGraphState) -> ConversationGraphState:
     logger = Logger()
 
@@ -182,18 +263,45 @@ def convo_new_run_node(gs: ConversationGraphState) -> ConversationGraphState:
     max_iterations = gs["max_iterations"]
     temp_dir = gs["temp_dir"]
 
+    Metrics().incr("conversation.new_run")
     logger.info("[CONVERSATION GRAPH] Running a NEW AutoML analysis for this question.", style='cyan')
 
     # Lazy import here to avoid circular import at module load time
     from utils.drivers import run_multi_iteration_analysis
 
-    new_state = run_multi_iteration_analysis(
-        question=question,
-        csv_path=csv_path,
-        max_iterations=max_iterations,
-        temp_dir=temp_dir,
-    )
+    # Checkpoint under an id derived from dataset, question and run settings, so asking
+    # the same question again after a failure resumes from the last completed node
+    graph_variant = GraphConfig.AUTOML_GRAPH_VARIANT
+    checkpoint_id = checkpoint_id_for(dataset_fingerprint(csv_path), question, max_iterations, graph_variant)
+    resume = CheckpointConfig.CHECKPOINTS_ENABLED and CheckpointStore().is_resumable(checkpoint_id)
+    if resume:
+        logger.info(f"[CONVERSATION GRAPH] Resuming unfinished run from checkpoint '{checkpoint_id}'.", style="cyan")
+
+    run_kwargs = {
+        "question": question,
+        "csv_path": csv_path,
+        "max_iterations": max_iterations,
+        "temp_dir": temp_dir,
+        "checkpoint_id": checkpoint_id,
+        "resume": resume,
+        "graph_variant": graph_variant,
+    }
+
+    # Background jobs stream progress and can be cancelled, so their runs stay in
+    # this thread; other runs go to the provided executor (e.g. the service's process pool)
+    run_executor = gs.get("run_executor")
+    if gs.get("on_event") is not None or gs.get("cancel_event") is not None:
+        new_state = run_multi_iteration_analysis(
+            **run_kwargs,
+            on_event=gs.get("on_event"),
+            cancel_event=gs.get("cancel_event"),
+        )
+    elif run_executor is not None:
+        new_state = run_executor.submit(run_multi_iteration_analysis, **run_kwargs).result()
+    else:
+        new_state = run_multi_iteration_analysis(**run_kwargs)
     conv_state.last_automl_state = new_state
+    conv_state.run_store.add(dataset_fingerprint(csv_path), new_state)
     answer = new_state.final_answer or "Analysis completed, but no final answer was stored."
 
     conv_state.qa_history.append({"question": question, "answer": answer})
@@ -201,10 +309,12 @@ def convo_new_run_node(gs: ConversationGraphState) -> ConversationGraphState:
     gs["answer"] = answer
     return gs
 
+@traced_node("cannot_answer")
 def convo_cannot_answer_node(gs: ConversationGraphState) -> ConversationGraphState:
     decision = gs.get("decision") or {}
     reason = decision.get("reason", "The question cannot be answered with this AutoML system.")
     answer = f"I cannot answer this question with the current AutoML setup: {reason}"
+    Metrics().incr("conversation.cannot_answer")
 
     conv_state = gs["conv_state"]
     question = gs["question"]
@@ -3,11 +3,20 @@ This module provides a minimal wrapper around Portkey's chat completion API,
 including logging of reasoning content in a readable format.
 """
 
-from typing import Optional
-from portkey_ai import Portkey
+from typing import Optional, Dict, List, Any
 from utils.logger import Logger
-from config import Config, PortkeyConfig, OllamaConfig
-import ollama
+from utils.schema import estimate_tokens
+from utils.scripted_responses import detect_agent, generate_scripted_response
+from utils.generation_profiles import get_generation_profile
+from utils.resilience import call_with_resilience
+from utils.metrics import Metrics
+from utils.tracing import span
+from utils.response_schemas import validate_json, extract_json
+from config import Config, PortkeyConfig, OllamaConfig, ScriptedConfig, ResilienceConfig
+import random
+import json
+import threading
+import time
 
 
 class PortkeyLLM:
@@ -22,19 +31,50 @@ class PortkeyLLM:
     ):
         self.model = model
         self.max_tokens = max_tokens
-        self.client = Portkey(base_url=base_url, api_key=api_key)
+        self.name = f"portkey:{model}"
+        # Imported here so only the configured backend's client library is ever loaded
+        from portkey_ai import Portkey
+        import httpx
+        # Client-side timeout in seconds (Portkey's request_timeout is a gateway header in ms)
+        self.client = Portkey(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=httpx.Client(timeout=ResilienceConfig.LLM_TIMEOUT_S),
+        )
 
-    def invoke(self, system_prompt: str, human_prompt: str) -> str:
+    def invoke(
+        self,
+        system_prompt: str,
+        human_prompt: str,
+        profile: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": human_prompt},
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=self.max_tokens,
-        )
+        profile = profile or {}
+        create_kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": min(profile.get("max_tokens", self.max_tokens), self.max_tokens),
+        }
+        if profile.get("temperature") is not None:
+            create_kwargs["temperature"] = profile["temperature"]
+        # gpt-oss cannot fully disable reasoning; "off" maps to the lowest effort
+        think = profile.get("think", True)
+        if isinstance(think, str):
+            create_kwargs["reasoning_effort"] = think
+        elif think is False:
+            create_kwargs["reasoning_effort"] = "low"
+        if response_schema is not None and PortkeyConfig.PORTKEY_STRUCTURED_OUTPUT:
+            create_kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "agent_response", "schema": response_schema},
+            }
+
+        response = self.client.chat.completions.create(**create_kwargs)
 
         choice = response.choices[0]
         message = choice.message
@@ -75,25 +115,44 @@ class OllamaLLM:
         self,
         model: str = OllamaConfig.OLLAMA_MODEL,
         max_tokens: int = OllamaConfig.OLLAMA_MAX_TOKENS,
+        host: Optional[str] = None,
     ):
         self.model = model
         self.max_tokens = max_tokens
         self.think = True
+        self.name = f"ollama:{host or 'default'}:{model}"
+        # Client-side timeout so an abandoned (hedged or timed out) request is torn down
+        import ollama
+        self.client = ollama.Client(host=host, timeout=ResilienceConfig.LLM_TIMEOUT_S)
 
-    def invoke(self, system_prompt: str, human_prompt: str) -> str:
+    def invoke(
+        self,
+        system_prompt: str,
+        human_prompt: str,
+        profile: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": human_prompt},
         ]
 
+        profile = profile or {}
+        options = {"num_predict": min(profile.get("max_tokens", self.max_tokens), self.max_tokens)}
+        if profile.get("temperature") is not None:
+            options["temperature"] = profile["temperature"]
+
         chat_kwargs = {
             "model": self.model,
             "messages": messages,
-            "think": True,
-            "options": {"num_predict": self.max_tokens}
+            "think": profile.get("think", self.think),
+            "options": options,
         }
+        if response_schema is not None:
+            # Grammar-constrained decoding of the answer against the schema
+            chat_kwargs["format"] = response_schema
         
-        response = ollama.chat(**chat_kwargs)
+        response = self.client.chat(**chat_kwargs)
         message = response.message
 
         reasoning: Optional[str] = getattr(message, "thinking", None)
@@ -110,30 +169,220 @@ class OllamaLLM:
             style="yellow",
         )
         return ""
-    
+
+
+class ScriptedLLM:
+    """
+    Offline stand-in backend that returns canned or rule-generated responses for each
+    agent, with injected latency, so the compute path can be benchmarked deterministically.
+    """
+    logger = Logger()
+    _shared: Dict[tuple, tuple] = {}
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        responses_path: str = ScriptedConfig.SCRIPTED_RESPONSES_PATH,
+        ttft_mean_s: float = ScriptedConfig.SCRIPTED_TTFT_MEAN_S,
+        ttft_jitter_s: float = ScriptedConfig.SCRIPTED_TTFT_JITTER_S,
+        prefill_tokens_per_s: float = ScriptedConfig.SCRIPTED_PREFILL_TOKENS_PER_S,
+        tokens_per_s_mean: float = ScriptedConfig.SCRIPTED_TOKENS_PER_S_MEAN,
+        tokens_per_s_std: float = ScriptedConfig.SCRIPTED_TOKENS_PER_S_STD,
+        seed: int = ScriptedConfig.SCRIPTED_SEED,
+    ):
+        self.ttft_mean_s = ttft_mean_s
+        self.ttft_jitter_s = ttft_jitter_s
+        self.prefill_tokens_per_s = prefill_tokens_per_s
+        self.tokens_per_s_mean = tokens_per_s_mean
+        self.tokens_per_s_std = tokens_per_s_std
+        self.name = f"scripted:{responses_path or 'rules'}"
+
+        # Nodes build a fresh LLM per call, so the script queues and RNG are shared
+        # per responses file to keep canned responses consumed in order across calls
+        with ScriptedLLM._lock:
+            key = (responses_path, seed)
+            if key not in ScriptedLLM._shared:
+                scripted: Dict[str, List[str]] = {}
+                if responses_path:
+                    with open(responses_path, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                    scripted = {
+                        agent: [r if isinstance(r, str) else json.dumps(r) for r in responses]
+                        for agent, responses in raw.items()
+                    }
+                ScriptedLLM._shared[key] = (scripted, random.Random(seed))
+            self.scripted, self.rng = ScriptedLLM._shared[key]
+
+    def _simulated_latency(self, prompt_tokens: int, completion_tokens: int) -> float:
+        with ScriptedLLM._lock:
+            ttft = self.rng.gauss(self.ttft_mean_s, self.ttft_jitter_s)
+            rate = self.rng.gauss(self.tokens_per_s_mean, self.tokens_per_s_std)
+
+        latency = max(0.0, ttft)
+        if self.prefill_tokens_per_s > 0:
+            latency += prompt_tokens / self.prefill_tokens_per_s
+        if self.tokens_per_s_mean > 0:
+            latency += completion_tokens / max(1.0, rate)
+        return latency
+
+    def invoke(
+        self,
+        system_prompt: str,
+        human_prompt: str,
+        profile: Optional[Dict[str, Any]] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        agent = detect_agent(system_prompt)
+
+        with ScriptedLLM._lock:
+            queue = self.scripted.get(agent)
+            content = queue.pop(0) if queue else None
+        if content is None:
+            content = generate_scripted_response(agent, human_prompt)
+
+        latency = self._simulated_latency(
+            estimate_tokens(system_prompt) + estimate_tokens(human_prompt),
+            estimate_tokens(content),
+        )
+        if latency > 0:
+            time.sleep(latency)
+
+        return content
+
+
+# Optional limiter shared by every LLM call in the process (a threading or
+# multiprocessing semaphore), used by the service to throttle the backend
+_CONCURRENCY_LIMITER = None
+
+
+def set_concurrency_limiter(limiter) -> None:
+    """Install a semaphore bounding concurrent LLM calls; usable as a process pool initializer."""
+    global _CONCURRENCY_LIMITER
+    _CONCURRENCY_LIMITER = limiter
+
+
+JSON_REPAIR_SYSTEM_PROMPT = """
+You repair JSON responses. Given a JSON schema, validation errors, and an invalid
+response, output ONLY the corrected JSON object that satisfies the schema, keeping
+the original content wherever it is valid.
+"""
+
+
 class LLM:
     """
     Generic LLM wrapper that chooses the correct backend based on Config.SERVING_METHOD.
+    The agent name selects the generation profile (thinking effort, max tokens,
+    temperature) from GenerationConfig.
+
+    Calls go through the resilience layer: per-call deadline, bounded retries, and
+    hedging/failover to the backend in ResilienceConfig.LLM_HEDGE_SERVING_METHOD.
     """
 
-    def __init__(self, serving_method: str = "ollama"):
+    def __init__(self, serving_method: Optional[str] = None, agent: Optional[str] = None):
+        self.agent = agent
+        self.profile = get_generation_profile(agent)
+
         if serving_method is None:
             serving_method = Config.SERVING_METHOD
 
+        self._llm = self._build_backend(serving_method)
+
+        self._hedge_llm = None
+        hedge_method = ResilienceConfig.LLM_HEDGE_SERVING_METHOD
+        if hedge_method:
+            hedge_host = ResilienceConfig.OLLAMA_HEDGE_HOST if hedge_method == "ollama" else None
+            self._hedge_llm = self._build_backend(hedge_method, host=hedge_host)
+
+    @staticmethod
+    def _build_backend(serving_method: str, host: Optional[str] = None):
         if serving_method == "portkey":
-            self._llm = PortkeyLLM()
-        elif serving_method == "ollama":
-            self._llm = OllamaLLM()
-        else:
-            raise ValueError(
-                f"Unsupported SERVING_METHOD '{serving_method}'. "
-                "Expected 'portkey' or 'ollama'."
-            )
+            return PortkeyLLM()
+        if serving_method == "ollama":
+            return OllamaLLM(host=host)
+        if serving_method == "scripted":
+            return ScriptedLLM()
+        raise ValueError(
+            f"Unsupported SERVING_METHOD '{serving_method}'. "
+            "Expected 'portkey', 'ollama' or 'scripted'."
+        )
 
     @property
     def logger(self) -> Logger:
         # Expose the underlying logger
         return self._llm.logger
 
-    def invoke(self, system_prompt: str, human_prompt: str) -> str:
-        return self._llm.invoke(system_prompt, human_prompt)
\ No newline at end of file
+    def invoke(
+        self,
+        system_prompt: str,
+        human_prompt: str,
+        response_schema: Optional[Dict[str, Any]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        profile = profile or self.profile
+        backends = [
+            (llm.name, lambda llm=llm: llm.invoke(system_prompt, human_prompt, profile, response_schema))
+            for llm in (self._llm, self._hedge_llm)
+            if llm is not None
+        ]
+        if len(backends) == 2 and backends[0][0] == backends[1][0]:
+            backends.pop()
+
+        metrics = Metrics()
+        metrics.incr("llm.calls")
+        metrics.incr(f"llm.calls.{self.agent or 'default'}")
+        started = time.perf_counter()
+        with span(
+            "llm.invoke",
+            kind="llm",
+            agent=self.agent,
+            backend=self._llm.name,
+            prompt_chars=len(system_prompt) + len(human_prompt),
+            prompt_tokens_est=estimate_tokens(system_prompt) + estimate_tokens(human_prompt),
+            structured=response_schema is not None,
+        ) as s:
+            try:
+                content = call_with_resilience(backends, limiter=_CONCURRENCY_LIMITER)
+            finally:
+                metrics.observe("llm.latency_s", time.perf_counter() - started)
+            s.attributes["completion_chars"] = len(content or "")
+            s.attributes["completion_tokens_est"] = estimate_tokens(content or "")
+            return content
+
+    def invoke_json(
+        self,
+        system_prompt: str,
+        human_prompt: str,
+        response_schema: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Invoke with structured output and validate the result against response_schema.
+        Invalid output gets a cheap, targeted repair request (no thinking, small token
+        budget) rather than failing the run; ValueError is raised only if repairs fail.
+        """
+        content = self.invoke(system_prompt, human_prompt, response_schema=response_schema)
+
+        for attempt in range(ResilienceConfig.LLM_REPAIR_ATTEMPTS + 1):
+            obj = extract_json(content)
+            errors = ["response is not valid JSON"] if obj is None else validate_json(obj, response_schema)
+            if not errors:
+                return obj
+            if attempt == ResilienceConfig.LLM_REPAIR_ATTEMPTS:
+                break
+
+            self.logger.info(
+                f"[LLM] Response failed schema validation ({'; '.join(errors[:3])}); requesting repair...",
+                style="yellow",
+            )
+            repair_prompt = (
+                f"JSON schema:\n{json.dumps(response_schema)}\n\n"
+                f"Validation errors:\n" + "\n".join(f"- {e}" for e in errors) + "\n\n"
+                f"Invalid response:\n{content}\n"
+            )
+            content = self.invoke(
+                JSON_REPAIR_SYSTEM_PROMPT,
+                repair_prompt,
+                response_schema=response_schema,
+                profile=get_generation_profile("json_repair"),
+            )
+
+        raise ValueError(f"Could not parse {self.agent or 'LLM'} response as valid JSON: {'; '.join(errors[:3])}")
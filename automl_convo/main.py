@@ -4,6 +4,9 @@ Defines a chat based, shell like interface.
 """
 
 from utils.drivers import ConversationalAutoMLRunner
+from utils.router import router_report
+from utils.checkpoints import CheckpointStore
+from utils.logger import Logger
 import sys
 import os
 
@@ -14,6 +17,13 @@ Available commands:
   set_dataset <path>       Load a new CSV and create a new AutoML runner
   reset                    Reset the conversation state but keep current dataset
   show_state               Print internal conversation state summary
+  save_session <name>      Save the conversation (and keep saving it after every question)
+  load_session <name>      Resume a saved conversation, including its dataset
+  bg <question>            Answer a question in the background and return immediately
+  jobs                     List background jobs and their status
+  progress <job_id>        Show a background job's progress events
+  cancel <job_id>          Cancel a background job at the next step
+  checkpoints [id]         List unfinished AutoML runs, or inspect one checkpoint
   <any other text>         Will be treated as a natural-language AutoML question
 """
 
@@ -44,6 +54,8 @@ def main():
     print("Type 'help' for commands.\n")
 
     while True:
+        # Let queued (async) log output finish before prompting
+        Logger.flush()
         try:
             user_input = input("> ").strip()
         except (EOFError, KeyboardInterrupt):
@@ -74,6 +86,77 @@ def main():
                 print("[INFO] Runner reset with new dataset.\n")
             continue
 
+        if user_input.startswith("save_session"):
+            parts = user_input.split(maxsplit=1)
+            if len(parts) != 2:
+                print("Usage: save_session name")
+                continue
+
+            runner.save_session(parts[1].strip())
+            print(f"[INFO] Session saved as '{runner.session_name}'.\n")
+            continue
+
+        if user_input.startswith("load_session"):
+            parts = user_input.split(maxsplit=1)
+            if len(parts) != 2:
+                print("Usage: load_session name")
+                continue
+
+            try:
+                runner = ConversationalAutoMLRunner.resume(parts[1].strip())
+            except ValueError as e:
+                print(f"[ERROR] {e}")
+                continue
+            print(f"[INFO] Resumed session '{runner.session_name}' on {runner.csv_path}.\n")
+            continue
+
+        if user_input.startswith("bg "):
+            job = runner.ask_async(user_input[3:].strip())
+            print(f"[INFO] Started background job {job.job_id}.\n")
+            continue
+
+        if user_input.lower() == "jobs":
+            for job in runner.jobs.values():
+                print(f"{job.job_id}  {job.status:<9}  {job.question}")
+            print()
+            continue
+
+        if user_input.startswith("progress") or user_input.startswith("cancel"):
+            parts = user_input.split(maxsplit=1)
+            job = runner.jobs.get(parts[1].strip()) if len(parts) == 2 else None
+            if job is None:
+                print(f"Usage: {parts[0]} <job_id> (see 'jobs')")
+                continue
+
+            if parts[0] == "cancel":
+                job.cancel()
+                print(f"[INFO] Cancellation requested for job {job.job_id}.\n")
+                continue
+
+            for event in job.events():
+                details = {k: v for k, v in event.items() if k not in ("node", "time")}
+                print(f"- {event['node']}: {details}")
+            print(f"Status: {job.status}\n")
+            continue
+
+        if user_input.startswith("checkpoints"):
+            store = CheckpointStore()
+            parts = user_input.split(maxsplit=1)
+            if len(parts) == 2:
+                if not store.exists(parts[1].strip()):
+                    print(f"[ERROR] No checkpoint named '{parts[1].strip()}'.")
+                    continue
+                for key, value in store.inspect(parts[1].strip()).items():
+                    print(f"{key}: {value}")
+                print()
+                continue
+
+            for checkpoint_id in store.list_checkpoints():
+                info = store.inspect(checkpoint_id)
+                print(f"{checkpoint_id}  {info['status']:<9}  next={info['next_node']:<16}  {info['question']}")
+            print()
+            continue
+
         if user_input.lower() == "reset":
             runner = load_runner(runner.csv_path)
             print("[INFO] Conversation state reset.\n")
@@ -84,6 +167,13 @@ def main():
             print("\n--- Conversation State ---")
             print(f"Last AutoML State: {conv.last_automl_state is not None}")
             print(f"Q&A History Count: {len(conv.qa_history)}")
+            print(f"Stored Runs: {[key.run_id for key in conv.run_store.runs]}")
+            report = router_report()
+            saved = report["estimated_latency_saved_s"]
+            print(
+                f"Router Hits: {report['hits']:.0f}/{report['calls']:.0f} ({report['hit_rate']:.0%}), "
+                f"est. latency saved: {f'{saved:.1f}s' if saved is not None else 'n/a'}"
+            )
             print("--------------------------\n")
             continue
 
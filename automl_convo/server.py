@@ -0,0 +1,364 @@
+"""
+This file is the entrypoint of the multi-user conversational AutoML service.
+It serves a small HTTP/JSON API on asyncio, hosts one ConversationalAutoMLRunner
+per session, runs conversation turns and background jobs on separate bounded
+thread pools (both counted by admission control), schedules new
+AutoML runs onto a bounded process pool, and throttles LLM calls with a
+concurrency limit shared by all threads and worker processes.
+
+Endpoints:
+  GET  /health                        Liveness and load summary
+  GET  /metrics                       Process-wide metrics snapshot
+  POST /sessions                      {"csv_path", "max_iterations"?} -> {"session_id"}
+  GET  /sessions/<id>                 Session summary
+  POST /sessions/<id>/ask             {"question"} -> {"answer", "latency_s"}
+  DELETE /sessions/<id>               Close a session (queued questions fail with 410)
+  POST /sessions/<id>/jobs            {"question"} -> {"job_id"}; answered in the background
+  GET  /sessions/<id>/jobs/<job>?since=N  Job status plus progress events from index N
+  DELETE /sessions/<id>/jobs/<job>    Cancel a background job
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from utils.drivers import ConversationalAutoMLRunner
+from utils.metrics import Metrics
+from llm import set_concurrency_limiter
+from config import ServiceConfig
+import multiprocessing
+import threading
+import argparse
+import asyncio
+import signal
+import json
+import time
+import uuid
+import os
+
+HTTP_REASONS = {
+    200: "OK",
+    201: "Created",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    410: "Gone",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SessionWorker:
+    """One conversation: its runner plus a bounded FIFO of questions processed in order."""
+
+    def __init__(self, session_id: str, runner: ConversationalAutoMLRunner, queue_size: int):
+        self.session_id = session_id
+        self.runner = runner
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.created_at = time.time()
+        self.questions_answered = 0
+
+
+class AutoMLService:
+    def __init__(
+        self,
+        max_sessions: int = ServiceConfig.SERVICE_MAX_SESSIONS,
+        max_pending: int = ServiceConfig.SERVICE_MAX_PENDING,
+        session_queue_size: int = ServiceConfig.SERVICE_SESSION_QUEUE_SIZE,
+        max_threads: int = ServiceConfig.SERVICE_MAX_THREADS,
+        max_job_threads: int = ServiceConfig.SERVICE_MAX_JOB_THREADS,
+        max_processes: int = ServiceConfig.SERVICE_MAX_PROCESSES,
+        llm_concurrency: int = ServiceConfig.SERVICE_LLM_CONCURRENCY,
+    ):
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.session_queue_size = session_queue_size
+        self.sessions: Dict[str, SessionWorker] = {}
+        self.pending = 0
+        self.metrics = Metrics()
+
+        # One LLM limiter shared by this process's threads and every worker process
+        self._manager = multiprocessing.get_context("spawn").Manager()
+        llm_limiter = self._manager.BoundedSemaphore(llm_concurrency)
+        set_concurrency_limiter(llm_limiter)
+
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="turn")
+        self.job_pool = ThreadPoolExecutor(max_workers=max_job_threads, thread_name_prefix="job")
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=max_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=set_concurrency_limiter,
+            initargs=(llm_limiter,),
+        )
+
+    def shutdown(self):
+        for worker in self.sessions.values():
+            if worker.task is not None:
+                worker.task.cancel()
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        self.job_pool.shutdown(wait=False, cancel_futures=True)
+        self.process_pool.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+    # ---- Session handling -------------------------------------------------
+
+    def create_session(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        csv_path = body.get("csv_path")
+        if not csv_path or not os.path.exists(csv_path):
+            raise HTTPError(400, f"Dataset not found: {csv_path}")
+        if len(self.sessions) >= self.max_sessions:
+            raise HTTPError(503, "Session limit reached.")
+
+        session_id = uuid.uuid4().hex[:12]
+        runner = ConversationalAutoMLRunner(
+            csv_path=csv_path,
+            max_iterations=int(body.get("max_iterations", 3)),
+            temp_dir=os.path.join("tmp_datasets", session_id),
+            session_name=session_id if ServiceConfig.SERVICE_PERSIST_SESSIONS else None,
+            run_executor=self.process_pool,
+            session_id=session_id,
+        )
+        worker = SessionWorker(session_id, runner, self.session_queue_size)
+        worker.task = asyncio.create_task(self._session_loop(worker))
+        self.sessions[session_id] = worker
+        self.metrics.incr("service.sessions_created")
+        return {"session_id": session_id}
+
+    def _get_session(self, session_id: str) -> SessionWorker:
+        worker = self.sessions.get(session_id)
+        if worker is None:
+            raise HTTPError(404, f"Unknown session '{session_id}'.")
+        return worker
+
+    async def close_session(self, session_id: str) -> Dict[str, Any]:
+        worker = self._get_session(session_id)
+        # Unlisted first, so no new question can be queued
+        del self.sessions[session_id]
+
+        # Queued questions will never be answered: fail their callers and release them
+        while not worker.queue.empty():
+            _, future = worker.queue.get_nowait()
+            if not future.done():
+                future.set_exception(HTTPError(410, f"Session '{session_id}' was closed."))
+            self.pending -= 1
+
+        # The loop exits at the sentinel once the in-flight turn (if any) has answered its
+        # caller; shielded so a dropped close request does not cut that turn short
+        worker.queue.put_nowait(None)
+        await asyncio.shield(worker.task)
+        return {"closed": session_id}
+
+    def session_summary(self, session_id: str) -> Dict[str, Any]:
+        worker = self._get_session(session_id)
+        conv = worker.runner.conv_state
+        return {
+            "session_id": session_id,
+            "csv_path": worker.runner.csv_path,
+            "queued": worker.queue.qsize(),
+            "questions_answered": worker.questions_answered,
+            "stored_runs": [key.run_id for key in conv.run_store.runs],
+        }
+
+    async def _session_loop(self, worker: SessionWorker):
+        """Answer a session's questions one at a time, in arrival order."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await worker.queue.get()
+            if item is None:
+                # Closed by close_session
+                return
+            question, future = item
+            started = time.perf_counter()
+            try:
+                answer = await loop.run_in_executor(self.thread_pool, worker.runner.ask, question)
+                if not future.done():
+                    future.set_result(answer)
+                worker.questions_answered += 1
+                self.metrics.incr("service.questions_answered")
+            except Exception as e:
+                self.metrics.incr("service.questions_failed")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.metrics.observe("service.turn_latency_s", time.perf_counter() - started)
+                self.pending -= 1
+
+    async def ask(self, session_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        worker = self._get_session(session_id)
+        question = (body.get("question") or "").strip()
+        if not question:
+            raise HTTPError(400, "Missing 'question'.")
+
+        # Admission control: global in-flight bound and per-session queue bound
+        if self.pending >= self.max_pending:
+            self.metrics.incr("service.rejected")
+            raise HTTPError(429, "Server is at capacity; retry later.")
+        if worker.queue.full():
+            self.metrics.incr("service.rejected")
+            raise HTTPError(429, "Too many queued questions for this session.")
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        worker.queue.put_nowait((question, future))
+
+        started = time.perf_counter()
+        answer = await future
+        return {"answer": answer, "latency_s": time.perf_counter() - started}
+
+    def start_job(self, session_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        worker = self._get_session(session_id)
+        question = (body.get("question") or "").strip()
+        if not question:
+            raise HTTPError(400, "Missing 'question'.")
+        if self.pending >= self.max_pending:
+            self.metrics.incr("service.rejected")
+            raise HTTPError(429, "Server is at capacity; retry later.")
+
+        # A job holds a pending slot like a queued question until it finishes; the
+        # callback runs on the job's thread, so the release is handed to the event loop
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            job = worker.runner.ask_async(
+                question,
+                executor=self.job_pool,
+                on_finish=lambda _: loop.call_soon_threadsafe(self._release_job),
+            )
+        except Exception:
+            self.pending -= 1
+            raise
+        self.metrics.incr("service.jobs_started")
+        return {"job_id": job.job_id}
+
+    def _release_job(self):
+        self.pending -= 1
+        self.metrics.incr("service.jobs_finished")
+
+    def job_status(self, session_id: str, job_id: str, since: int = 0, cancel: bool = False) -> Dict[str, Any]:
+        job = self._get_session(session_id).runner.jobs.get(job_id)
+        if job is None:
+            raise HTTPError(404, f"Unknown job '{job_id}'.")
+        if cancel:
+            job.cancel()
+        return {**job.summary(), "events": job.events(since)}
+
+    # ---- HTTP -------------------------------------------------------------
+
+    async def route(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        path, _, query = path.partition("?")
+        params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["health"] and method == "GET":
+            return 200, {
+                "status": "ok",
+                "sessions": len(self.sessions),
+                "pending": self.pending,
+                "threads": threading.active_count(),
+            }
+        if parts == ["metrics"] and method == "GET":
+            return 200, self.metrics.snapshot()
+        if parts == ["sessions"] and method == "POST":
+            return 201, self.create_session(body)
+        if len(parts) == 2 and parts[0] == "sessions":
+            if method == "GET":
+                return 200, self.session_summary(parts[1])
+            if method == "DELETE":
+                return 200, await self.close_session(parts[1])
+        if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "ask":
+            if method != "POST":
+                raise HTTPError(405, "Use POST.")
+            return 200, await self.ask(parts[1], body)
+        if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "jobs" and method == "POST":
+            return 202, self.start_job(parts[1], body)
+        if len(parts) == 4 and parts[0] == "sessions" and parts[2] == "jobs":
+            if method == "GET":
+                return 200, self.job_status(parts[1], parts[3], since=int(params.get("since", 0)))
+            if method == "DELETE":
+                return 200, self.job_status(parts[1], parts[3], cancel=True)
+
+        raise HTTPError(404, f"No route for {method} {path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                raw = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                try:
+                    body = json.loads(raw) if raw else {}
+                    status, payload = await self.route(method.upper(), path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except json.JSONDecodeError:
+                    status, payload = 400, {"error": "Body must be JSON."}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                data = json.dumps(payload, default=str).encode("utf-8")
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int):
+    service = AutoMLService()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"[INFO] Conversational AutoML service listening on http://{host}:{port}")
+
+    # Stop cleanly on SIGTERM/SIGINT so pool workers and the manager process exit too
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        service.shutdown()
+        print("\nExiting...")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-user conversational AutoML service.")
+    parser.add_argument("--host", default=ServiceConfig.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=ServiceConfig.SERVICE_PORT)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
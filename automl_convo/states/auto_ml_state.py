@@ -4,12 +4,15 @@ It includes dataframes, profiling info, preprocessing details, modeling plans,
 feature engineering steps, datasets history, and iteration history.
 """
 
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, field
-from sklearn.pipeline import Pipeline
 import pandas as pd
 import numpy as np
 
+if TYPE_CHECKING:
+    # Annotation only; scikit-learn is loaded when a pipeline is first built
+    from sklearn.pipeline import Pipeline
+
 @dataclass
 class AutoMLState:
     # Core data
@@ -37,14 +40,27 @@ class AutoMLState:
     X_processed: Optional[np.ndarray] = None
     y: Optional[np.ndarray] = None
     used_features: Optional[List[str]] = None
+    # Original feature behind each X_processed column (one-hot columns repeat it); None under PCA
+    processed_feature_map: Optional[List[str]] = None
     planned_models: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+    # Cost model estimates per candidate model (fold_s, total_s, expected_quality, planned, ...)
+    model_plan_estimates: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     model_results: Optional[Dict[str, Dict[str, Any]]] = None
-    clean_pipeline: Optional[Pipeline] = None
+    clean_pipeline: Optional["Pipeline"] = None
+
+    # Training time budgets in seconds (None or 0: unlimited) and per-model outcome
+    # ({"status": "ok" | "timed_out" | "failed" | "skipped", "folds_completed", ...})
+    model_time_budget_s: Optional[float] = None
+    iteration_time_budget_s: Optional[float] = None
+    training_status: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
     # Feature engineering
     feature_engineer_plan: Optional[Dict[str, Any]] = None
     feature_critic_plan: Optional[Dict[str, Any]] = None
     last_transforms_applied: List[Dict[str, Any]] = field(default_factory=list)
+    # Screening of each batch of proposals; an iteration whose proposals all fail is skipped
+    feature_screening_history: List[Dict[str, Any]] = field(default_factory=list)
+    iteration_skipped: bool = False
 
     # Datasets history
     temp_dir: str = "augmented_datasets"
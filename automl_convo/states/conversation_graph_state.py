@@ -3,7 +3,7 @@ This file defines the main conversational graph state that is used by the main
 driver.
 """
 
-from typing import TypedDict, Optional, Any, Dict
+from typing import TypedDict, Optional, Any, Callable, Dict
 from states.conversation_state import ConversationState
 
 class ConversationGraphState(TypedDict):
@@ -13,4 +13,7 @@ class ConversationGraphState(TypedDict):
     max_iterations: int
     temp_dir: str
     decision: Optional[Dict[str, Any]]
-    answer: Optional[str]
\ No newline at end of file
+    answer: Optional[str]
+    run_executor: Optional[Any]  # concurrent.futures executor for new AutoML runs, if any
+    on_event: Optional[Callable[[Dict[str, Any]], None]]  # progress callback for background jobs
+    cancel_event: Optional[Any]  # threading.Event that cancels a background job's run
\ No newline at end of file
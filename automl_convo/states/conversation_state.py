@@ -4,14 +4,17 @@ This file defines the current conversation state across multiple questions.
 
 from typing import Optional, List, Dict
 from states.auto_ml_state import AutoMLState
+from states.run_store import RunStore
 from dataclasses import dataclass, field
 
 @dataclass
 class ConversationState:
     """
     Holds long-lived state across multiple user questions.
-    - last_automl_state: the AutoMLState from the most recent full run
+    - last_automl_state: the AutoMLState from the most recent full run (or reused run)
+    - run_store: every completed run, indexed by dataset/target/task/PCA
     - qa_history: list of {question, answer} for conversational context
     """
     last_automl_state: Optional[AutoMLState] = None
+    run_store: RunStore = field(default_factory=RunStore)
     qa_history: List[Dict[str, str]] = field(default_factory=list)
@@ -0,0 +1,73 @@
+"""
+This file defines the run store, which indexes completed AutoML runs by
+(dataset fingerprint, target column, task type, PCA setting) so the conversation
+layer can reuse any earlier run instead of only the most recent one.
+"""
+
+from typing import Optional, Dict, List
+from dataclasses import dataclass, field
+from states.auto_ml_state import AutoMLState
+
+
+@dataclass(frozen=True)
+class RunKey:
+    dataset_fingerprint: str
+    target_column: str
+    task_type: str
+    use_pca: bool
+
+    @property
+    def run_id(self) -> str:
+        pca = "pca" if self.use_pca else "no_pca"
+        return f"{self.target_column}:{self.task_type}:{pca}:{self.dataset_fingerprint[:8]}"
+
+
+@dataclass
+class RunStore:
+    """
+    Holds the final AutoMLState (results, histories, fitted preprocessing pipeline)
+    of every completed run. A rerun with the same key replaces the older entry.
+    Lookups iterate over a snapshot, so a store can be shared by concurrent runners.
+    """
+    runs: Dict[RunKey, AutoMLState] = field(default_factory=dict)
+
+    def add(self, dataset_fingerprint: str, state: AutoMLState) -> RunKey:
+        key = RunKey(
+            dataset_fingerprint=dataset_fingerprint,
+            target_column=state.target_column,
+            task_type=state.task_type,
+            use_pca=bool(state.use_pca),
+        )
+        # Re-insert so iteration order stays most-recent-last
+        self.runs.pop(key, None)
+        self.runs[key] = state
+        return key
+
+    def get(self, run_id: str) -> Optional[AutoMLState]:
+        for key, state in list(self.runs.items()):
+            if key.run_id == run_id:
+                return state
+        return None
+
+    def key_of(self, state: AutoMLState) -> Optional[RunKey]:
+        """Key under which this exact state object is stored, if any."""
+        for key, stored in list(self.runs.items()):
+            if stored is state:
+                return key
+        return None
+
+    def find(
+        self,
+        dataset_fingerprint: str,
+        target_column: Optional[str] = None,
+        task_type: Optional[str] = None,
+        use_pca: Optional[bool] = None,
+    ) -> List[RunKey]:
+        """Keys matching the given fields (None matches anything), most recent last."""
+        return [
+            key for key in list(self.runs)
+            if key.dataset_fingerprint == dataset_fingerprint
+            and (target_column is None or key.target_column == target_column)
+            and (task_type is None or key.task_type == task_type)
+            and (use_pca is None or key.use_pca == use_pca)
+        ]
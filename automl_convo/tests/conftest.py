@@ -0,0 +1,9 @@
+"""
+This file makes the automl_convo modules importable from the tests, the same way
+they are when the entrypoints are run from this directory.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,110 @@
+"""
+Tests for the successive-halving hyperparameter search and its time budget.
+"""
+
+from utils.hyperparameter_search import _rungs, _sample_candidates, search_hyperparameters, SEARCH_SPACES
+from utils.training_workers import BudgetedTrainer, MODEL_TIMED_OUT, MODEL_FAILED
+from sklearn.model_selection import StratifiedKFold
+import numpy as np
+import math
+import time
+
+
+def _data(n_rows=3000, n_features=40):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_rows, n_features))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(size=n_rows) > 0).astype(int)
+    folds = list(StratifiedKFold(n_splits=3, shuffle=True, random_state=42).split(X, y))
+    return X, y, folds
+
+
+def test_rungs_shrink_by_eta_and_end_one_step_below_the_full_resource():
+    assert _rungs(9, 3) == [(9, 1 / 9), (3, 1 / 3)]
+    assert _rungs(10, 3) == [(10, 1 / 27), (4, 1 / 9), (2, 1 / 3)]
+    assert _rungs(2, 2) == [(2, 1 / 2)]
+
+    for n, eta in [(5, 2), (9, 3), (27, 3), (30, 4)]:
+        rungs = _rungs(n, eta)
+        assert rungs[0][0] == n
+        assert math.isclose(rungs[-1][1], 1 / eta)
+        for (n_prev, f_prev), (n_next, f_next) in zip(rungs, rungs[1:]):
+            assert n_next == math.ceil(n_prev / eta)
+            assert math.isclose(f_next, f_prev * eta)
+
+
+def test_sample_candidates_start_with_the_planned_params_and_are_distinct():
+    grid, _ = SEARCH_SPACES["decision_tree_clf"]
+    planned = {"max_depth": 5, "random_state": 42}
+
+    candidates = _sample_candidates(planned, grid, 9)
+    assert candidates[0] == planned
+    assert len(candidates) == 9
+    assert len({repr(sorted(c.items())) for c in candidates}) == 9
+    # Grid points keep the planned parameters the grid does not cover
+    assert all(c["random_state"] == 42 for c in candidates)
+    # Seeded, so a question always gets the same search
+    assert _sample_candidates(planned, grid, 9) == candidates
+
+
+def test_sample_candidates_are_capped_at_the_grid_size():
+    grid = {"C": [0.1, 1.0, 10.0]}
+    # Off the grid, the planned point adds one candidate; on it, it is one of the grid points
+    assert len(_sample_candidates({"C": 3.0}, grid, 10)) == 4
+    candidates = _sample_candidates({"C": 1.0}, grid, 10)
+    assert candidates[0] == {"C": 1.0}
+    assert sorted(c["C"] for c in candidates) == [0.1, 1.0, 10.0]
+
+
+def test_search_stops_at_its_budget_and_keeps_a_result():
+    X, y, folds = _data()
+    progress = []
+    budget_s = 0.3
+    started = time.monotonic()
+    result = search_hyperparameters(
+        "mlp_classifier", {"max_iter": 200, "random_state": 42}, X, y, folds, "accuracy",
+        budget_s=budget_s, on_progress=progress.append,
+    )
+    elapsed = time.monotonic() - started
+
+    assert result["stopped_early"]
+    # The deadline is checked between fits, so it overruns by at most a few short fits
+    assert elapsed < budget_s + 3.0
+    assert progress and progress[0]["trace"] == []
+    assert result["best_params"] in _sample_candidates({"max_iter": 200, "random_state": 42}, SEARCH_SPACES["mlp_classifier"][0], result["candidates"])
+
+
+def test_search_in_the_worker_is_killed_at_the_model_deadline():
+    X, y, folds = _data()
+    slow = {"hidden_layer_sizes": (256, 256), "max_iter": 200, "tol": 0.0, "n_iter_no_change": 100000}
+    with BudgetedTrainer(X, y, model_budget_s=1.5, iteration_budget_s=None) as trainer:
+        trainer._ready_worker()
+        worker = trainer._worker
+        trainer.begin_model()
+        started = time.monotonic()
+        # A search budget beyond the model budget is still cut off at the model's deadline
+        searched = trainer.search("mlp_classifier", slow, folds, "accuracy", budget_s=60.0, fold_s=None)
+        result = searched["search"]
+        assert searched["status"] == MODEL_TIMED_OUT
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 3.0
+        assert not worker.alive
+        assert result["stopped_early"]
+        # No rung completed, so the planned parameters are kept
+        assert result["best_params"] == slow
+        # The search used the model's budget, leaving nothing for its cross-validation
+        outcome = trainer.cross_validate("mlp_classifier", slow, folds, "accuracy")
+        assert outcome["scores"] == []
+
+
+def test_search_error_in_the_worker_is_reported():
+    X, y, folds = _data(n_rows=300)
+    with BudgetedTrainer(X, y, model_budget_s=30.0, iteration_budget_s=None) as trainer:
+        trainer.begin_model()
+        # An iteration count that is not a number breaks the resource schedule
+        searched = trainer.search("mlp_classifier", {"max_iter": "many"}, folds, "accuracy", budget_s=10.0, fold_s=None)
+
+        assert searched["status"] == MODEL_FAILED
+        assert searched["search"] is None
+        assert "TypeError" in searched["error"]
+        assert trainer._worker.alive
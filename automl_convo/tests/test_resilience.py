@@ -0,0 +1,124 @@
+"""
+Tests for the circuit breaker, hedging, failover and deadlines of the LLM resilience layer.
+"""
+
+from utils.resilience import CircuitBreaker, LLMCallError, call_with_resilience
+from config import ResilienceConfig
+import threading
+import pytest
+import time
+import uuid
+
+
+def _name(label: str) -> str:
+    # Breakers are process-wide, so every test uses fresh backend names
+    return f"{label}-{uuid.uuid4().hex[:8]}"
+
+
+def _open_breaker(name: str, reset_s: float) -> CircuitBreaker:
+    breaker = CircuitBreaker.get(name)
+    breaker.reset_s = reset_s
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def _fail():
+    raise ConnectionError("backend down")
+
+
+def test_breaker_admits_one_half_open_trial_and_closes_on_success():
+    breaker = _open_breaker(_name("primary"), reset_s=0.05)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # The trial re-arms the timer, so concurrent calls keep waiting
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_half_open_backend_recovers_through_a_call():
+    name = _name("primary")
+    _open_breaker(name, reset_s=0.05)
+    with pytest.raises(LLMCallError):
+        call_with_resilience([(name, lambda: "ok")], timeout_s=1.0, max_retries=0)
+
+    time.sleep(0.06)
+    assert call_with_resilience([(name, lambda: "ok")], timeout_s=1.0, max_retries=0) == "ok"
+    assert CircuitBreaker.get(name).state == "closed"
+
+
+def test_unlaunched_backend_keeps_its_half_open_trial():
+    primary, secondary = _name("primary"), _name("secondary")
+    breaker = _open_breaker(secondary, reset_s=0.05)
+    time.sleep(0.06)
+
+    # The primary answers, so the secondary is never sent a request
+    assert call_with_resilience([(primary, lambda: "ok"), (secondary, lambda: "hedged")], timeout_s=1.0, max_retries=0) == "ok"
+    assert breaker.state == "half_open"
+
+
+def test_failover_to_the_next_backend_when_the_first_fails():
+    primary, secondary = _name("primary"), _name("secondary")
+    assert call_with_resilience([(primary, _fail), (secondary, lambda: "from secondary")], timeout_s=1.0, max_retries=0) == "from secondary"
+    assert CircuitBreaker.get(primary).failures == 1
+
+
+def test_open_primary_is_skipped_for_the_next_backend():
+    primary, secondary = _name("primary"), _name("secondary")
+    _open_breaker(primary, reset_s=60.0)
+    assert call_with_resilience([(primary, lambda: "primary"), (secondary, lambda: "secondary")], timeout_s=1.0, max_retries=0) == "secondary"
+
+
+def test_slow_backend_is_hedged(monkeypatch):
+    monkeypatch.setattr(ResilienceConfig, "LLM_HEDGE_DEFAULT_DELAY_S", 0.05)
+    primary, secondary = _name("primary"), _name("secondary")
+
+    def slow():
+        time.sleep(1.0)
+        return "slow"
+
+    started = time.monotonic()
+    assert call_with_resilience([(primary, slow), (secondary, lambda: "fast")], timeout_s=5.0, max_retries=0) == "fast"
+    assert time.monotonic() - started < 0.9
+
+
+def test_deadline_bounds_a_hung_backend():
+    def hung():
+        time.sleep(2.0)
+        return "late"
+
+    started = time.monotonic()
+    with pytest.raises(LLMCallError) as excinfo:
+        call_with_resilience([(_name("primary"), hung)], timeout_s=0.2, max_retries=0)
+    assert isinstance(excinfo.value.__cause__, TimeoutError)
+    assert time.monotonic() - started < 1.0
+
+
+def test_limiter_is_released_during_backoff(monkeypatch):
+    limiter = threading.Semaphore(1)
+    free_during_backoff = []
+
+    def backoff_sleep(seconds):
+        acquired = limiter.acquire(blocking=False)
+        free_during_backoff.append(acquired)
+        if acquired:
+            limiter.release()
+
+    monkeypatch.setattr("utils.resilience.time.sleep", backoff_sleep)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("first call fails")
+        return "ok"
+
+    assert call_with_resilience([(_name("primary"), flaky)], timeout_s=1.0, max_retries=1, limiter=limiter) == "ok"
+    assert free_during_backoff == [True]
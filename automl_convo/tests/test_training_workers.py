@@ -0,0 +1,67 @@
+"""
+Tests for the killable training workers behind the per-model time budgets.
+"""
+
+from utils.training_workers import BudgetedTrainer, MODEL_OK, MODEL_TIMED_OUT, MODEL_FAILED
+from sklearn.model_selection import KFold
+import numpy as np
+import time
+
+# An MLP that cannot converge early on this data runs far past any test budget
+SLOW_PARAMS = {
+    "hidden_layer_sizes": (256, 256),
+    "max_iter": 100000,
+    "tol": 0.0,
+    "n_iter_no_change": 100000,
+}
+
+
+def _data(n_rows=2000, n_features=20):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_rows, n_features))
+    y = (X[:, 0] + rng.normal(size=n_rows) > 0).astype(int)
+    return X, y
+
+
+def test_slow_fit_is_killed_at_the_model_budget():
+    X, y = _data()
+    with BudgetedTrainer(X, y, model_budget_s=1.0, iteration_budget_s=None) as trainer:
+        trainer._ready_worker()
+        worker = trainer._worker
+        started = time.monotonic()
+        outcome = trainer.fit("mlp_classifier", SLOW_PARAMS)
+        elapsed = time.monotonic() - started
+
+        assert outcome["status"] == MODEL_TIMED_OUT
+        assert outcome["model"] is None
+        assert elapsed < 5.0
+        assert not worker.alive
+
+        # The killed worker is replaced for the next model
+        outcome = trainer.fit("logistic_regression", {})
+        assert outcome["status"] == MODEL_OK
+        assert outcome["model"] is not None
+
+
+def test_slow_cross_validation_is_killed_and_keeps_no_scores():
+    X, y = _data()
+    folds = list(KFold(n_splits=3, shuffle=True, random_state=42).split(X, y))
+    with BudgetedTrainer(X, y, model_budget_s=1.0, iteration_budget_s=None) as trainer:
+        started = time.monotonic()
+        outcome = trainer.cross_validate("mlp_classifier", SLOW_PARAMS, folds, "accuracy")
+
+        assert outcome["status"] == MODEL_TIMED_OUT
+        assert outcome["scores"] == []
+        assert time.monotonic() - started < 5.0
+
+
+def test_fit_error_is_reported_instead_of_a_timeout():
+    X, y = _data(n_rows=200)
+    with BudgetedTrainer(X, y, model_budget_s=30.0, iteration_budget_s=None) as trainer:
+        outcome = trainer.fit("logistic_regression", {"C": -1.0})
+
+        assert outcome["status"] == MODEL_FAILED
+        assert outcome["model"] is None
+        assert "C" in outcome["error"]
+        # A failed fit leaves the worker usable
+        assert trainer._worker.alive
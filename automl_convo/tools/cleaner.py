@@ -4,15 +4,17 @@ This file defines the data cleaner tool node.
 
 from states.auto_ml_state import AutoMLState
 from utils.logger import Logger
-from sklearn.compose import ColumnTransformer
-from sklearn.decomposition import PCA
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
 import pandas as pd 
 
 
 def clean_node(state: AutoMLState) -> AutoMLState:
+    # scikit-learn is imported on first use rather than at startup
+    from sklearn.compose import ColumnTransformer
+    from sklearn.decomposition import PCA
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
     logger = Logger()
 
     logger.info("[CLEAN NODE] Building preprocessing pipeline and transforming data...", style="green")
@@ -103,5 +105,17 @@ def clean_node(state: AutoMLState) -> AutoMLState:
     state.y = y
     state.used_features = list(X.columns)
     state.clean_pipeline = pipeline
+    state.processed_feature_map = None if len(steps) > 1 else _processed_feature_map(
+        preprocessor, numeric_features, categorical_features, X_processed.shape[1]
+    )
 
     return state
+
+
+def _processed_feature_map(preprocessor, numeric_features, categorical_features, width):
+    """Original column of each output column: numeric ones in order, then each category's one-hot column."""
+    mapping = list(numeric_features)
+    if categorical_features:
+        encoder = preprocessor.named_transformers_["cat"].named_steps["onehot"]
+        mapping += [c for c, categories in zip(categorical_features, encoder.categories_) for _ in categories]
+    return mapping if len(mapping) == width else None
@@ -0,0 +1,141 @@
+"""
+This file defines the feature pruning tool node, run after each trained iteration so
+df_current does not keep widening as features are engineered. A feature is dropped
+when its normalized importance stayed below a fraction of an even share in each of
+the last few iterations (feature_metrics_history) and it shows no direct signal with
+the target either (the screening statistic; importances of a model that memorizes
+identifier-like columns can starve real predictors), or when it is a near-duplicate
+of another numeric column (the less important of the pair is dropped). Decisions are
+recorded on the iteration's history record, so the analysis can explain them.
+"""
+
+from typing import Any, Dict, List, Set
+from states.auto_ml_state import AutoMLState
+from utils.logger import Logger
+from utils.metrics import Metrics
+from tools.feature_screener import target_signals
+from config import PruningConfig
+import pandas as pd
+import numpy as np
+
+
+def low_importance_features(state: AutoMLState, candidates: List[str]) -> List[Dict[str, Any]]:
+    """Candidates below the importance floor in each of the last PRUNE_WINDOW iterations and without target signal."""
+    window = state.feature_metrics_history[-PruningConfig.PRUNE_WINDOW:]
+    if len(window) < PruningConfig.PRUNE_WINDOW:
+        return []
+
+    shares = []
+    for metrics in window:
+        importances = {fi["feature"]: fi["importance_norm"] for fi in metrics.get("feature_importances") or []}
+        if not importances:
+            return []
+        # Relative to an even share, so the floor does not depend on the number of features
+        shares.append({f: v * len(importances) for f, v in importances.items()})
+
+    low = {}
+    for feature in candidates:
+        relative = [share.get(feature) for share in shares]
+        if all(r is not None and r < PruningConfig.PRUNE_MIN_RELATIVE_IMPORTANCE for r in relative):
+            low[feature] = relative
+    if not low:
+        return []
+
+    signals, threshold = target_signals(state.df_current, state.target_column, state.task_type, list(low))
+    return [
+        {
+            "feature": feature,
+            "reason": "low_importance",
+            "relative_importance": [round(r, 4) for r in relative],
+            "signal": round(signals[feature], 4),
+        }
+        for feature, relative in low.items()
+        if signals[feature] < threshold
+    ]
+
+
+def near_duplicate_features(df: pd.DataFrame, candidates: List[str], importance: Dict[str, float]) -> List[Dict[str, Any]]:
+    """For each highly correlated numeric pair, the less important (or the later) column."""
+    numeric = [c for c in candidates if pd.api.types.is_numeric_dtype(df[c])]
+    if len(numeric) < 2:
+        return []
+    if len(df) > PruningConfig.PRUNE_SAMPLE_ROWS:
+        df = df.sample(n=PruningConfig.PRUNE_SAMPLE_ROWS, random_state=42)
+
+    X = df[numeric].to_numpy(dtype=float)
+    X = np.where(np.isfinite(X), X, np.nan)
+    with np.errstate(all="ignore"):
+        X = np.nan_to_num(np.where(np.isnan(X), np.nanmedian(X, axis=0), X))
+    std = X.std(axis=0)
+    X = (X - X.mean(axis=0)) / np.where(std > 0, std, 1.0)
+    corr = np.abs(X.T @ X / len(X))
+    corr[np.arange(len(numeric)), np.arange(len(numeric))] = 0.0
+    # Constant columns carry no information to duplicate
+    corr[std == 0, :] = 0.0
+    corr[:, std == 0] = 0.0
+
+    pruned, dropped = [], set()
+    rows, cols = np.where(np.triu(corr) >= PruningConfig.PRUNE_DUPLICATE_CORRELATION)
+    for i, j in sorted(zip(rows, cols), key=lambda ij: -corr[ij]):
+        a, b = numeric[i], numeric[j]
+        if a in dropped or b in dropped:
+            continue
+        # Ties keep the earlier column, which is the original or the older engineered one
+        drop, keep = (a, b) if importance.get(a, 0.0) < importance.get(b, 0.0) else (b, a)
+        dropped.add(drop)
+        pruned.append({
+            "feature": drop,
+            "reason": "near_duplicate",
+            "duplicate_of": keep,
+            "correlation": round(float(corr[i, j]), 4),
+        })
+    return pruned
+
+
+def prune_features_node(state: AutoMLState) -> AutoMLState:
+    logger = Logger()
+    metrics = Metrics()
+
+    if not PruningConfig.PRUNING_ENABLED or not state.history or state.df_current is None:
+        return state
+    # No iteration follows the last one, so there is nothing to shrink
+    if state.iteration >= state.max_iterations:
+        return state
+
+    candidates = [c for c in state.df_current.columns if c != state.target_column]
+    latest = state.feature_metrics_history[-1] if state.feature_metrics_history else {}
+    importance = {fi["feature"]: fi["importance_norm"] for fi in latest.get("feature_importances") or []}
+
+    decisions = near_duplicate_features(state.df_current, candidates, importance)
+    seen: Set[str] = {d["feature"] for d in decisions}
+    decisions += [d for d in low_importance_features(state, candidates) if d["feature"] not in seen]
+
+    # Drop the least important first when the cap cuts the list short
+    limit = int(len(candidates) * PruningConfig.PRUNE_MAX_FRACTION)
+    decisions.sort(key=lambda d: importance.get(d["feature"], 0.0))
+    decisions = decisions[:limit]
+
+    record = state.history[-1]
+    record["pruned_features"] = decisions
+    if not decisions:
+        return state
+
+    dropped = [d["feature"] for d in decisions]
+    state.df_current = state.df_current.drop(columns=dropped)
+    # Keep the schema shown to the agents in step with the data
+    if state.schema is not None:
+        for feature in dropped:
+            state.schema.pop(feature, None)
+    metrics.incr("pruning.features_dropped", len(dropped))
+
+    lines = []
+    for d in decisions:
+        if d["reason"] == "near_duplicate":
+            lines.append(f"{d['feature']}: near-duplicate of {d['duplicate_of']} (|corr|={d['correlation']:.3f})")
+        else:
+            lines.append(f"{d['feature']}: low importance in the last {len(d['relative_importance'])} iterations "
+                         f"({', '.join(f'{r:.2f}' for r in d['relative_importance'])} of an even share, |corr|={d['signal']:.3f})")
+    lines.append(f"\n{len(candidates)} -> {len(candidates) - len(dropped)} features")
+    logger.box("FEATURE PRUNING", "\n".join(lines), style="blue")
+
+    return state
@@ -0,0 +1,213 @@
+"""
+This file defines the feature screening tool node, run between apply_transforms and
+clean. On a row sample it scores every proposed transformation by the new columns it
+added: their correlation with the target (vectorized across columns; categorical
+columns are target-mean encoded out of fold) and the held-out R^2 they add to a
+ridge model of the existing features. Proposals that show neither are dropped from
+df_current. When nothing passes and an earlier iteration was already trained, the
+iteration is skipped: the graph goes straight to the feature critic instead of
+retraining on the same features.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from states.auto_ml_state import AutoMLState
+from utils.logger import Logger
+from utils.metrics import Metrics
+from config import ScreeningConfig
+import pandas as pd
+import numpy as np
+import time
+import os
+
+_RIDGE_ALPHA = 1.0
+
+
+def _target_matrix(y: pd.Series, task_type: str) -> np.ndarray:
+    """Regression: the target as one column. Classification: class indicators (one for binary)."""
+    if task_type == "classification":
+        indicators = pd.get_dummies(y.astype(str)).to_numpy(dtype=float)
+        return indicators[:, :1] if indicators.shape[1] == 2 else indicators
+    return pd.to_numeric(y, errors="coerce").to_numpy(dtype=float)[:, None]
+
+
+def _encode(column: pd.Series, Y: np.ndarray, halves: np.ndarray) -> np.ndarray:
+    """
+    Numeric columns as one median-imputed column. Other columns become one column per
+    target column: the category's target mean in the other half of the sample, so no
+    row is encoded with its own target.
+    """
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        values = pd.to_numeric(column, errors="coerce").astype(float).replace([np.inf, -np.inf], np.nan)
+        median = values.median()
+        return values.fillna(0.0 if pd.isna(median) else median).to_numpy()[:, None]
+
+    categories = column.astype(str).where(column.notna(), "__missing__").to_numpy()
+    encoded = np.empty_like(Y)
+    for half in (0, 1):
+        rows, other = halves == half, halves != half
+        means = pd.DataFrame(Y[other]).groupby(categories[other]).mean()
+        encoded[rows] = means.reindex(categories[rows]).fillna(pd.Series(Y[other].mean(axis=0))).to_numpy()
+    return encoded
+
+
+def _standardize(X: np.ndarray) -> np.ndarray:
+    std = X.std(axis=0)
+    return (X - X.mean(axis=0)) / np.where(std > 0, std, 1.0)
+
+
+def _signal(block: np.ndarray, Ys: np.ndarray) -> float:
+    """Largest |correlation| of the column with a target column (its aligned one if encoded)."""
+    corr = _standardize(block).T @ Ys / len(Ys)
+    return float(np.abs(np.diag(corr) if block.shape[1] == Ys.shape[1] > 1 else corr).max())
+
+
+def _holdout_r2(X: np.ndarray, Y: np.ndarray, halves: np.ndarray) -> float:
+    """Ridge R^2 averaged over target columns and both train-on-one-half, test-on-the-other splits."""
+    scores = []
+    for half in (0, 1):
+        train, test = halves == half, halves != half
+        mean, std = X[train].mean(axis=0), X[train].std(axis=0)
+        std = np.where(std > 0, std, 1.0)
+        A_train = np.column_stack([np.ones(train.sum()), (X[train] - mean) / std])
+        A_test = np.column_stack([np.ones(test.sum()), (X[test] - mean) / std])
+        penalty = _RIDGE_ALPHA * np.eye(A_train.shape[1])
+        penalty[0, 0] = 0.0  # the intercept is not shrunk
+        w = np.linalg.solve(A_train.T @ A_train + penalty, A_train.T @ Y[train])
+        ss_res = ((Y[test] - A_test @ w) ** 2).sum(axis=0)
+        ss_tot = ((Y[test] - Y[test].mean(axis=0)) ** 2).sum(axis=0)
+        scores.append(np.mean(1.0 - ss_res / np.where(ss_tot > 0, ss_tot, 1.0)))
+    return float(np.mean(scores))
+
+
+def _sample(df: pd.DataFrame, target: str) -> Tuple[pd.DataFrame, float]:
+    """Rows with a target (at most SCREEN_SAMPLE_ROWS) and the signal threshold for that many rows."""
+    df = df[df[target].notna()]
+    if len(df) > ScreeningConfig.SCREEN_SAMPLE_ROWS:
+        df = df.sample(n=ScreeningConfig.SCREEN_SAMPLE_ROWS, random_state=42)
+    threshold = max(ScreeningConfig.SCREEN_MIN_CORRELATION, ScreeningConfig.SCREEN_SIGNIFICANCE_Z / np.sqrt(max(len(df), 1)))
+    return df, float(threshold)
+
+
+def target_signals(df: pd.DataFrame, target: str, task_type: str, columns: List[str]) -> Tuple[Dict[str, float], float]:
+    """The screening signal of each column with the target on a row sample, and the signal threshold."""
+    df, threshold = _sample(df, target)
+    Y = _target_matrix(df[target], task_type)
+    Ys = _standardize(Y)
+    halves = np.random.default_rng(42).integers(0, 2, len(df))
+    return {c: _signal(_encode(df[c], Y, halves), Ys) for c in columns}, threshold
+
+
+def screen_proposals(
+    df: pd.DataFrame,
+    target: str,
+    task_type: str,
+    proposals: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], int, float]:
+    """Screening stats per proposal ({"signal", "gain", "passed"}), rows sampled and the signal threshold."""
+    df, threshold = _sample(df, target)
+    n = len(df)
+
+    Y = _target_matrix(df[target], task_type)
+    Ys = _standardize(Y)
+    halves = np.random.default_rng(42).integers(0, 2, n)
+
+    new_columns = {c for p in proposals for c in p.get("columns", [])}
+    blocks = {c: _encode(df[c], Y, halves) for c in new_columns if c in df.columns}
+
+    # Baseline: the existing features most correlated with the target
+    base = [c for c in df.columns if c != target and c not in new_columns]
+    base_blocks = {c: _encode(df[c], Y, halves) for c in base}
+    ranked = sorted(base_blocks, key=lambda c: _signal(base_blocks[c], Ys), reverse=True)
+    ranked = ranked[: ScreeningConfig.SCREEN_MAX_BASE_COLUMNS]
+    X_base = np.column_stack([base_blocks[c] for c in ranked]) if ranked else np.empty((n, 0))
+    base_r2 = _holdout_r2(X_base, Y, halves)
+
+    results = []
+    for proposal in proposals:
+        columns = [c for c in proposal.get("columns", []) if c in blocks]
+        if not columns:
+            # Nothing new to measure (the transform overwrote a column or added none)
+            results.append({"signal": None, "gain": None, "passed": True})
+            continue
+        signal = max(_signal(blocks[c], Ys) for c in columns)
+        gain = _holdout_r2(np.column_stack([X_base] + [blocks[c] for c in columns]), Y, halves) - base_r2
+        passed = signal >= threshold or gain >= ScreeningConfig.SCREEN_MIN_GAIN
+        results.append({"signal": round(signal, 4), "gain": round(gain, 5), "passed": bool(passed)})
+    return results, n, threshold
+
+
+def _revert_dataset_csv(state: AutoMLState):
+    """Forget the augmented CSV written this iteration; it now equals the previous dataset."""
+    path = state.current_dataset_csv
+    if len(state.datasets_history) > 1 and state.datasets_history[-1] == path:
+        state.datasets_history.pop()
+        if path and os.path.exists(path):
+            os.remove(path)
+        state.current_dataset_csv = state.datasets_history[-1] if len(state.datasets_history) > 1 else None
+
+
+def screen_features_node(state: AutoMLState) -> AutoMLState:
+    logger = Logger()
+    metrics = Metrics()
+
+    state.iteration_skipped = False
+    if not ScreeningConfig.SCREENING_ENABLED:
+        return state
+
+    logger.info("[SCREEN NODE] Screening proposed features against the target...", style="blue")
+    started = time.perf_counter()
+    proposals = state.last_transforms_applied
+
+    stats: List[Dict[str, Any]] = []
+    rows: Optional[int] = None
+    threshold: Optional[float] = None
+    if proposals:
+        stats, rows, threshold = screen_proposals(state.df_current, state.target_column, state.task_type, proposals)
+
+    passed = [dict(p, screening=s) for p, s in zip(proposals, stats) if s["passed"]]
+    failed = [dict(p, screening=s) for p, s in zip(proposals, stats) if not s["passed"]]
+
+    # Pruning after the last training changed the data even if no proposal survives
+    pruned = bool(state.history) and bool(state.history[-1].get("pruned_features"))
+    if failed:
+        state.df_current = state.df_current.drop(columns=[c for p in failed for c in p["columns"]])
+        if passed or pruned:
+            # The previous CSV still has the pruned columns, so this iteration's is rewritten
+            state.df_current.to_csv(state.current_dataset_csv, index=False)
+        else:
+            _revert_dataset_csv(state)
+    state.last_transforms_applied = passed
+
+    # Retraining is pointless without new features once a baseline has been trained,
+    # unless pruning changed the data since then
+    state.iteration_skipped = not passed and bool(state.history) and not pruned
+
+    state.feature_screening_history.append({
+        "iteration": state.iteration,
+        "rows": rows,
+        "signal_threshold": threshold,
+        "passed": passed,
+        "rejected": failed,
+        "skipped": state.iteration_skipped,
+        "elapsed_s": round(time.perf_counter() - started, 4),
+    })
+    metrics.incr("screening.proposals", len(proposals))
+    metrics.incr("screening.rejected", len(failed))
+    if state.iteration_skipped:
+        metrics.incr("screening.skipped_iterations")
+
+    lines = []
+    for p in passed + failed:
+        s = p["screening"]
+        verdict = "[green]kept[/green]" if s["passed"] else "[yellow]dropped[/yellow]"
+        detail = "not measured" if s["signal"] is None else f"|corr|={s['signal']:.3f}, linear gain={s['gain']:+.4f}"
+        lines.append(f"{verdict} {p['name']} -> {', '.join(p['columns']) or '-'} ({detail})")
+    if not proposals:
+        lines.append("No new features were proposed.")
+    if threshold is not None:
+        lines.append(f"\nSampled {rows} rows; signal threshold {threshold:.3f}, gain threshold {ScreeningConfig.SCREEN_MIN_GAIN}")
+    if state.iteration_skipped:
+        lines.append("[yellow]Nothing passed screening: skipping retraining this iteration.[/yellow]")
+    logger.box("FEATURE SCREENING", "\n".join(lines), style="blue")
+
+    return state
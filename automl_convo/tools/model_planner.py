@@ -1,32 +1,129 @@
 """
-This file defines the model planner tool node.
+This file defines the model planner tool node. Each candidate model's training time
+is estimated by the cost model (utils/cost_model.py) from the shape of X_processed,
+and the planner picks the set of models, at most one per family, with the best
+expected score that fits the iteration's time budget.
 """
 
+from typing import Any, Dict, List, Tuple
+from itertools import combinations
 from utils.logger import Logger
+from utils.cost_model import data_shape, get_cost_model
 from states.auto_ml_state import AutoMLState
+from config import PlannerConfig
+import numpy as np
+
+# Cross-validation folds per model (see train_node), plus the refit of the best model
+CV_FOLDS = 3
+
+# Task type -> (model name, params, family, needs dense X)
+CANDIDATE_MODELS: Dict[str, List[Tuple[str, Dict[str, Any], str, bool]]] = {
+    "classification": [
+        ("logistic_regression", {"max_iter": 10000}, "linear", False),
+        ("sgd_classifier", {"loss": "log_loss", "random_state": 42}, "linear", False),
+        ("decision_tree_clf", {"max_depth": 5}, "tree", False),
+        ("hist_gradient_boosting_clf", {"random_state": 42}, "boosting", True),
+        ("mlp_classifier", {"hidden_layer_sizes": (64,), "max_iter": 10000}, "neural", False),
+    ],
+    "regression": [
+        ("linear_regression", {}, "linear", False),
+        ("sgd_regressor", {"random_state": 42}, "linear", False),
+        ("decision_tree_reg", {"max_depth": 5}, "tree", False),
+        ("hist_gradient_boosting_reg", {"random_state": 42}, "boosting", True),
+        ("mlp_regressor", {"hidden_layer_sizes": (64,), "max_iter": 35}, "neural", False),
+    ],
+}
+
+# Softness of the "expected best score" of a set: models within about this much of
+# the best one still add to its value, clearly worse ones barely do
+_QUALITY_TEMPERATURE = 0.02
+
+
+def _set_value(qualities: List[float], cost_s: float) -> float:
+    q = np.asarray(qualities) / _QUALITY_TEMPERATURE
+    expected_best = _QUALITY_TEMPERATURE * (q.max() + np.log(np.exp(q - q.max()).sum()))
+    return expected_best - PlannerConfig.PLANNER_SECONDS_PENALTY * cost_s
+
+
+def plan_models(state: AutoMLState) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Dict[str, Any]], float]:
+    """Returns the planned (name, params) list, per-candidate estimates and the planning budget."""
+    if state.task_type not in CANDIDATE_MODELS:
+        raise ValueError(f"Unknown task_type '{state.task_type}'. Expected 'classification' or 'regression'.")
+
+    cost_model = get_cost_model()
+    shape = data_shape(state.X_processed)
+    dense_bytes = shape["rows"] * shape["width"] * 8
+
+    estimates: Dict[str, Dict[str, Any]] = {}
+    eligible = []
+    for name, params, family, needs_dense in CANDIDATE_MODELS[state.task_type]:
+        fold_s = cost_model.predict_fold_s(name, shape)
+        # CV folds plus the refit on all rows, should it be the best model
+        total_s = fold_s * (CV_FOLDS + 1)
+        estimate = {
+            "family": family,
+            "fold_s": round(fold_s, 4),
+            "total_s": round(total_s, 3),
+            "expected_quality": round(cost_model.expected_quality(name, state.task_type), 4),
+            "planned": False,
+            "excluded": None,
+        }
+        if needs_dense and dense_bytes > PlannerConfig.PLANNER_MAX_DENSE_BYTES:
+            estimate["excluded"] = f"densifying X needs {dense_bytes / 1024 ** 3:.1f} GB"
+        elif state.model_time_budget_s and fold_s * CV_FOLDS > state.model_time_budget_s:
+            estimate["excluded"] = f"over the {state.model_time_budget_s:g}s model budget"
+        else:
+            eligible.append((name, params, family))
+        estimates[name] = estimate
+
+    budget_s = (state.iteration_time_budget_s or float("inf")) * PlannerConfig.PLANNER_BUDGET_FRACTION
+
+    best, best_value = [], -float("inf")
+    for size in range(1, PlannerConfig.PLANNER_MAX_MODELS + 1):
+        for combo in combinations(eligible, size):
+            if len({family for _, _, family in combo}) < size:
+                continue
+            cost_s = sum(estimates[name]["total_s"] for name, _, _ in combo)
+            if cost_s > budget_s:
+                continue
+            value = _set_value([estimates[name]["expected_quality"] for name, _, _ in combo], cost_s)
+            if value > best_value:
+                best, best_value = list(combo), value
+
+    if not best:
+        # Nothing fits: train the cheapest candidate and let the training budget stop it
+        candidates = eligible or [(n, p, f) for n, p, f, _ in CANDIDATE_MODELS[state.task_type]]
+        best = [min(candidates, key=lambda c: estimates[c[0]]["total_s"])]
+
+    for name, _, _ in best:
+        estimates[name]["planned"] = True
+    return [(name, params) for name, params, _ in best], estimates, budget_s
+
 
 def model_plan_node(state: AutoMLState) -> AutoMLState:
     logger = Logger()
     logger.info("[MODEL PLAN NODE] Planning which models to train...", style='orange')
 
-    if state.task_type == "classification":
-        planned = [
-            ("logistic_regression", {"max_iter": 10000}),
-            ("decision_tree_clf", {"max_depth": 5}),
-            ("mlp_classifier", {"hidden_layer_sizes": (64,), "max_iter": 10000}),
-        ]
-    elif state.task_type == "regression":
-        planned = [
-            ("linear_regression", {}),
-            ("decision_tree_reg", {"max_depth": 5}),
-            ("mlp_regressor", {"hidden_layer_sizes": (64,), "max_iter": 35}),
-        ]
-    else:
-        raise ValueError(f"Unknown task_type '{state.task_type}'. Expected 'classification' or 'regression'.")
-
+    planned, estimates, budget_s = plan_models(state)
     state.planned_models = planned
+    state.model_plan_estimates = estimates
 
     logger.info(f"[MODEL PLAN NODE] Task type: {state.task_type}", style='orange')
+    shape = data_shape(state.X_processed)
+    logger.info(
+        f"[MODEL PLAN NODE] Data: {shape['rows']} rows x {shape['width']} columns, density {shape['density']:.3f}; "
+        f"cost model: {get_cost_model().describe()}",
+        style='orange',
+    )
+    budget_str = "unlimited" if budget_s == float("inf") else f"{budget_s:.0f}s"
+    logger.info(f"[MODEL PLAN NODE] Candidates (planning budget {budget_str}):", style='orange')
+    for mname, est in estimates.items():
+        mark = "*" if est["planned"] else " "
+        note = f" - {est['excluded']}" if est["excluded"] else ""
+        logger.info(
+            f"  {mark} {mname}: ~{est['total_s']:.2f}s, expected score {est['expected_quality']:+.3f} vs best{note}",
+            style='orange',
+        )
     logger.info("[MODEL PLAN NODE] Planned models:", style='orange')
     for mname, params in planned:
         logger.info(f"  - {mname} with params {params}", style='orange')
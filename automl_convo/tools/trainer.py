@@ -3,13 +3,20 @@ This file defines the model trainer tool node.
 """
 
 from states.auto_ml_state import AutoMLState
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.logger import Logger
 from utils.llm import build_model, compute_feature_importances
-from sklearn.model_selection import cross_val_score, StratifiedKFold, KFold
+from utils.training_workers import BudgetedTrainer, MODEL_OK, MODEL_FAILED
+from utils.cost_model import get_cost_model
+from utils.hyperparameter_search import search_hyperparameters
+from tools.model_planner import CV_FOLDS
+from config import SearchConfig
+import numpy as np
 
 
 def train_node(state: AutoMLState) -> AutoMLState:
+    from sklearn.model_selection import cross_validate, StratifiedKFold, KFold
+
     logger = Logger()
 
     logger.info("[TRAIN NODE] Training models and evaluating performance...", style="green")
@@ -23,28 +30,108 @@ def train_node(state: AutoMLState) -> AutoMLState:
 
     # Choose CV strategy + scoring based on task type
     if state.task_type == "classification":
-        cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
+        cv = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=42)
         scoring = "accuracy"
     elif state.task_type == "regression":
-        cv = KFold(n_splits=3, shuffle=True, random_state=42)
+        cv = KFold(n_splits=CV_FOLDS, shuffle=True, random_state=42)
         scoring = "r2"
     else:
         raise ValueError(f"Unknown task_type '{state.task_type}' in train_node.")
 
     planned_params = {mname: params for (mname, params) in state.planned_models}
+    training_status: Dict[str, Dict[str, Any]] = {}
+
+    trainer = None
+    if state.model_time_budget_s or state.iteration_time_budget_s:
+        # Fits run in a killable worker process so an over-budget model can be stopped
+        trainer = BudgetedTrainer(X, y, state.model_time_budget_s, state.iteration_time_budget_s)
+
+    # One split shared by the hyperparameter search and every model's cross-validation
+    folds = list(cv.split(X, y))
+    searches: Dict[str, Dict[str, Any]] = {}
+
+    best_name, best_model, refit = None, None, None
+    try:
+        for i, (mname, params) in enumerate(state.planned_models):
+            if trainer is not None:
+                # The search is charged to the model's budget along with its cross-validation
+                trainer.begin_model()
+            search, search_error = None, None
+            if SearchConfig.HPO_ENABLED:
+                estimate = state.model_plan_estimates.get(mname, {})
+                budget_s = _search_budget(state, trainer, len(state.planned_models) - i, estimate.get("total_s"))
+                if trainer is None:
+                    search = search_hyperparameters(mname, params, X, y, folds, scoring, budget_s, estimate.get("fold_s"))
+                else:
+                    searched = trainer.search(mname, params, folds, scoring, budget_s, estimate.get("fold_s"))
+                    search = searched["search"]
+                    if searched["status"] == MODEL_FAILED:
+                        search_error = searched["error"]
+            if search is not None:
+                searches[mname] = search
+                params = planned_params[mname] = search["best_params"]
+
+            if trainer is None:
+                model = build_model(mname, params)
+                cv_result = cross_validate(model, X, y, cv=folds, scoring=scoring)
+                outcome = {
+                    "status": MODEL_OK,
+                    "scores": cv_result["test_score"].tolist(),
+                    # Fit plus scoring, as the training workers measure a fold
+                    "fold_time_s": float(cv_result["fit_time"].sum() + cv_result["score_time"].sum()),
+                    "budget_s": None,
+                    "error": None,
+                }
+            else:
+                outcome = trainer.cross_validate(mname, params, folds, scoring)
+
+            training_status[mname] = {
+                "status": outcome["status"],
+                "folds_completed": len(outcome["scores"]),
+                "folds": len(folds),
+                "fold_time_s": round(outcome["fold_time_s"], 3),
+                "budget_s": outcome["budget_s"],
+                "error": outcome["error"],
+                "search_error": search_error,
+            }
+            # Models that finished at least one fold keep their partial scores
+            if outcome["scores"]:
+                scores = np.asarray(outcome["scores"])
+                results[mname] = {
+                    "mean_score": float(scores.mean()),
+                    "std": float(scores.std()),
+                    "scores": scores.tolist(),
+                    "metric": scoring,
+                    "status": outcome["status"],
+                    "params": params,
+                }
+                if search is not None:
+                    results[mname]["search"] = search
+
+        if not results:
+            raise ValueError(
+                "No model completed a cross-validation fold within the training time budget "
+                f"(model: {state.model_time_budget_s}s, iteration: {state.iteration_time_budget_s}s)."
+            )
 
-    for mname, params in state.planned_models:
-        model = build_model(mname, params)
-        scores = cross_val_score(model, X, y, cv=cv, scoring=scoring)
-
-        results[mname] = {
-            "mean_score": float(scores.mean()),
-            "std": float(scores.std()),
-            "scores": scores.tolist(),
-            "metric": scoring,
-        }
+        # Refit the best fully evaluated model for feature-level metrics (not needed under PCA)
+        if not state.use_pca and state.used_features is not None:
+            best_name = max(
+                results,
+                key=lambda m: (training_status.get(m, {}).get("status", MODEL_OK) == MODEL_OK, results[m]["mean_score"]),
+            )
+            if trainer is not None:
+                trainer.begin_model()
+            refit = _fit_model(best_name, planned_params[best_name], X, y, trainer)
+            best_model = refit["model"]
+    finally:
+        if trainer is not None:
+            trainer.close()
 
     state.model_results = results
+    state.training_status = training_status
+    # Fold timings refine the planner's cost model for later runs
+    get_cost_model().record(state)
 
     # Build training summary for log output
     summary_lines = []
@@ -55,20 +142,41 @@ def train_node(state: AutoMLState) -> AutoMLState:
             f"- {mname}: mean_{res['metric']}={res['mean_score']:.4f}, "
             f"std={res['std']:.4f}"
         )
+    for mname, search in searches.items():
+        summary_lines.append(
+            f"[dim]- {mname}: searched {search['candidates']} configurations in {search['elapsed_s']:.1f}s"
+            f"{' (stopped at the budget)' if search['stopped_early'] else ''}, "
+            f"using {search['best_params']}[/dim]"
+        )
+    for mname, st in training_status.items():
+        if st.get("search_error"):
+            summary_lines.append(
+                f"[yellow]- {mname}: hyperparameter search failed ({st['search_error']}); "
+                f"trained with the planned parameters[/yellow]"
+            )
+        if st["status"] != MODEL_OK:
+            summary_lines.append(
+                f"[yellow]- {mname}: {st['status']} after {st['folds_completed']}/{st['folds']} folds "
+                f"(budget {st['budget_s']}s){': ' + st['error'] if st['error'] else ''}[/yellow]"
+            )
 
     feature_metrics = None
 
     # Compute feature-level metrics for the best model when PCA is disabled
     if not state.use_pca:
-        if state.used_features is not None:
-            best_name, best_res = max(results.items(), key=lambda kv: kv[1]["mean_score"])
+        if best_model is None and refit is not None and refit["status"] == MODEL_FAILED:
+            summary_lines.append(
+                f"[yellow]Refitting {best_name} failed ({refit['error']}); skipping feature metric computation.[/yellow]"
+            )
+        elif best_model is None and best_name is not None:
+            summary_lines.append(
+                f"[yellow]Refitting {best_name} exceeded the time budget; skipping feature metric computation.[/yellow]"
+            )
+        elif state.used_features is not None:
+            best_res = results[best_name]
             summary_lines.append(f"\n[bold green]Best model by {scoring}:[/bold green] {best_name}")
 
-            best_params = planned_params[best_name]
-            best_model = build_model(best_name, best_params)
-            best_model.fit(X, y)
-
-            importances = compute_feature_importances(best_model, state.used_features)
+            importances = compute_feature_importances(best_model, state.used_features, X, y, state.processed_feature_map)
 
             feature_metrics = {
                 "iteration": state.iteration,
@@ -106,9 +214,37 @@ def train_node(state: AutoMLState) -> AutoMLState:
         "dataset_csv": state.current_dataset_csv,
         "used_features": state.used_features,
         "model_results": results,
+        "training_status": training_status,
         "transforms_applied": state.last_transforms_applied,
         "feature_metrics": feature_metrics,
     }
     state.history.append(iter_record)
 
     return state
+
+
+def _fit_model(name: str, params: Dict[str, Any], X, y, trainer: Optional[BudgetedTrainer]) -> Dict[str, Any]:
+    """Fit on all rows, in the budgeted worker when there is one; returns {"status", "model", "error"}."""
+    if trainer is not None:
+        return trainer.fit(name, params)
+    model = build_model(name, params)
+    model.fit(X, y)
+    return {"status": MODEL_OK, "model": model, "error": None}
+
+
+def _search_budget(
+    state: AutoMLState,
+    trainer: Optional[BudgetedTrainer],
+    models_left: int,
+    estimated_s: Optional[float],
+) -> float:
+    """Search time for the next model, leaving the rest of its budgets for the cross-validation."""
+    budget = SearchConfig.HPO_MODEL_BUDGET_S
+    if estimated_s is not None:
+        budget = min(budget, estimated_s * SearchConfig.HPO_ESTIMATE_MULTIPLE)
+    if state.model_time_budget_s:
+        budget = min(budget, state.model_time_budget_s * SearchConfig.HPO_BUDGET_FRACTION)
+    remaining = trainer.remaining_s() if trainer is not None else None
+    if remaining is not None:
+        budget = min(budget, max(remaining, 0.0) / models_left * SearchConfig.HPO_BUDGET_FRACTION)
+    return budget
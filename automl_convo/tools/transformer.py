@@ -44,8 +44,11 @@ def apply_transformations_node(state: AutoMLState) -> AutoMLState:
             continue
 
         box_lines.append(f"[cyan]{name}[/cyan] - {desc}")
+        before = set(df.columns)
         df = fn(df, params)
-        applied.append({"name": name, "description": desc, "params": params})
+        # The columns each transform added, so screening can drop a whole proposal
+        columns = [c for c in df.columns if c not in before]
+        applied.append({"name": name, "description": desc, "params": params, "columns": columns})
 
     # Print everything in a rich box
     logger.box(
@@ -0,0 +1,262 @@
+"""
+This file defines node-level checkpointing for AutoMLGraph runs. After every node
+the run's GraphState is written under <root>/<checkpoint_id>/: scalars and
+histories go into checkpoint.json, while large members (dataframes, arrays, the
+cleaning pipeline) are pickled out-of-line and rewritten only when they change.
+A failed run can then resume from the node after the last completed one, and
+unfinished runs can be inspected without loading their data. A run holds a lease
+on its checkpoint id (<root>/<id>.lease) while it executes, so an identical run
+started meanwhile cannot delete or overwrite its checkpoints.
+"""
+
+from typing import Any, Dict, List, Optional
+from states.auto_ml_state import AutoMLState
+from states.graph_state import GraphState
+from utils.session_store import atomic_write, json_default, restore_lazy_state, split_state
+from config import CheckpointConfig
+import hashlib
+import pickle
+import shutil
+import errno
+import json
+import time
+import os
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+# langgraph.graph.END, the next node of a finished run (spelled out to avoid importing LangGraph)
+END_NODE = "__end__"
+
+STATUS_RUNNING = "running"
+STATUS_FAILED = "failed"
+STATUS_COMPLETED = "completed"
+
+
+def checkpoint_id_for(dataset_fingerprint: str, question: str, max_iterations: int, graph_variant: str) -> str:
+    """
+    Deterministic id so asking the same question on the same dataset with the same
+    run settings resumes its run; a changed setting starts a new one.
+    """
+    key = f"{question.strip().lower()}\n{max_iterations}\n{graph_variant}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return f"{dataset_fingerprint[:12]}-{digest[:12]}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+class CheckpointStore:
+    """
+    Reads and writes run checkpoints under `root`:
+
+        <root>/<id>/checkpoint.json     status, graph variant, completed nodes, next node, state metadata
+        <root>/<id>/<field>-<n>.pkl     large AutoMLState members, versioned by write
+    """
+
+    def __init__(self, root: str = CheckpointConfig.CHECKPOINT_DIR):
+        self.root = root
+        # checkpoint id -> {field: (object, file name)} for blobs already on disk
+        self._written: Dict[str, Dict[str, Any]] = {}
+
+    def checkpoint_dir(self, checkpoint_id: str) -> str:
+        return os.path.join(self.root, checkpoint_id)
+
+    def _meta_path(self, checkpoint_id: str) -> str:
+        return os.path.join(self.checkpoint_dir(checkpoint_id), CHECKPOINT_FILE)
+
+    def exists(self, checkpoint_id: str) -> bool:
+        return os.path.exists(self._meta_path(checkpoint_id))
+
+    def read_meta(self, checkpoint_id: str) -> Dict[str, Any]:
+        with open(self._meta_path(checkpoint_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def is_resumable(self, checkpoint_id: str) -> bool:
+        return self.exists(checkpoint_id) and self.read_meta(checkpoint_id)["status"] != STATUS_COMPLETED
+
+    def _lease_path(self, checkpoint_id: str) -> str:
+        return os.path.join(self.root, f"{checkpoint_id}.lease")
+
+    def acquire(self, checkpoint_id: str) -> bool:
+        """
+        Take the lease on a checkpoint id for this process; False while another live
+        process holds it. A lease left behind by a process that died is taken over.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = self._lease_path(checkpoint_id)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        holder = int(f.read().strip() or 0)
+                except (OSError, ValueError):
+                    holder = 0
+                if holder and _pid_alive(holder):
+                    return False
+                # Stale lease: remove it and try once more
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+            return True
+        return False
+
+    def release(self, checkpoint_id: str):
+        try:
+            os.remove(self._lease_path(checkpoint_id))
+        except FileNotFoundError:
+            pass
+
+    def list_checkpoints(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if self.exists(d))
+
+    def _write_blobs(self, checkpoint_id: str, state: AutoMLState, names: List[str]) -> Dict[str, str]:
+        """Pickle blob members that changed since the last checkpoint; return field -> file name."""
+        written = self._written.setdefault(checkpoint_id, {})
+        pending = state.__dict__.get("_pending_blobs") or {}
+        blobs = {}
+        for name in names:
+            # Still-unloaded members of a resumed state are on disk already
+            if name in pending and name in written:
+                blobs[name] = written[name][1]
+                continue
+
+            value = getattr(state, name)
+            if value is None:
+                continue
+            previous = written.get(name)
+            if previous is not None and previous[0] is value:
+                blobs[name] = previous[1]
+                continue
+
+            version = int(previous[1].rsplit("-", 1)[1].split(".")[0]) + 1 if previous else 0
+            fname = f"{name}-{version}.pkl"
+            atomic_write(
+                os.path.join(self.checkpoint_dir(checkpoint_id), fname),
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            )
+            written[name] = (value, fname)
+            blobs[name] = fname
+        return blobs
+
+    def _remove_stale_blobs(self, checkpoint_id: str, blobs: Dict[str, str]):
+        keep = set(blobs.values()) | {CHECKPOINT_FILE}
+        ckpt_dir = self.checkpoint_dir(checkpoint_id)
+        for fname in os.listdir(ckpt_dir):
+            if fname not in keep and fname.endswith(".pkl"):
+                try:
+                    os.remove(os.path.join(ckpt_dir, fname))
+                except FileNotFoundError:
+                    pass
+
+    def save(
+        self,
+        checkpoint_id: str,
+        gs: GraphState,
+        node: str,
+        next_node: str,
+        completed_nodes: List[str],
+        graph_variant: str,
+    ):
+        """Record that `node` finished and the run continues at `next_node` of `graph_variant`."""
+        os.makedirs(self.checkpoint_dir(checkpoint_id), exist_ok=True)
+        state = gs["state"]
+        state_meta, blob_names = split_state(state)
+        blobs = self._write_blobs(checkpoint_id, state, blob_names)
+
+        meta = {
+            "checkpoint_id": checkpoint_id,
+            "status": STATUS_RUNNING,
+            "question": gs["question"],
+            "graph_variant": graph_variant,
+            "last_node": node,
+            "next_node": next_node,
+            "completed_nodes": completed_nodes,
+            "error": None,
+            "updated_at": time.time(),
+            "blobs": blobs,
+            "state": state_meta,
+        }
+        atomic_write(self._meta_path(checkpoint_id), json.dumps(meta, default=json_default).encode("utf-8"))
+        self._remove_stale_blobs(checkpoint_id, blobs)
+
+    def _update_status(self, checkpoint_id: str, status: str, error: Optional[str] = None):
+        meta = self.read_meta(checkpoint_id)
+        meta.update(status=status, error=error, updated_at=time.time())
+        atomic_write(self._meta_path(checkpoint_id), json.dumps(meta, default=json_default).encode("utf-8"))
+
+    def mark_failed(self, checkpoint_id: str, error: str):
+        self._written.pop(checkpoint_id, None)
+        if self.exists(checkpoint_id):
+            self._update_status(checkpoint_id, STATUS_FAILED, error)
+
+    def mark_completed(self, checkpoint_id: str):
+        self._written.pop(checkpoint_id, None)
+        if not CheckpointConfig.CHECKPOINT_KEEP_COMPLETED:
+            self.delete(checkpoint_id)
+        elif self.exists(checkpoint_id):
+            self._update_status(checkpoint_id, STATUS_COMPLETED)
+
+    def delete(self, checkpoint_id: str):
+        self._written.pop(checkpoint_id, None)
+        shutil.rmtree(self.checkpoint_dir(checkpoint_id), ignore_errors=True)
+
+    def load(self, checkpoint_id: str) -> Dict[str, Any]:
+        """
+        Return {"gs": GraphState, "graph_variant": str, "next_node": str, "completed_nodes": [...]}.
+        Large members stay on disk until the resumed run first touches them.
+        """
+        meta = self.read_meta(checkpoint_id)
+        ckpt_dir = self.checkpoint_dir(checkpoint_id)
+        state = restore_lazy_state(meta["state"], ckpt_dir, meta["blobs"])
+
+        # Unchanged blobs are not rewritten by the resumed run
+        self._written[checkpoint_id] = {
+            name: (None, fname) for name, fname in meta["blobs"].items()
+        }
+        return {
+            "gs": {"state": state, "question": meta["question"]},
+            # next_node only exists in the variant that wrote it
+            "graph_variant": meta.get("graph_variant"),
+            "next_node": meta["next_node"],
+            "completed_nodes": meta["completed_nodes"],
+        }
+
+    def inspect(self, checkpoint_id: str) -> Dict[str, Any]:
+        """Progress of a (possibly unfinished) run, read from metadata only."""
+        meta = self.read_meta(checkpoint_id)
+        state = meta["state"]
+        return {
+            "checkpoint_id": checkpoint_id,
+            "status": meta["status"],
+            "question": meta["question"],
+            "graph_variant": meta.get("graph_variant"),
+            "last_node": meta["last_node"],
+            "next_node": meta["next_node"],
+            "completed_nodes": meta["completed_nodes"],
+            "error": meta["error"],
+            "updated_at": meta["updated_at"],
+            "target_column": state.get("target_column"),
+            "task_type": state.get("task_type"),
+            "iteration": state.get("iteration"),
+            "max_iterations": state.get("max_iterations"),
+            "iteration_scores": [
+                {
+                    "iteration": record["iteration"],
+                    "scores": {name: res["mean_score"] for name, res in record["model_results"].items()},
+                }
+                for record in state.get("history", [])
+            ],
+        }
@@ -0,0 +1,203 @@
+"""
+This file defines the training cost model used by the model planner. A model's
+cross-validation fold time is predicted as a power law of the data shape,
+
+    fold_s = c * rows^a * width^b * density^d
+
+(width and density of X_processed, whose one-hot columns are often sparse), fitted
+per model in log space. A fold's time is its fit plus scoring, as measured by both
+training paths. Hand-calibrated priors are used as they are unless learning is
+enabled; then every training run appends its measured fold times to a JSONL file
+and the coefficients are refitted from the most recent observations, shrunk towards
+the priors so a handful of timings cannot swing them far. The same records track each
+model's score relative to the best model of its iteration, which the planner uses
+as the expected quality of a candidate.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from states.auto_ml_state import AutoMLState
+from config import PlannerConfig
+import numpy as np
+import threading
+import json
+import time
+import os
+
+# Model name -> prior (c, a, b, d) for seconds per fold, calibrated on the bundled
+# and synthetic benchmark datasets
+COST_PRIORS: Dict[str, Tuple[float, float, float, float]] = {
+    "logistic_regression": (1.5e-4, 0.5, 0.3, 0.3),
+    "linear_regression": (4e-7, 1.0, 1.0, 1.0),
+    "decision_tree_clf": (2e-7, 1.0, 1.0, 0.5),
+    "decision_tree_reg": (2e-7, 1.0, 1.0, 0.5),
+    "mlp_classifier": (1e-3, 1.0, 0.1, 0.0),
+    "mlp_regressor": (1e-3, 1.0, 0.1, 0.0),
+    # Densified before fitting, so sparsity does not help
+    "hist_gradient_boosting_clf": (1.5e-4, 0.5, 1.0, 0.0),
+    "hist_gradient_boosting_reg": (1.5e-4, 0.5, 1.0, 0.0),
+    "sgd_classifier": (1e-3, 0.5, 0.2, 0.0),
+    "sgd_regressor": (1e-3, 0.5, 0.2, 0.0),
+}
+
+# Model name -> prior expected score relative to the best model of an iteration
+QUALITY_PRIORS: Dict[str, float] = {
+    "hist_gradient_boosting_clf": 0.0,
+    "logistic_regression": -0.01,
+    "mlp_classifier": -0.015,
+    "decision_tree_clf": -0.02,
+    "sgd_classifier": -0.025,
+    "hist_gradient_boosting_reg": 0.0,
+    "linear_regression": -0.03,
+    "decision_tree_reg": -0.04,
+    "mlp_regressor": -0.05,
+    "sgd_regressor": -0.05,
+}
+
+# Pseudo-observations behind each quality prior; relative scores are clipped so one
+# diverged fit (an r2 of -1e6) does not dominate the average
+_QUALITY_PRIOR_WEIGHT = 2.0
+_MIN_RELATIVE_SCORE = -1.0
+_MIN_DENSITY = 1e-6
+
+_WRITE_LOCK = threading.Lock()
+
+
+def data_shape(X) -> Dict[str, float]:
+    """Rows, width and non-zero density of a (possibly sparse) feature matrix."""
+    rows, width = X.shape
+    cells = max(rows * width, 1)
+    nnz = X.nnz if hasattr(X, "nnz") else int(np.count_nonzero(X))
+    return {"rows": int(rows), "width": int(width), "density": nnz / cells}
+
+
+def _design_row(shape: Dict[str, float]) -> np.ndarray:
+    return np.array([
+        1.0,
+        np.log(max(shape["rows"], 1)),
+        np.log(max(shape["width"], 1)),
+        np.log(max(shape["density"], _MIN_DENSITY)),
+    ])
+
+
+def _prior_weights(model: str) -> np.ndarray:
+    c, a, b, d = COST_PRIORS[model]
+    return np.array([np.log(c), a, b, d])
+
+
+class CostModel:
+    """Per-model fold-time and expected-quality estimates from priors and recorded runs."""
+
+    def __init__(self, path: str = PlannerConfig.COST_MODEL_PATH, learning: bool = PlannerConfig.COST_MODEL_LEARNING):
+        self.path = path
+        self.learning = learning
+        self.observations = self._load() if learning else []
+        self._weights: Dict[str, np.ndarray] = {}
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()[-PlannerConfig.COST_MODEL_MAX_OBSERVATIONS:]
+        observations = []
+        for line in lines:
+            try:
+                observations.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A line cut short by a crash mid-append
+                continue
+        return observations
+
+    def describe(self) -> str:
+        """Where the estimates come from, for logging next to a plan."""
+        if not self.learning:
+            return "priors only (learning disabled)"
+        return f"priors refitted from {len(self.observations)} recorded fold timings in {os.path.abspath(self.path)}"
+
+    def weights(self, model: str) -> np.ndarray:
+        """
+        Ridge fit of log fold time on the log shape, pulled towards the prior:
+        argmin |Aw - t|^2 + k|w - w0|^2  =>  w = w0 + (A'A + kI)^-1 A'(t - A w0)
+        """
+        if model not in self._weights:
+            w0 = _prior_weights(model)
+            obs = [o for o in self.observations if o.get("model") == model and o.get("fold_s", 0) > 0]
+            if obs:
+                A = np.vstack([_design_row(o) for o in obs])
+                t = np.log([o["fold_s"] for o in obs])
+                k = PlannerConfig.COST_MODEL_PRIOR_WEIGHT
+                w0 = w0 + np.linalg.solve(A.T @ A + k * np.eye(len(w0)), A.T @ (t - A @ w0))
+            self._weights[model] = w0
+        return self._weights[model]
+
+    def predict_fold_s(self, model: str, shape: Dict[str, float]) -> float:
+        return float(np.exp(_design_row(shape) @ self.weights(model)))
+
+    def expected_quality(self, model: str, task_type: str) -> float:
+        """Mean score relative to the best model of the same iteration (0 = usually best)."""
+        relative = [
+            max(o["score"] - o["best_score"], _MIN_RELATIVE_SCORE)
+            for o in self.observations
+            if o.get("model") == model and o.get("task_type") == task_type and o.get("score") is not None
+        ]
+        prior = QUALITY_PRIORS.get(model, -0.05)
+        return (prior * _QUALITY_PRIOR_WEIGHT + sum(relative)) / (_QUALITY_PRIOR_WEIGHT + len(relative))
+
+    def record(self, state: AutoMLState):
+        """Append the fold timings and relative scores of the iteration just trained."""
+        if not self.learning or not state.training_status or state.X_processed is None:
+            return
+        shape = data_shape(state.X_processed)
+        results = state.model_results or {}
+        # Relative scores only mean something when models were compared
+        best_score = max((r["mean_score"] for r in results.values()), default=None) if len(results) > 1 else None
+        predicted = state.model_plan_estimates or {}
+
+        records = []
+        for model, status in state.training_status.items():
+            if model not in COST_PRIORS or status["status"] not in ("ok", "timed_out"):
+                continue
+            completed = status["folds_completed"]
+            if completed:
+                fold_s = status["fold_time_s"] / completed
+            elif status.get("budget_s"):
+                # Timed out inside the first fold: the budget is a lower bound
+                fold_s = status["budget_s"]
+            else:
+                continue
+            records.append({
+                "ts": time.time(),
+                "model": model,
+                "task_type": state.task_type,
+                "n_rows": state.n_rows,
+                "n_cols": state.n_cols,
+                **shape,
+                "fold_s": fold_s,
+                "status": status["status"],
+                "predicted_fold_s": predicted.get(model, {}).get("fold_s"),
+                "score": results[model]["mean_score"] if best_score is not None and model in results else None,
+                "best_score": best_score,
+            })
+        if not records:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _WRITE_LOCK:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in records))
+            self.observations.extend(records)
+            self._weights.clear()
+
+
+_COST_MODEL: Optional[CostModel] = None
+_COST_MODEL_LOCK = threading.Lock()
+
+
+def get_cost_model() -> CostModel:
+    """Process-wide cost model; observations are read from disk once and appended as runs finish."""
+    global _COST_MODEL
+    with _COST_MODEL_LOCK:
+        if _COST_MODEL is None:
+            _COST_MODEL = CostModel()
+        return _COST_MODEL
@@ -2,62 +2,216 @@
 This file defines different drivers of different aspects of the agentic framework.
 """
 
-from utils.logger import Logger
+from utils.logger import Logger, log_context
 from states.conversation_graph_state import ConversationGraphState
 from states.auto_ml_state import AutoMLState
 from states.conversation_state import ConversationState
 from states.graph_state import GraphState
-from typing import Optional
-from langgraph.graph import StateGraph
-from graphs.convo_automl_graph import ConversationGraph
+from states.run_store import RunStore
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+from concurrent.futures import Executor
+from graphs.registry import get_graph
+from utils.qa_cache import QACache
+from utils.router import dataset_columns
+from utils.metrics import Metrics
+from utils.fingerprint import dataset_fingerprint
+from utils.session_store import SessionStore
+from utils.jobs import AutoMLJob, RunCancelled, progress_event, start_job
+from utils.checkpoints import CheckpointStore, END_NODE
+from utils.tracing import trace
+from utils.memory_profiler import MemoryProfiler
+from config import QACacheConfig, SessionConfig, CheckpointConfig, GraphConfig, MemoryConfig, TrainingConfig
+import threading
+import time
+import uuid
 import os
 
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+
 def run_multi_iteration_analysis(
     question: str,
     csv_path: str,
     max_iterations: int = 3,
     temp_dir: str = "tmp_datasets",
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    checkpoint_id: Optional[str] = None,
+    resume: bool = False,
+    graph_variant: Optional[str] = None,
+    model_time_budget_s: Optional[float] = TrainingConfig.MODEL_TIME_BUDGET_S,
+    iteration_time_budget_s: Optional[float] = TrainingConfig.ITERATION_TIME_BUDGET_S,
 ):
     """
     Run a full multi-iteration AutoML analysis for a single question/dataset.
 
-    It constructs the AutoMLGraph lazily inside this function to avoid
-    circular imports between utils.drivers, graphs.automl_graph, and wrappers.
+    The compiled AutoMLGraph comes from the process-level graph cache; `graph_variant`
+    selects a registered variant (default GraphConfig.AUTOML_GRAPH_VARIANT).
+
+    The graph is streamed node by node: `on_event` receives a progress event after
+    each node, and setting `cancel_event` stops the run with RunCancelled at the
+    next node boundary.
+
+    With a `checkpoint_id`, the GraphState is checkpointed after every node (see
+    utils.checkpoints). `resume=True` continues that checkpoint from the node after
+    the last completed one, in the graph variant that wrote it, instead of starting
+    again from `profile`.
+
+    Training is bounded by `model_time_budget_s` per model and `iteration_time_budget_s`
+    per iteration (None or 0: unlimited); models over budget are recorded as timed out
+    with the folds they completed (see tools/trainer.py).
+
+    With MemoryConfig.MEMORY_PROFILING, memory use and AutoMLState field sizes are
+    recorded after every node (see utils.memory_profiler).
     """
-    # Lazy import here to break circular dependency
-    from graphs.automl_graph import AutoMLGraph
+    graph_variant = graph_variant or GraphConfig.AUTOML_GRAPH_VARIANT
+
+    checkpoints = None
+    if checkpoint_id is not None and CheckpointConfig.CHECKPOINTS_ENABLED:
+        checkpoints = CheckpointStore()
+        if not checkpoints.acquire(checkpoint_id):
+            # An identical run is executing under this id; leave its checkpoints alone
+            Logger().info(
+                f"[AUTOML RUN] Checkpoint '{checkpoint_id}' is in use by another run; checkpointing this run separately.",
+                style="yellow",
+            )
+            checkpoint_id, resume = f"{checkpoint_id}-{uuid.uuid4().hex[:8]}", False
+            checkpoints.acquire(checkpoint_id)
 
+    try:
+        return _run_automl_graph(
+            question, csv_path, max_iterations, temp_dir, on_event, cancel_event, checkpoints,
+            checkpoint_id, resume, graph_variant, model_time_budget_s, iteration_time_budget_s,
+        )
+    finally:
+        if checkpoints is not None:
+            checkpoints.release(checkpoint_id)
+
+
+def _run_automl_graph(
+    question: str,
+    csv_path: str,
+    max_iterations: int,
+    temp_dir: str,
+    on_event: Optional[Callable[[Dict[str, Any]], None]],
+    cancel_event: Optional[threading.Event],
+    checkpoints: Optional[CheckpointStore],
+    checkpoint_id: Optional[str],
+    resume: bool,
+    graph_variant: str,
+    model_time_budget_s: Optional[float],
+    iteration_time_budget_s: Optional[float],
+) -> AutoMLState:
     logger = Logger()
 
-    os.makedirs(temp_dir, exist_ok=True)
-
-    state = AutoMLState()
-    state.iteration = 0
-    state.max_iterations = max_iterations
-    state.history = []
-    state.temp_dir = temp_dir
-
-    # Seed history with the original dataset path
-    state.datasets_history = [csv_path]
-    state.csv_path = csv_path
-
-    gs: GraphState = {
-        "state": state,
-        "question": question,
-    }
-
-    logger.box(
-        "AUTOML RUN START",
-        f"Question: {question}\n"
-        f"CSV path: {csv_path}\n"
-        f"Max iterations: {max_iterations}\n"
-        f"Temp dir: {temp_dir}",
-        style="cyan",
-    )
-
-    # Build the inner AutoML graph
-    automl_graph = AutoMLGraph().graph
-    final_gs = automl_graph.invoke(gs)
+    if checkpoints is not None and resume and checkpoints.exists(checkpoint_id):
+        restored = checkpoints.load(checkpoint_id)
+        gs: GraphState = restored["gs"]
+        entry_point = restored["next_node"]
+        completed_nodes = restored["completed_nodes"]
+        # Continue in the variant that wrote the checkpoint, whatever is configured now
+        graph_variant = restored["graph_variant"] or graph_variant
+
+        logger.box(
+            "AUTOML RUN RESUMED",
+            f"Question: {gs['question']}\n"
+            f"Checkpoint: {checkpoint_id}\n"
+            f"Graph variant: {graph_variant}\n"
+            f"Completed nodes: {', '.join(completed_nodes)}\n"
+            f"Resuming at: {entry_point}",
+            style="cyan",
+        )
+        if entry_point == END_NODE:
+            return gs["state"]
+    else:
+        os.makedirs(temp_dir, exist_ok=True)
+
+        state = AutoMLState()
+        state.iteration = 0
+        state.max_iterations = max_iterations
+        state.history = []
+        state.temp_dir = temp_dir
+        state.model_time_budget_s = model_time_budget_s
+        state.iteration_time_budget_s = iteration_time_budget_s
+
+        # Seed history with the original dataset path
+        state.datasets_history = [csv_path]
+        state.csv_path = csv_path
+
+        gs: GraphState = {
+            "state": state,
+            "question": question,
+        }
+        entry_point, completed_nodes = "profile", []
+
+        # A leftover checkpoint under this id belongs to an earlier run
+        if checkpoints is not None:
+            checkpoints.delete(checkpoint_id)
+
+        logger.box(
+            "AUTOML RUN START",
+            f"Question: {question}\n"
+            f"CSV path: {csv_path}\n"
+            f"Max iterations: {max_iterations}\n"
+            f"Temp dir: {temp_dir}",
+            style="cyan",
+        )
+
+    # Inner AutoML graph, compiled once per process and entry point
+    automl = get_graph(graph_variant, entry_point=entry_point)
+    automl_graph = automl.graph
+    metrics = Metrics()
+    final_gs = gs
+
+    # Unique per run, also when an identical run (same checkpoint id) repeats
+    run_id = uuid.uuid4().hex[:12]
+
+    profiler = None
+    if MemoryConfig.MEMORY_PROFILING:
+        profiler = MemoryProfiler(run_id)
+        if not profiler.start():
+            logger.info("[AUTOML RUN] Another run in this process is being memory profiled; not profiling this one.", style="yellow")
+            profiler = None
+
+    node_started = time.perf_counter()
+    try:
+        with log_context(run_id=run_id, checkpoint_id=checkpoint_id), trace(
+            "automl_run", run_id=run_id, checkpoint_id=checkpoint_id, question=gs["question"], entry_point=entry_point
+        ):
+            for update in automl_graph.stream(gs):
+                for node, node_gs in update.items():
+                    metrics.observe(f"node.{node}.latency_s", time.perf_counter() - node_started)
+                    final_gs = node_gs
+                    if profiler is not None:
+                        profiler.record(node, node_gs["state"])
+                    if checkpoints is not None:
+                        completed_nodes.append(node)
+                        checkpoints.save(
+                            checkpoint_id, node_gs, node, automl.next_node(node, node_gs), completed_nodes, graph_variant
+                        )
+                    if on_event is not None:
+                        on_event(progress_event(node, node_gs["state"]))
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("[AUTOML RUN] Cancelled by request.", style="yellow")
+                    raise RunCancelled(f"AutoML run for '{question}' was cancelled.")
+                node_started = time.perf_counter()
+    except Exception as e:
+        if profiler is not None:
+            profiler.finish(error=f"{type(e).__name__}: {e}")
+        if checkpoints is not None:
+            checkpoints.mark_failed(checkpoint_id, f"{type(e).__name__}: {e}")
+            logger.info(
+                f"[AUTOML RUN] Stopped after {completed_nodes[-1] if completed_nodes else 'no completed nodes'}; "
+                f"checkpoint '{checkpoint_id}' can resume this run.",
+                style="yellow",
+            )
+        raise
+
+    if profiler is not None:
+        profiler.finish()
+    if checkpoints is not None:
+        checkpoints.mark_completed(checkpoint_id)
+
     final_state = final_gs["state"]
 
     return final_state
@@ -71,6 +225,9 @@ class ConversationalAutoMLRunner:
     - Hold the ConversationState across turns.
     - Expose a ask(question: str) interface.
     - Hide the ConversationGraphState plumbing and graph.invoke details.
+    - Answer near-duplicate questions from a lexical cache without any LLM call.
+    - Optionally persist the conversation as a named session after every turn.
+    - Run questions as background jobs (ask_async) that stream progress and can be cancelled.
     """
 
     def __init__(
@@ -78,30 +235,142 @@ class ConversationalAutoMLRunner:
         csv_path: str,
         max_iterations: int = 3,
         temp_dir: str = "augmented_datasets",
-        conversation_graph: Optional[StateGraph] = None,
+        conversation_graph: Optional["StateGraph"] = None,
+        session_name: Optional[str] = None,
+        session_store: Optional[SessionStore] = None,
+        run_executor: Optional[Executor] = None,
+        qa_cache: Optional[QACache] = None,
+        run_store: Optional[RunStore] = None,
+        session_id: Optional[str] = None,
     ):
         self.csv_path = csv_path
         self.max_iterations = max_iterations
         self.temp_dir = temp_dir
+        self.run_executor = run_executor
 
-        # Long-lived conversation state (shared across turns)
-        self.conv_state = ConversationState()
+        # Long-lived conversation state (shared across turns); the run store and
+        # answer cache may be shared with other runners (e.g. batch evaluation)
+        self.conv_state = ConversationState(run_store=run_store if run_store is not None else RunStore())
 
-        # Conversation-level graph wrapper
-        if conversation_graph is None:
-            convo = ConversationGraph()
-            self._graph = convo.graph
-        else:
-            self._graph = conversation_graph
+        # Near-duplicate question cache, scoped to dataset + AutoML run
+        self.qa_cache = qa_cache if qa_cache is not None else QACache()
 
-    def ask(self, question: str) -> str:
+        # Background jobs by id; the lock guards the cache and session writes across them
+        self.jobs: Dict[str, AutoMLJob] = {}
+        self._lock = threading.RLock()
+
+        # Session persistence; an existing session is resumed lazily
+        self.session_name = session_name
+        # Tags this runner's log records (defaults to the session name)
+        self.session_id = session_id or session_name
+        self.session_store = session_store or SessionStore(SessionConfig.SESSION_DIR)
+        if session_name is not None and self.session_store.exists(session_name):
+            self._restore_session(self.session_store.load(session_name))
+
+        # Conversation-level graph; the shared one is fetched (and LangGraph loaded) on the first question
+        self._graph = conversation_graph
+
+    @classmethod
+    def resume(
+        cls,
+        session_name: str,
+        session_store: Optional[SessionStore] = None,
+    ) -> "ConversationalAutoMLRunner":
+        """Recreate a runner (dataset, settings, conversation) from a saved session."""
+        store = session_store or SessionStore(SessionConfig.SESSION_DIR)
+        if not store.exists(session_name):
+            raise ValueError(f"No saved session named '{session_name}' in {store.root}.")
+        # One read of the session's meta.json for both the settings and the conversation
+        loaded = store.load(session_name)
+        extra = loaded["extra"]
+        runner = cls(
+            csv_path=extra["csv_path"],
+            max_iterations=extra["max_iterations"],
+            temp_dir=extra["temp_dir"],
+            session_store=store,
+            session_id=session_name,
+        )
+        runner.session_name = session_name
+        runner._restore_session(loaded)
+        return runner
+
+    def _restore_session(self, loaded: Dict[str, Any]):
+        """Adopt a loaded session's conversation state and cached answers."""
+        self.conv_state = loaded["conv_state"]
+        for scope, q, a in loaded["extra"].get("qa_cache", []):
+            self.qa_cache.add(tuple(scope), q, a, dataset_columns(self.csv_path))
+
+    def save_session(self, session_name: Optional[str] = None):
+        """Persist the conversation; large run members are written once per run."""
+        if session_name is not None:
+            self.session_name = session_name
+        if self.session_name is None:
+            raise ValueError("save_session needs a session name.")
+
+        with self._lock:
+            self.session_store.save(
+                self.session_name,
+                self.conv_state,
+                extra={
+                    "csv_path": self.csv_path,
+                    "max_iterations": self.max_iterations,
+                    "temp_dir": self.temp_dir,
+                    "qa_cache": self.qa_cache.entries(),
+                },
+            )
+
+    def _cache_scope(self):
+        state = self.conv_state.last_automl_state
+        key = self.conv_state.run_store.key_of(state) if state is not None else None
+        return (dataset_fingerprint(self.csv_path), key.run_id if key else None)
+
+    def ask(
+        self,
+        question: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> str:
         """
         Process a single conversational turn.
 
+        - Returns a cached answer if a near-identical question was already answered
+          for the same dataset and run.
         - Uses the existing conv_state (previous Q&A + AutoML results).
         - Decides reuse vs new run.
         - Returns the answer string and updates internal conv_state.
+
+        If a new run is needed, `on_event` receives its per-node progress events and
+        `cancel_event` can stop it (raising RunCancelled).
         """
+        with log_context(session_id=self.session_id):
+            return self._ask(question, on_event, cancel_event)
+
+    def _ask(
+        self,
+        question: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]],
+        cancel_event: Optional[threading.Event],
+    ) -> str:
+        logger = Logger()
+        metrics = Metrics()
+
+        if QACacheConfig.QA_CACHE_ENABLED:
+            metrics.incr("qa_cache.lookups")
+            with self._lock:
+                hit = self.qa_cache.lookup(self._cache_scope(), question, dataset_columns(self.csv_path))
+            if hit is not None:
+                answer, similarity = hit
+                metrics.incr("qa_cache.hits")
+                logger.box_md(
+                    f"RESPONSE TO USER (CACHED, similarity={similarity:.2f})",
+                    answer,
+                    style="green",
+                )
+                self.conv_state.qa_history.append({"question": question, "answer": answer})
+                if self.session_name is not None:
+                    self.save_session()
+                return answer
+
         inputs: ConversationGraphState = {
             "conv_state": self.conv_state,
             "question": question,
@@ -110,11 +379,51 @@ class ConversationalAutoMLRunner:
             "temp_dir": self.temp_dir,
             "decision": None,
             "answer": None,
+            "run_executor": self.run_executor,
+            "on_event": on_event,
+            "cancel_event": cancel_event,
         }
 
-        out = self._graph.invoke(inputs)
+        if self._graph is None:
+            self._graph = get_graph("conversation").graph
+
+        with trace("turn", question=question, csv_path=self.csv_path):
+            out = self._graph.invoke(inputs)
 
         # Update internal conversation state & return answer
         self.conv_state = out["conv_state"]
         answer = out["answer"]
+
+        # Cache under the run that answered; refusals are not worth caching
+        decision = out.get("decision") or {}
+        if QACacheConfig.QA_CACHE_ENABLED and (decision.get("reuse") or decision.get("need_new_run", True)):
+            with self._lock:
+                self.qa_cache.add(self._cache_scope(), question, answer, dataset_columns(self.csv_path))
+
+        if self.session_name is not None:
+            self.save_session()
+
         return answer
+
+    def ask_async(
+        self,
+        question: str,
+        executor: Optional[Executor] = None,
+        on_finish: Optional[Callable[[AutoMLJob], None]] = None,
+    ) -> AutoMLJob:
+        """
+        Answer a question in the background and return its job handle immediately.
+
+        Progress events from a new AutoML run are published on the job as each graph
+        node finishes; job.cancel() stops the run at the next node. Other questions can
+        be asked (and answered from stored runs) while the job is running. `on_finish`
+        is called with the job once it is done, cancelled or failed.
+        """
+        job = AutoMLJob(question)
+        self.jobs[job.job_id] = job
+        return start_job(
+            job,
+            lambda j: self.ask(j.question, on_event=j.publish, cancel_event=j.cancel_event),
+            executor=executor,
+            on_finish=on_finish,
+        )
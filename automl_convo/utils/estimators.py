@@ -0,0 +1,35 @@
+"""
+This file defines estimator wrappers for models that cannot take the cleaning
+pipeline's output as is. The one-hot encoder can produce a sparse matrix, which
+HistGradientBoosting rejects, so these variants densify X before fitting and
+predicting. They are only imported through MODEL_REGISTRY, when first built.
+"""
+
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+import scipy.sparse as sp
+
+
+def _dense(X):
+    return X.toarray() if sp.issparse(X) else X
+
+
+class DenseHistGradientBoostingClassifier(HistGradientBoostingClassifier):
+    def fit(self, X, y, sample_weight=None):
+        return super().fit(_dense(X), y, sample_weight=sample_weight)
+
+    def predict(self, X):
+        return super().predict(_dense(X))
+
+    def predict_proba(self, X):
+        return super().predict_proba(_dense(X))
+
+    def decision_function(self, X):
+        return super().decision_function(_dense(X))
+
+
+class DenseHistGradientBoostingRegressor(HistGradientBoostingRegressor):
+    def fit(self, X, y, sample_weight=None):
+        return super().fit(_dense(X), y, sample_weight=sample_weight)
+
+    def predict(self, X):
+        return super().predict(_dense(X))
@@ -0,0 +1,29 @@
+"""
+This file computes content fingerprints of datasets so results can be indexed
+and reused across runs of the same data.
+"""
+
+from typing import Dict, Tuple
+import hashlib
+import os
+
+# (path, size, mtime) -> fingerprint, so unchanged files are hashed once
+_FINGERPRINT_CACHE: Dict[Tuple[str, int, float], str] = {}
+
+
+def dataset_fingerprint(csv_path: str) -> str:
+    """SHA-1 of the dataset file contents, cached on path, size and modification time."""
+    st = os.stat(csv_path)
+    key = (os.path.abspath(csv_path), st.st_size, st.st_mtime)
+    cached = _FINGERPRINT_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    h = hashlib.sha1()
+    with open(csv_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+    fingerprint = h.hexdigest()
+    _FINGERPRINT_CACHE[key] = fingerprint
+    return fingerprint
@@ -0,0 +1,53 @@
+"""
+This file resolves the per-agent generation profiles (thinking effort, max tokens,
+temperature) from config, optionally tuned from a measured latency/quality table.
+"""
+
+from typing import Dict, Any, List, Optional
+from config import GenerationConfig
+import json
+
+_TUNED_PROFILES: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def tune_profiles_from_table(
+    rows: List[Dict[str, Any]],
+    tolerance: float = GenerationConfig.PROFILE_QUALITY_TOLERANCE,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Pick, for each agent in a measured table, the fastest profile whose quality is
+    within `tolerance` of the best measured quality for that agent.
+    """
+    by_agent: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_agent.setdefault(row["agent"], []).append(row)
+
+    tuned = {}
+    for agent, candidates in by_agent.items():
+        best_quality = max(r["quality"] for r in candidates)
+        acceptable = [r for r in candidates if r["quality"] >= best_quality - tolerance]
+        chosen = min(acceptable, key=lambda r: r["latency_s"])
+        tuned[agent] = {
+            "think": chosen.get("think", True),
+            "max_tokens": int(chosen["max_tokens"]),
+            "temperature": chosen.get("temperature"),
+        }
+    return tuned
+
+
+def _load_tuned_profiles() -> Dict[str, Dict[str, Any]]:
+    global _TUNED_PROFILES
+    if _TUNED_PROFILES is None:
+        _TUNED_PROFILES = {}
+        if GenerationConfig.PROFILE_TABLE_PATH:
+            with open(GenerationConfig.PROFILE_TABLE_PATH, "r", encoding="utf-8") as f:
+                _TUNED_PROFILES = tune_profiles_from_table(json.load(f))
+    return _TUNED_PROFILES
+
+
+def get_generation_profile(agent: Optional[str]) -> Dict[str, Any]:
+    """Return the generation profile for an agent, falling back to the default profile."""
+    profile = dict(GenerationConfig.PROFILES["default"])
+    profile.update(GenerationConfig.PROFILES.get(agent, {}))
+    profile.update(_load_tuned_profiles().get(agent, {}))
+    return profile
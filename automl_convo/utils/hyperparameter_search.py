@@ -0,0 +1,229 @@
+"""
+This file defines the budgeted hyperparameter search run by the trainer before each
+model's cross-validation. It is successive halving: a sample of configurations
+(always including the planned parameters) is scored on a small share of the
+resource, and each rung keeps the best 1/ETA of them on ETA times more, until one
+is left. The resource is training rows for fast models and boosting or training
+iterations for the iterative ones. Every configuration is scored on the same CV
+split as the final cross-validation, so rungs are compared on identical folds, and
+a rung's fits can run on a few joblib threads. When the search budget runs out the
+search stops and keeps the best configuration of the last completed rung.
+
+Under a training time budget the trainer runs the search inside its killable
+training worker (utils/training_workers.py), which reports each completed rung, so
+a fit that overruns the budget is stopped rather than waited for.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from config import SearchConfig
+import numpy as np
+import warnings
+import math
+import time
+import os
+
+# Model name -> (parameter grid, resource). The resource is "rows", or
+# ("max_iter", full) for models whose iterations are scaled down instead
+SEARCH_SPACES: Dict[str, Tuple[Dict[str, List[Any]], Union[str, Tuple[str, int]]]] = {
+    "logistic_regression": ({"C": [0.01, 0.1, 1.0, 10.0, 100.0]}, "rows"),
+    "sgd_classifier": ({"alpha": [1e-5, 1e-4, 1e-3, 1e-2], "penalty": ["l2", "l1", "elasticnet"]}, "rows"),
+    "decision_tree_clf": ({"max_depth": [3, 5, 8, 12, None], "min_samples_leaf": [1, 5, 20, 50]}, "rows"),
+    "hist_gradient_boosting_clf": (
+        {"learning_rate": [0.03, 0.1, 0.3], "max_leaf_nodes": [15, 31, 63], "l2_regularization": [0.0, 1.0, 10.0]},
+        ("max_iter", 100),
+    ),
+    "mlp_classifier": (
+        {"hidden_layer_sizes": [(32,), (64,), (128,), (64, 32)], "alpha": [1e-4, 1e-3, 1e-2], "learning_rate_init": [1e-3, 3e-3]},
+        ("max_iter", 200),
+    ),
+    "sgd_regressor": ({"alpha": [1e-5, 1e-4, 1e-3, 1e-2], "penalty": ["l2", "l1", "elasticnet"]}, "rows"),
+    "decision_tree_reg": ({"max_depth": [3, 5, 8, 12, None], "min_samples_leaf": [1, 5, 20, 50]}, "rows"),
+    "hist_gradient_boosting_reg": (
+        {"learning_rate": [0.03, 0.1, 0.3], "max_leaf_nodes": [15, 31, 63], "l2_regularization": [0.0, 1.0, 10.0]},
+        ("max_iter", 100),
+    ),
+    "mlp_regressor": (
+        {"hidden_layer_sizes": [(32,), (64,), (128,), (64, 32)], "alpha": [1e-4, 1e-3, 1e-2], "learning_rate_init": [1e-3, 3e-3]},
+        ("max_iter", 35),
+    ),
+}
+
+_MIN_ITERATIONS = 5
+
+
+def _sample_candidates(params: Dict[str, Any], grid: Dict[str, List[Any]], n: int) -> List[Dict[str, Any]]:
+    """The planned parameters first, then distinct random grid points layered on top of them."""
+    rng = np.random.default_rng(42)
+    candidates, seen = [dict(params)], {repr(sorted(params.items()))}
+    space = math.prod(len(values) for values in grid.values())
+    # The planned point counts towards the grid when it is one of its points
+    on_grid = all(k in params and params[k] in values for k, values in grid.items())
+    while len(candidates) < min(n, space + (0 if on_grid else 1)):
+        point = {**params, **{k: values[rng.integers(len(values))] for k, values in grid.items()}}
+        key = repr(sorted(point.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(point)
+    return candidates
+
+
+def _rungs(n_candidates: int, eta: int) -> List[Tuple[int, float]]:
+    """(configurations, resource fraction) per rung; the winner of the last rung gets the full CV."""
+    n_rungs = max(1, math.ceil(math.log(n_candidates, eta) - 1e-9))
+    rungs, n = [], n_candidates
+    for k in range(n_rungs):
+        rungs.append((n, float(eta) ** (k - n_rungs)))
+        n = max(1, math.ceil(n / eta))
+    return rungs
+
+
+def predicted_search_s(n_candidates: int, eta: int, fold_s: float, n_folds: int, n_jobs: int) -> float:
+    """Search time if fit time is linear in the resource (fold_s is one full-resource fold)."""
+    work = sum(n * fraction for n, fraction in _rungs(n_candidates, eta))
+    return work * fold_s * n_folds / max(1, n_jobs)
+
+
+def _evaluate(index: int, fold: int, name: str, params: Dict[str, Any], X, y, train_idx, test_idx, scoring: str):
+    from sklearn.metrics import get_scorer
+    from utils.llm import build_model
+
+    try:
+        with warnings.catch_warnings():
+            # Fits on a fraction of the iterations are not expected to converge
+            warnings.simplefilter("ignore")
+            model = build_model(name, params)
+            model.fit(X[train_idx], y[train_idx])
+            return index, fold, float(get_scorer(scoring)(model, X[test_idx], y[test_idx]))
+    except Exception:
+        return index, fold, float("nan")
+
+
+def _run_rung(
+    name: str,
+    configs: Dict[int, Dict[str, Any]],
+    X,
+    y,
+    train_folds: List[Any],
+    folds: List[Tuple[Any, Any]],
+    scoring: str,
+    deadline: float,
+    n_jobs: int,
+) -> Dict[int, List[float]]:
+    """Fold scores per configuration; configurations cut off by the deadline have fewer."""
+    from joblib import Parallel, delayed
+
+    tasks = [
+        delayed(_evaluate)(i, k, name, params, X, y, train_folds[k], folds[k][1], scoring)
+        for i, params in configs.items()
+        for k in range(len(folds))
+    ]
+    scores: Dict[int, List[float]] = {i: [] for i in configs}
+    # Threads rather than processes: they stop with the training worker when it is killed
+    results = Parallel(n_jobs=min(n_jobs, len(tasks)), prefer="threads", return_as="generator_unordered")(tasks)
+    for i, _, score in results:
+        scores[i].append(score)
+        if time.monotonic() > deadline:
+            # Abandoning the generator cancels the fits that have not started
+            break
+    return scores
+
+
+def _mean(scores: List[float]) -> float:
+    # A failed fit ranks a configuration last
+    return float(np.mean(scores)) if scores and not np.isnan(scores).any() else -float("inf")
+
+
+def search_n_jobs() -> int:
+    """Threads per search, bounded by the CPUs of this process."""
+    return max(1, min(SearchConfig.HPO_N_JOBS, os.cpu_count() or 1))
+
+
+def search_hyperparameters(
+    name: str,
+    params: Dict[str, Any],
+    X,
+    y,
+    folds: List[Tuple[Any, Any]],
+    scoring: str,
+    budget_s: Optional[float],
+    fold_s: Optional[float] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Successive halving for one model. Returns {"best_params", "trace", ...}, or None when
+    the model has no search space or there is no budget for it. `fold_s` (the planner's
+    estimate of one full fit) shrinks the search to fit the budget. `on_progress` gets the
+    result so far before the first rung and after each completed one.
+    """
+    if name not in SEARCH_SPACES or not budget_s or budget_s <= 0:
+        return None
+
+    grid, resource = SEARCH_SPACES[name]
+    eta = max(2, SearchConfig.HPO_ETA)
+    n_jobs = search_n_jobs()
+    n_candidates = SearchConfig.HPO_CANDIDATES
+    if fold_s is not None:
+        while n_candidates > 1 and predicted_search_s(n_candidates, eta, fold_s, len(folds), n_jobs) > budget_s:
+            n_candidates -= 1
+    candidates = _sample_candidates(params, grid, n_candidates)
+    if len(candidates) < 2:
+        return None
+
+    started = time.monotonic()
+    deadline = started + budget_s
+
+    def result(best: int, stopped_early: bool) -> Dict[str, Any]:
+        return {
+            "best_params": candidates[best],
+            "candidates": len(candidates),
+            "resource": resource if resource == "rows" else resource[0],
+            "budget_s": round(budget_s, 3),
+            "elapsed_s": round(time.monotonic() - started, 3),
+            "stopped_early": stopped_early,
+            "trace": list(trace),
+        }
+
+    # One shuffled order of each training fold, so row subsets are nested across rungs
+    rng = np.random.default_rng(42)
+    train_orders = [rng.permutation(train_idx) for train_idx, _ in folds]
+
+    trace: List[Dict[str, Any]] = []
+    alive = list(range(len(candidates)))
+    best, stopped_early = 0, False
+    if on_progress is not None:
+        on_progress(result(best, stopped_early))
+    for rung, (_, fraction) in enumerate(_rungs(len(candidates), eta)):
+        if resource == "rows":
+            train_folds = [order[: max(min(SearchConfig.HPO_MIN_ROWS, len(order)), math.ceil(fraction * len(order)))] for order in train_orders]
+            configs = {i: candidates[i] for i in alive}
+            resource_used = {"rows": len(train_folds[0])}
+        else:
+            param, full = resource
+            iterations = max(_MIN_ITERATIONS, math.ceil(fraction * min(full, params.get(param, full))))
+            train_folds = train_orders
+            configs = {i: {**candidates[i], param: iterations} for i in alive}
+            resource_used = {param: iterations}
+
+        scores = _run_rung(name, configs, X, y, train_folds, folds, scoring, deadline, n_jobs)
+        for i in alive:
+            trace.append({
+                "rung": rung,
+                **resource_used,
+                "params": candidates[i],
+                "mean_score": _mean(scores[i]) if len(scores[i]) == len(folds) else None,
+                "folds_completed": len(scores[i]),
+            })
+
+        complete = [i for i in alive if len(scores[i]) == len(folds)]
+        if len(complete) < len(alive):
+            # Out of time: trust this rung only if it is the first one with any result
+            stopped_early = True
+            if rung == 0 and complete:
+                best = max(complete, key=lambda i: _mean(scores[i]))
+            break
+        alive = sorted(alive, key=lambda i: _mean(scores[i]), reverse=True)[: max(1, math.ceil(len(alive) / eta))]
+        best = alive[0]
+        if on_progress is not None:
+            on_progress(result(best, stopped_early))
+
+    return result(best, stopped_early)
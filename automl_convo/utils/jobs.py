@@ -0,0 +1,167 @@
+"""
+This file defines background AutoML jobs: a handle returned immediately by
+ConversationalAutoMLRunner.ask_async, the per-node progress events streamed
+from AutoMLGraph while the run executes, and cooperative cancellation between
+graph nodes.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from concurrent.futures import Executor
+from states.auto_ml_state import AutoMLState
+import threading
+import time
+import uuid
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+
+FINISHED_STATUSES = (JOB_DONE, JOB_CANCELLED, JOB_FAILED)
+
+
+class RunCancelled(Exception):
+    """Raised between graph nodes once a job's cancel event is set."""
+
+
+def _best_model(state: AutoMLState) -> Optional[Dict[str, Any]]:
+    if not state.model_results:
+        return None
+    name, res = max(state.model_results.items(), key=lambda kv: kv[1]["mean_score"])
+    return {"model": name, "metric": res["metric"], "mean_score": res["mean_score"]}
+
+
+def progress_event(node: str, state: AutoMLState) -> Dict[str, Any]:
+    """Summarize the state right after `node` finished as a small JSON-compatible event."""
+    event: Dict[str, Any] = {"node": node, "iteration": state.iteration, "time": time.time()}
+
+    if node == "profile":
+        event.update(n_rows=state.n_rows, n_cols=state.n_cols)
+    elif node == "orchestrate":
+        event.update(target_column=state.target_column, task_type=state.task_type, use_pca=state.use_pca)
+    elif node == "feature_engineer":
+        plan = state.feature_engineer_plan or {}
+        event.update(apply=plan.get("apply", False), n_transformations=len(plan.get("transformations", [])))
+    elif node == "train":
+        event.update(
+            scores={
+                name: {"mean": res["mean_score"], "std": res["std"], "metric": res["metric"]}
+                for name, res in (state.model_results or {}).items()
+            },
+            best=_best_model(state),
+        )
+    elif node == "feature_critic":
+        plan = state.feature_critic_plan or {}
+        event.update(apply=plan.get("apply", False), rationale=plan.get("rationale", ""))
+    elif node == "analysis":
+        event.update(final_answer=state.final_answer)
+
+    return event
+
+
+class AutoMLJob:
+    """
+    Handle for a question answered in the background.
+
+    - status moves queued -> running -> done | cancelled | failed
+    - events() / stream() expose the progress events recorded so far
+    - cancel() stops the run at the next node boundary
+    """
+
+    def __init__(self, question: str):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.question = question
+        self.status = JOB_QUEUED
+        self.answer: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.cancel_event = threading.Event()
+
+        self._events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def publish(self, event: Dict[str, Any]):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def events(self, since: int = 0) -> List[Dict[str, Any]]:
+        with self._cond:
+            return list(self._events[since:])
+
+    def stream(self, timeout_s: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield events as they arrive until the job finishes."""
+        seen = 0
+        while True:
+            with self._cond:
+                if seen >= len(self._events) and not self.done:
+                    self._cond.wait(timeout_s)
+                new, finished = self._events[seen:], self.done
+            seen += len(new)
+            yield from new
+            if finished:
+                return
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def result(self, timeout_s: Optional[float] = None) -> Optional[str]:
+        """Block until the job finishes and return its answer (None if cancelled or failed)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.done, timeout_s)
+        return self.answer
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "question": self.question,
+            "status": self.status,
+            "answer": self.answer,
+            "error": self.error,
+            "n_events": len(self.events()),
+        }
+
+    def _finish(self, status: str, answer: Optional[str] = None, error: Optional[str] = None):
+        with self._cond:
+            self.status, self.answer, self.error = status, answer, error
+            self._events.append({"node": "job", "status": status, "time": time.time()})
+            self._cond.notify_all()
+
+
+def start_job(
+    job: AutoMLJob,
+    target: Callable[[AutoMLJob], str],
+    executor: Optional[Executor] = None,
+    on_finish: Optional[Callable[[AutoMLJob], None]] = None,
+) -> AutoMLJob:
+    """
+    Run target(job) in the background (on `executor`, or a daemon thread) and record its
+    outcome. `on_finish(job)` is called from the worker thread once the job has finished.
+    """
+
+    def run():
+        try:
+            if job.cancel_event.is_set():
+                job._finish(JOB_CANCELLED)
+                return
+            job.status = JOB_RUNNING
+            try:
+                job._finish(JOB_DONE, answer=target(job))
+            except RunCancelled:
+                job._finish(JOB_CANCELLED)
+            except Exception as e:
+                job._finish(JOB_FAILED, error=f"{type(e).__name__}: {e}")
+        finally:
+            if on_finish is not None:
+                on_finish(job)
+
+    if executor is not None:
+        executor.submit(run)
+    else:
+        threading.Thread(target=run, name=f"automl-job-{job.job_id}", daemon=True).start()
+    return job
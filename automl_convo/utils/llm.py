@@ -2,12 +2,28 @@
 This file defines various utilities from the LLM.
 """
 
-from sklearn.neural_network import MLPClassifier, MLPRegressor
-from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-from sklearn.linear_model import LogisticRegression, LinearRegression
 from states.auto_ml_state import AutoMLState
-from typing import Dict, Any, List
+from states.run_store import RunStore, RunKey
+from typing import Dict, Any, List, Optional
 import numpy as np
+import importlib
+
+# Model name -> (module, estimator class); classes are imported on first use so
+# scikit-learn's model families are not loaded at startup
+MODEL_REGISTRY = {
+    # Classification models
+    "logistic_regression": ("sklearn.linear_model", "LogisticRegression"),
+    "decision_tree_clf": ("sklearn.tree", "DecisionTreeClassifier"),
+    "mlp_classifier": ("sklearn.neural_network", "MLPClassifier"),
+    "hist_gradient_boosting_clf": ("utils.estimators", "DenseHistGradientBoostingClassifier"),
+    "sgd_classifier": ("sklearn.linear_model", "SGDClassifier"),
+    # Regression models
+    "linear_regression": ("sklearn.linear_model", "LinearRegression"),
+    "decision_tree_reg": ("sklearn.tree", "DecisionTreeRegressor"),
+    "mlp_regressor": ("sklearn.neural_network", "MLPRegressor"),
+    "hist_gradient_boosting_reg": ("utils.estimators", "DenseHistGradientBoostingRegressor"),
+    "sgd_regressor": ("sklearn.linear_model", "SGDRegressor"),
+}
 
 
 def summarize_automl_state_for_llm(state: AutoMLState) -> str:
@@ -46,42 +62,82 @@ def summarize_automl_state_for_llm(state: AutoMLState) -> str:
             f"top_feature_importances_for_best_model = {feats_str}"
         )
 
+        # Models stopped by the training time budget (partial scores are marked above)
+        issues = [
+            f"{name}: {st['status']} after {st['folds_completed']}/{st['folds']} folds"
+            for name, st in (h.get("training_status") or {}).items()
+            if st["status"] != "ok"
+        ]
+        if issues:
+            lines.append(f"  training issues: {', '.join(issues)}")
+
+        # Features removed after this iteration, so later iterations no longer see them
+        pruned = [f"{d['feature']} ({d['reason']})" for d in h.get("pruned_features") or []]
+        if pruned:
+            lines.append(f"  pruned features: {', '.join(pruned)}")
+
     return "\n".join(lines)
 
 
-def build_model(name: str, params: Dict[str, Any]):
-    """
-    Builds the correct model depending on the models chosen.
-    """
-    # Classification models
-    if name == "logistic_regression":
-        return LogisticRegression(**params)
-    if name == "decision_tree_clf":
-        return DecisionTreeClassifier(**params)
-    if name == "mlp_classifier":
-        return MLPClassifier(**params)
+def summarize_screening_for_llm(state: AutoMLState) -> str:
+    """The proposals dropped by feature screening in the latest screened iteration."""
+    if not state.feature_screening_history:
+        return "none"
+    rejected = state.feature_screening_history[-1]["rejected"]
+    return ", ".join(
+        f"{t['name']} -> {', '.join(t['columns'])} (|corr|={t['screening']['signal']:.3f})" for t in rejected
+    ) or "none"
 
-    # Regression models
-    if name == "linear_regression":
-        return LinearRegression(**params)
-    if name == "decision_tree_reg":
-        return DecisionTreeRegressor(**params)
-    if name == "mlp_regressor":
-        return MLPRegressor(**params)
 
-    raise ValueError(f"Unknown model name '{name}'")
+def summarize_run_store_for_llm(run_store: RunStore, keys: List[RunKey]) -> str:
+    """
+    Summarize several stored runs, each labelled with its run id so the
+    conversation orchestrator can pick one to reuse.
+    """
+    blocks = []
+    for key in keys:
+        blocks.append(
+            f"Run id: {key.run_id} (use_pca={key.use_pca})\n"
+            f"{summarize_automl_state_for_llm(run_store.runs[key])}"
+        )
+    return "\n\n".join(blocks)
 
 
-def compute_feature_importances(model, feature_names: List[str]) -> List[Dict[str, Any]]:
+def build_model(name: str, params: Dict[str, Any]):
+    """
+    Builds the correct model depending on the models chosen.
+    """
+    if name not in MODEL_REGISTRY:
+        raise ValueError(f"Unknown model name '{name}'")
+    module, cls = MODEL_REGISTRY[name]
+    return getattr(importlib.import_module(module), cls)(**params)
+
+
+def compute_feature_importances(
+    model,
+    feature_names: List[str],
+    X=None,
+    y=None,
+    column_features: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
     """
     Given a fitted sklearn model and a list of feature names, return
     a list of {feature, importance, importance_norm} sorted by importance.
+    With `column_features` (the feature behind each model input column, see
+    clean_node) a one-hot encoded feature gets the sum over its columns; without
+    it the first len(feature_names) columns are paired with the names.
+    Models without coefficients or feature_importances_ (histogram gradient
+    boosting, MLPs) fall back to permutation importance on a sample of X, y when given.
     """
 
+    from sklearn.linear_model import LinearRegression, LogisticRegression, SGDClassifier, SGDRegressor
+    from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+    groups = _feature_columns(feature_names, column_features)
     importances = None
 
     # Linear models: absolute coefficients
-    if isinstance(model, (LinearRegression, LogisticRegression)):
+    if isinstance(model, (LinearRegression, LogisticRegression, SGDClassifier, SGDRegressor)):
         coefs = model.coef_
         if hasattr(coefs, "ndim") and coefs.ndim > 1:
             coefs = coefs.mean(axis=0)
@@ -91,18 +147,18 @@ def compute_feature_importances(model, feature_names: List[str]) -> List[Dict[st
     elif isinstance(model, (DecisionTreeRegressor, DecisionTreeClassifier)) or hasattr(model, "feature_importances_"):
         importances = getattr(model, "feature_importances_", None)
 
+    elif X is not None and y is not None:
+        importances = _permutation_importances(model, X, y, groups)
+
     if importances is None:
         return []
 
     importances = np.asarray(importances)
-    n = min(len(feature_names), len(importances))
-    pairs = [
-        {
-            "feature": feature_names[i],
-            "importance": float(importances[i]),
-        }
-        for i in range(n)
-    ]
+    pairs = []
+    for name, columns in zip(feature_names, groups):
+        columns = [j for j in columns if j < len(importances)]
+        if columns:
+            pairs.append({"feature": name, "importance": float(importances[columns].sum())})
 
     total = sum(p["importance"] for p in pairs) or 1.0
     for p in pairs:
@@ -110,3 +166,41 @@ def compute_feature_importances(model, feature_names: List[str]) -> List[Dict[st
 
     pairs.sort(key=lambda d: d["importance"], reverse=True)
     return pairs
+
+
+def _feature_columns(feature_names: List[str], column_features: Optional[List[str]]) -> List[List[int]]:
+    """Model input columns of each feature."""
+    if column_features is None:
+        return [[i] for i in range(len(feature_names))]
+    positions: Dict[str, List[int]] = {}
+    for j, name in enumerate(column_features):
+        positions.setdefault(name, []).append(j)
+    return [positions.get(name, []) for name in feature_names]
+
+
+def _permutation_importances(model, X, y, groups: List[List[int]], max_rows: int = 1000, n_repeats: int = 3) -> np.ndarray:
+    """Per input column: the mean drop in model.score when its feature's columns are shuffled together."""
+    import scipy.sparse as sp
+
+    rng = np.random.default_rng(42)
+    rows = rng.permutation(X.shape[0])[:max_rows]
+    X_sample = X[rows]
+    X_sample = X_sample.toarray() if sp.issparse(X_sample) else np.array(X_sample)
+    y_sample = y[rows]
+    baseline = model.score(X_sample, y_sample)
+
+    importances = np.zeros(X_sample.shape[1])
+    for columns in groups:
+        columns = [j for j in columns if j < X_sample.shape[1]]
+        if not columns:
+            continue
+        original = X_sample[:, columns].copy()
+        drops = []
+        for _ in range(n_repeats):
+            X_sample[:, columns] = original[rng.permutation(len(original))]
+            drops.append(baseline - model.score(X_sample, y_sample))
+        X_sample[:, columns] = original
+        # Shuffling an uninformative feature can improve the score slightly; that is no importance.
+        # The drop is credited to the feature's first column so the caller's sum recovers it
+        importances[columns[0]] = max(float(np.mean(drops)), 0.0)
+    return importances
@@ -1,53 +1,199 @@
 """
 This file defines the logger component with Rich logger. Makes the program look nice :D
+
+Every message is also written to the log file, as "[title] content" text or as JSONL
+records tagged with the current run and session ids (see log_context). With
+LoggingConfig.LOG_ASYNC the file writes and console rendering move to a background
+writer thread that flushes in batches, so concurrent runs do not serialize on the
+log file; LOG_QUIET skips console rendering altogether.
 """
 
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config import LoggingConfig
+import threading
+import atexit
+import queue
+import json
+import time
 import os
 
 console = Console()
 
+_LOG_CONTEXT: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**ids: Any) -> Iterator[None]:
+    """Tag records logged inside the block (and its graph nodes) with e.g. run_id, session_id."""
+    token = _LOG_CONTEXT.set({**_LOG_CONTEXT.get(), **{k: v for k, v in ids.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _LOG_CONTEXT.reset(token)
+
+
+def _markdown(text: str):
+    # rich.markdown (and its parser) is only loaded once something renders markdown
+    from rich.markdown import Markdown
+    return Markdown(text)
+
+
+class _LogFile:
+    """Append-only log file with size-based rotation (app.log -> app.log.1 -> ...)."""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.handle = open(path, "a", encoding="utf-8")
+
+    def write(self, lines: List[str]):
+        self.handle.write("".join(line + "\n" for line in lines))
+
+    def flush(self):
+        self.handle.flush()
+        if self.max_bytes > 0 and self.backup_count > 0 and self.handle.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self.handle.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.handle = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        self.handle.close()
+
+
+class _AsyncWriter:
+    """Background thread draining queued (console renderable, log line) pairs in batches."""
+
+    def __init__(self, log_file: _LogFile):
+        self.log_file = log_file
+        self.queue: "queue.Queue[Optional[Tuple[Any, str]]]" = queue.Queue(maxsize=LoggingConfig.LOG_QUEUE_SIZE)
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, renderable: Any, line: str):
+        # A full queue blocks the caller: back-pressure rather than lost records
+        self.queue.put((renderable, line))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self.queue.get(timeout=LoggingConfig.LOG_FLUSH_INTERVAL_S)]
+            except queue.Empty:
+                continue
+            # Take whatever else is already queued, up to one batch
+            try:
+                while len(batch) < LoggingConfig.LOG_BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            try:
+                records = [item for item in batch if item is not None]
+                stopping = len(records) < len(batch)
+                for renderable, _ in records:
+                    if renderable is not None:
+                        console.print(renderable)
+                if records:
+                    self.log_file.write([line for _, line in records])
+                    self.log_file.flush()
+            except Exception as e:
+                # Never let a bad record stop the writer (and block every caller)
+                print(f"[LOGGER] Failed to write {len(batch)} log record(s): {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
 class Logger:
-    _file_handle: Optional[object] = None
+    _file_handle: Optional[_LogFile] = None
     _log_file: Optional[str] = None
+    _writer: Optional[_AsyncWriter] = None
+    _init_lock = threading.Lock()
+    _write_lock = threading.Lock()
 
-    def __init__(self, log_file: str = "logs/app.log"):
-        # Initialize shared file only once
+    def __init__(self, log_file: str = LoggingConfig.LOG_FILE):
+        # Initialize shared file (and writer thread) only once
         if Logger._file_handle is None:
-            Logger._log_file = log_file
+            with Logger._init_lock:
+                if Logger._file_handle is None:
+                    Logger._log_file = log_file
+                    Logger._file_handle = _LogFile(log_file, LoggingConfig.LOG_MAX_BYTES, LoggingConfig.LOG_BACKUP_COUNT)
+                    if LoggingConfig.LOG_ASYNC:
+                        Logger._writer = _AsyncWriter(Logger._file_handle)
+                    atexit.register(Logger.shutdown)
 
-            # Create parent directory if it doesn't exist
-            directory = os.path.dirname(log_file)
-            if directory:
-                os.makedirs(directory, exist_ok=True)
+    @staticmethod
+    def _format(kind: str, title: Optional[str], content: str) -> str:
+        if LoggingConfig.LOG_FORMAT == "jsonl":
+            record = {"ts": time.time(), "kind": kind, "title": title, "message": content, **_LOG_CONTEXT.get()}
+            record["thread"] = threading.current_thread().name
+            return json.dumps(record, default=str)
+        return f"[{title}] {content}" if title is not None else content
 
-            Logger._file_handle = open(log_file, "a", encoding="utf-8")
+    def _emit(self, render: Callable[[], Any], kind: str, title: Optional[str], content: str):
+        # Renderables are built lazily so quiet mode never touches Rich
+        renderable = None if LoggingConfig.LOG_QUIET else render()
+        line = self._format(kind, title, str(content))
 
-    def _write(self, message: str):
+        if Logger._writer is not None:
+            Logger._writer.put(renderable, line)
+            return
+
+        if renderable is not None:
+            console.print(renderable)
         if Logger._file_handle:
-            Logger._file_handle.write(message + "\n")
-            Logger._file_handle.flush()
+            with Logger._write_lock:
+                Logger._file_handle.write([line])
+                Logger._file_handle.flush()
+
+    @classmethod
+    def flush(cls):
+        """Block until every queued record has been written."""
+        if cls._writer is not None:
+            cls._writer.flush()
+
+    @classmethod
+    def shutdown(cls):
+        if cls._writer is not None:
+            cls._writer.close()
+            cls._writer = None
+        if cls._file_handle is not None:
+            cls._file_handle.close()
+            cls._file_handle = None
 
     def box(self, title, content, style="cyan"):
-        console.print(Panel(content, title=f"[bold]{title}[/bold]", style=style))
-        self._write(f"[{title}] {content}")
+        self._emit(lambda: Panel(content, title=f"[bold]{title}[/bold]", style=style), "box", title, content)
 
     def md(self, content):
-        console.print(Markdown(content))
-        self._write(content)
+        self._emit(lambda: _markdown(content), "md", None, content)
 
     def info(self, content, style="white"):
-        console.print(f"[{style}]{content}[/{style}]")
-        self._write(content)
+        self._emit(lambda: f"[{style}]{content}[/{style}]", "info", None, content)
 
     def reasoning(self, content):
-        console.print(Panel(content, title="[gray]LLM reasoning[/gray]", style="dim"))
-        self._write(f"[LLM reasoning] {content}")
+        self._emit(lambda: Panel(content, title="[gray]LLM reasoning[/gray]", style="dim"), "reasoning", "LLM reasoning", content)
 
     def box_md(self, title: str, markdown_text: str, style: str = "cyan"):
-        md = Markdown(markdown_text)
-        console.print(Panel(md, title=f"[bold]{title}[/bold]", style=style))
-        self._write(f"[{title}] {markdown_text}")
+        self._emit(lambda: Panel(_markdown(markdown_text), title=f"[bold]{title}[/bold]", style=style), "box_md", title, markdown_text)
@@ -0,0 +1,188 @@
+"""
+This file defines the memory profiling mode for AutoML runs. After every graph
+node it records the peak traced Python allocation (tracemalloc) since the previous
+node, the process RSS, and the byte size of each heavy AutoMLState field. Records
+are appended to a JSONL file as the run goes (so they survive an OOM kill), and at
+the end of the run a per-node table is logged and fields that keep growing across
+iterations are flagged together with the node where they grew the most.
+
+tracemalloc is process-wide, so only one run per process is profiled at a time:
+a profiler started while another is active is refused (start() returns False)
+instead of resetting the other's peaks or stopping its tracing.
+"""
+
+from typing import Any, Dict, List, Optional
+from states.auto_ml_state import AutoMLState
+from utils.logger import Logger
+from utils.metrics import Metrics
+from config import MemoryConfig
+import numpy as np
+import pandas as pd
+import tracemalloc
+import threading
+import resource
+import pickle
+import json
+import sys
+import os
+
+PROFILED_FIELDS = ("df_raw", "df_current", "X_processed", "y", "history", "clean_pipeline")
+
+_MB = 1024 * 1024
+
+# The profiler currently using tracemalloc in this process
+_ACTIVE: Optional["MemoryProfiler"] = None
+_ACTIVE_LOCK = threading.Lock()
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where the current value is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes on Linux
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def field_nbytes(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) else int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    # Histories and fitted pipelines: serialized size is a good proxy for their footprint
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class MemoryProfiler:
+    """Collects one memory record per completed node of a single AutoML run."""
+
+    def __init__(self, run_id: str, out_dir: str = MemoryConfig.MEMORY_PROFILE_DIR):
+        self.run_id = run_id
+        self.out_dir = out_dir
+        self.records: List[Dict[str, Any]] = []
+        self._started_tracemalloc = False
+        self._jsonl_path = os.path.join(out_dir, f"{run_id}.memory.jsonl")
+
+    def start(self) -> bool:
+        """Begin profiling; False (and nothing started) if another run in this process is profiled."""
+        global _ACTIVE
+        with _ACTIVE_LOCK:
+            if _ACTIVE is not None:
+                return False
+            _ACTIVE = self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        os.makedirs(self.out_dir, exist_ok=True)
+        open(self._jsonl_path, "w").close()
+        return True
+
+    def record(self, node: str, state: AutoMLState):
+        current, peak = tracemalloc.get_traced_memory()
+        # Sized after reading the node's peak and before resetting it, so the pickling
+        # in field_nbytes is charged to neither this node nor the next one
+        fields = {name: field_nbytes(getattr(state, name)) for name in PROFILED_FIELDS}
+        tracemalloc.reset_peak()
+
+        record = {
+            "node": node,
+            "iteration": state.iteration,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": current_rss_bytes(),
+            "fields": fields,
+        }
+        self.records.append(record)
+        Metrics().observe("memory.node_peak_bytes", peak)
+
+        with open(self._jsonl_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def growth_flags(self) -> List[Dict[str, Any]]:
+        """
+        Fields whose size at the end of each iteration increased in every iteration and
+        by more than MEMORY_GROWTH_THRESHOLD overall, with the node that added the most.
+        """
+        end_of_iteration: Dict[int, Dict[str, int]] = {}
+        for r in self.records:
+            if r["iteration"] > 0:
+                end_of_iteration[r["iteration"]] = r["fields"]
+        iterations = sorted(end_of_iteration)
+        if len(iterations) < 2:
+            return []
+
+        flags = []
+        for name in PROFILED_FIELDS:
+            sizes = [end_of_iteration[i][name] for i in iterations]
+            grew_each_time = all(b > a for a, b in zip(sizes, sizes[1:]))
+            if not grew_each_time or sizes[0] == 0:
+                continue
+            growth = sizes[-1] / sizes[0] - 1
+            if growth <= MemoryConfig.MEMORY_GROWTH_THRESHOLD:
+                continue
+
+            # Node that added the most to this field over the whole run
+            deltas: Dict[str, int] = {}
+            for prev, cur in zip(self.records, self.records[1:]):
+                delta = cur["fields"][name] - prev["fields"][name]
+                if delta > 0:
+                    deltas[cur["node"]] = deltas.get(cur["node"], 0) + delta
+            flags.append({
+                "field": name,
+                "sizes_by_iteration": dict(zip(iterations, sizes)),
+                "growth": growth,
+                "responsible_node": max(deltas, key=deltas.get) if deltas else None,
+            })
+        return flags
+
+    def format_table(self) -> str:
+        short = {"df_raw": "raw", "df_current": "cur", "X_processed": "X", "y": "y", "history": "hist", "clean_pipeline": "pipe"}
+        header = f"{'node':<17}{'it':>3}{'peak MB':>9}{'rss MB':>8}" + "".join(f"{short[n]:>6}" for n in PROFILED_FIELDS)
+        lines = [header]
+        for r in self.records:
+            lines.append(
+                f"{r['node'][:16]:<17}{r['iteration']:>3}{r['traced_peak_bytes'] / _MB:>9.1f}{r['rss_bytes'] / _MB:>8.0f}"
+                + "".join(f"{r['fields'][n] / _MB:>6.2f}" for n in PROFILED_FIELDS)
+            )
+        return "\n".join(lines)
+
+    def finish(self, error: Optional[str] = None) -> Dict[str, Any]:
+        """Stop tracing (if this profiler started it), log the table and write the summary JSON."""
+        global _ACTIVE
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        with _ACTIVE_LOCK:
+            if _ACTIVE is self:
+                _ACTIVE = None
+
+        flags = self.growth_flags()
+        summary = {
+            "run_id": self.run_id,
+            "error": error,
+            "max_traced_peak_bytes": max((r["traced_peak_bytes"] for r in self.records), default=0),
+            "max_rss_bytes": max((r["rss_bytes"] for r in self.records), default=0),
+            "growth_flags": flags,
+            "records": self.records,
+        }
+        with open(os.path.join(self.out_dir, f"{self.run_id}.memory.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        flag_lines = [
+            f"[yellow]{f['field']} grew {f['growth']:.0%} over iterations "
+            f"(largest increases in '{f['responsible_node']}')[/yellow]"
+            for f in flags
+        ]
+        Logger().box(
+            f"MEMORY PROFILE ({self.run_id}; field sizes in MB)",
+            self.format_table() + ("\n\n" + "\n".join(flag_lines) if flag_lines else ""),
+            style="grey50",
+        )
+        return summary
@@ -0,0 +1,93 @@
+"""
+This file defines a small process-wide metrics registry (counters and timing
+observations) used to track performance-related behaviour across runs. The
+process-wide registry keeps running count/total/max per series, so a long-running
+service does not accumulate every value; Metrics.scoped() additionally collects everything recorded in the current
+context (thread or task), e.g. to attribute counts to a single question.
+"""
+
+from typing import Dict, List, Any, Iterator, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+
+_SCOPE: ContextVar[Optional[Dict[str, Any]]] = ContextVar("metrics_scope", default=None)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile (pct in [0, 100]); NaN for no values."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Metrics:
+    _counters: Dict[str, float] = {}
+    # Series name -> {"count", "total", "max"}
+    _observations: Dict[str, Dict[str, float]] = {}
+    _lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1):
+        with Metrics._lock:
+            Metrics._counters[name] = Metrics._counters.get(name, 0) + value
+        scope = _SCOPE.get()
+        if scope is not None:
+            scope["counters"][name] = scope["counters"].get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with Metrics._lock:
+            series = Metrics._observations.get(name)
+            if series is None:
+                Metrics._observations[name] = {"count": 1, "total": value, "max": value}
+            else:
+                series["count"] += 1
+                series["total"] += value
+                series["max"] = max(series["max"], value)
+        scope = _SCOPE.get()
+        if scope is not None:
+            scope["observations"].setdefault(name, []).append(value)
+
+    @contextmanager
+    def scoped(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield {"counters": {...}, "observations": {...}} that receives every metric
+        recorded in this context until the block exits (global totals are unaffected).
+        """
+        scope: Dict[str, Any] = {"counters": {}, "observations": {}}
+        token = _SCOPE.set(scope)
+        try:
+            yield scope
+        finally:
+            _SCOPE.reset(token)
+
+    def count(self, name: str) -> float:
+        with Metrics._lock:
+            return Metrics._counters.get(name, 0)
+
+    def rate(self, numerator: str, denominator: str) -> float:
+        """Ratio of two counters, 0.0 when the denominator has not been recorded."""
+        with Metrics._lock:
+            total = Metrics._counters.get(denominator, 0)
+            return Metrics._counters.get(numerator, 0) / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus count/mean/max/total for each observed series."""
+        with Metrics._lock:
+            observations = {
+                name: {
+                    "count": series["count"],
+                    "mean": series["total"] / series["count"],
+                    "max": series["max"],
+                    "total": series["total"],
+                }
+                for name, series in Metrics._observations.items()
+            }
+            return {"counters": dict(Metrics._counters), "observations": observations}
+
+    def reset(self):
+        with Metrics._lock:
+            Metrics._counters.clear()
+            Metrics._observations.clear()
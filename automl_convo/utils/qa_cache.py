@@ -0,0 +1,117 @@
+"""
+This file defines a lightweight lexical answer cache for near-duplicate questions.
+Questions are indexed as TF-IDF weighted character n-gram vectors, scoped to the
+dataset and AutoML run they were answered from, so a reworded repeat question can
+be answered without any LLM call. Similar wording is not enough on its own: a hit
+also needs the same mentioned columns, numbers and negations ("top 3 features" is
+not "top features", "without Age" is not "with Age").
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Hashable
+from collections import OrderedDict, Counter
+from config import QACacheConfig
+from utils.router import mentioned_columns
+import threading
+import math
+import re
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_NEGATION = re.compile(r"\b(?:not|no|without|never|except|excluding|exclude|nor|none)\b|n't")
+
+
+def _char_ngrams(text: str, n_min: int = 3, n_max: int = 5) -> Counter:
+    text = " " + re.sub(r"[^a-z0-9]+", " ", text.lower()).strip() + " "
+    grams = Counter()
+    for n in range(n_min, n_max + 1):
+        for i in range(len(text) - n + 1):
+            grams[text[i:i + n]] += 1
+    return grams
+
+
+def key_terms(question: str, columns: Sequence[str] = ()) -> FrozenSet[str]:
+    """Terms two questions must share to be answered alike: mentioned columns, numbers and negations."""
+    question_lc = question.lower()
+    terms = {f"col:{c}" for c in mentioned_columns(question, list(columns))}
+    terms.update(f"num:{float(n):g}" for n in _NUMBER.findall(question_lc))
+    terms.update(f"neg:{m}" for m in _NEGATION.findall(question_lc))
+    return frozenset(terms)
+
+
+class QACache:
+    """
+    Bounded LRU index of (scope, question) -> answer with cosine similarity lookup.
+    IDF weights come from the questions currently in the index. `columns` (the
+    dataset's columns) lets add and lookup tell which columns a question mentions.
+    Safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        threshold: float = QACacheConfig.QA_CACHE_THRESHOLD,
+        max_entries: int = QACacheConfig.QA_CACHE_MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[Counter, FrozenSet[str], str]]" = OrderedDict()
+        self._doc_freq: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _weights(self, grams: Counter) -> Dict[str, float]:
+        n_docs = len(self._entries) + 1
+        weights = {
+            g: (1 + math.log(tf)) * (math.log(n_docs / (1 + self._doc_freq[g])) + 1)
+            for g, tf in grams.items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {g: w / norm for g, w in weights.items()}
+
+    def add(self, scope: Hashable, question: str, answer: str, columns: Sequence[str] = ()):
+        key = (scope, question.strip().lower())
+        grams = _char_ngrams(question)
+        terms = key_terms(question, columns)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                old_grams, old_terms, _ = self._entries[key]
+                self._entries[key] = (old_grams, old_terms, answer)
+                return
+
+            self._entries[key] = (grams, terms, answer)
+            self._doc_freq.update(grams.keys())
+
+            if len(self._entries) > self.max_entries:
+                _, (old_grams, _, _) = self._entries.popitem(last=False)
+                self._doc_freq.subtract(old_grams.keys())
+
+    def lookup(self, scope: Hashable, question: str, columns: Sequence[str] = ()) -> Optional[Tuple[str, float]]:
+        """
+        Return (answer, similarity) of the most similar cached question in scope with
+        the same key terms, if above threshold.
+        """
+        grams = _char_ngrams(question)
+        terms = key_terms(question, columns)
+        with self._lock:
+            query = self._weights(grams)
+
+            best, best_sim = None, 0.0
+            for key, (doc_grams, doc_terms, answer) in self._entries.items():
+                if key[0] != scope or doc_terms != terms:
+                    continue
+                doc = self._weights(doc_grams)
+                sim = sum(w * doc.get(g, 0.0) for g, w in query.items())
+                if sim > best_sim:
+                    best, best_sim = key, sim
+
+            if best is None or best_sim < self.threshold:
+                return None
+
+            self._entries.move_to_end(best)
+            return self._entries[best][2], best_sim
+
+    def entries(self) -> List[Tuple[Hashable, str, str]]:
+        """(scope, question, answer) for every entry, least recently used first."""
+        with self._lock:
+            return [(scope, question, answer) for (scope, question), (_, _, answer) in self._entries.items()]
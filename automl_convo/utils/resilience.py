@@ -0,0 +1,225 @@
+"""
+This file defines the resilience layer around LLM backends: per-call deadlines,
+bounded retries with jitter, hedged requests to a second backend after a latency
+percentile threshold, and a circuit breaker per backend.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from collections import deque
+from contextlib import nullcontext
+from utils.logger import Logger
+from config import ResilienceConfig
+import threading
+import random
+import time
+
+# Shared worker pool for backend calls, so a hung request never blocks the caller
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=ResilienceConfig.LLM_MAX_WORKERS,
+    thread_name_prefix="llm-call",
+)
+
+
+class LLMCallError(RuntimeError):
+    """Raised when no backend produced a valid response within the retry budget."""
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker. Opens after `failure_threshold` consecutive
+    failures and lets a single trial call through once `reset_s` has elapsed.
+    """
+    _registry: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = ResilienceConfig.BREAKER_FAILURE_THRESHOLD,
+        reset_s: float = ResilienceConfig.BREAKER_RESET_S,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str) -> "CircuitBreaker":
+        with cls._registry_lock:
+            if name not in cls._registry:
+                cls._registry[name] = cls(name)
+            return cls._registry[name]
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "half_open":
+                # Admit one trial call; re-arm the timer so concurrent calls wait
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per backend."""
+    _registry: Dict[str, "LatencyTracker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, window: int = ResilienceConfig.LLM_LATENCY_WINDOW):
+        self.samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str) -> "LatencyTracker":
+        with cls._registry_lock:
+            if name not in cls._registry:
+                cls._registry[name] = cls()
+            return cls._registry[name]
+
+    def record(self, latency_s: float):
+        with self._lock:
+            self.samples.append(latency_s)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self.samples) < ResilienceConfig.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+def _default_validator(content: Any) -> bool:
+    return isinstance(content, str) and bool(content.strip())
+
+
+def call_with_resilience(
+    backends: List[Tuple[str, Callable[[], Any]]],
+    timeout_s: float = ResilienceConfig.LLM_TIMEOUT_S,
+    max_retries: int = ResilienceConfig.LLM_MAX_RETRIES,
+    validator: Callable[[Any], bool] = _default_validator,
+    limiter=None,
+) -> Any:
+    """
+    Call the first backend in `backends` (a list of (name, zero-arg call)) with a
+    deadline. If it has not answered by its hedge threshold (a latency percentile of
+    its past calls), a duplicate request goes to the next backend and the first valid
+    response wins; the losing request is cancelled or abandoned. Backends whose circuit
+    breaker is open are skipped when their turn comes, which gives failover. Whole
+    attempts are retried with exponential backoff and full jitter. `limiter` (a
+    semaphore) is held for each attempt, not across the backoff sleeps.
+    """
+    logger = Logger()
+    last_error: Optional[BaseException] = None
+
+    for attempt in range(max_retries + 1):
+        try:
+            with limiter if limiter is not None else nullcontext():
+                return _hedged_attempt(backends, timeout_s, validator, logger)
+        except Exception as e:
+            last_error = e
+
+        if attempt < max_retries:
+            backoff = random.uniform(0, ResilienceConfig.LLM_RETRY_BACKOFF_S * (2 ** attempt))
+            logger.info(
+                f"[LLM RESILIENCE] Attempt {attempt + 1} failed ({last_error}); retrying in {backoff:.1f}s",
+                style="yellow",
+            )
+            time.sleep(backoff)
+
+    raise LLMCallError(f"LLM call failed after {max_retries + 1} attempts: {last_error}") from last_error
+
+
+def _hedged_attempt(
+    backends: List[Tuple[str, Callable[[], Any]]],
+    timeout_s: float,
+    validator: Callable[[Any], bool],
+    logger: Logger,
+) -> Any:
+    deadline = time.monotonic() + timeout_s
+    pending: Dict[Future, Tuple[str, float]] = {}
+    remaining = list(backends)
+    last_error: Optional[BaseException] = None
+
+    def launch() -> Optional[str]:
+        # The breaker is only consulted for a request that is actually sent, so a
+        # backend that is never reached does not use up its half-open trial
+        while remaining:
+            name, fn = remaining.pop(0)
+            if CircuitBreaker.get(name).allow():
+                pending[_EXECUTOR.submit(fn)] = (name, time.monotonic())
+                return name
+        return None
+
+    if launch() is None:
+        raise LLMCallError("All LLM backends have an open circuit breaker.")
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+
+        # Wait until the next response, the hedge threshold of the newest call, or the deadline
+        wait_s = deadline - now
+        if remaining:
+            newest_name, newest_start = max(pending.values(), key=lambda v: v[1])
+            hedge_after = LatencyTracker.get(newest_name).percentile(ResilienceConfig.LLM_HEDGE_PERCENTILE)
+            if hedge_after is None:
+                hedge_after = ResilienceConfig.LLM_HEDGE_DEFAULT_DELAY_S
+            wait_s = min(wait_s, max(0.0, newest_start + hedge_after - now))
+
+        done, _ = wait(list(pending), timeout=wait_s, return_when=FIRST_COMPLETED)
+
+        for fut in done:
+            name, started = pending.pop(fut)
+            try:
+                content = fut.result()
+            except Exception as e:
+                CircuitBreaker.get(name).record_failure()
+                last_error = e
+                continue
+
+            if validator(content):
+                CircuitBreaker.get(name).record_success()
+                LatencyTracker.get(name).record(time.monotonic() - started)
+                for other in pending:
+                    other.cancel()
+                return content
+
+            CircuitBreaker.get(name).record_failure()
+            last_error = ValueError(f"Invalid response from backend '{name}'.")
+
+        if remaining and (not done or not pending) and time.monotonic() < deadline:
+            action = "Hedging request" if not done else "Failing over"
+            name = launch()
+            if name is not None:
+                logger.info(f"[LLM RESILIENCE] {action} to backend '{name}'", style="yellow")
+
+    for fut, (name, _) in pending.items():
+        fut.cancel()
+        CircuitBreaker.get(name).record_failure()
+
+    if last_error is not None and not pending:
+        raise last_error
+    raise TimeoutError(f"LLM call exceeded deadline of {timeout_s:.1f}s.")
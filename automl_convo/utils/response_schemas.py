@@ -0,0 +1,133 @@
+"""
+This file defines the typed JSON response schemas for every JSON-producing agent,
+plus local parsing and validation. The schemas are passed to the backends'
+structured-output modes where supported and re-checked locally, so malformed
+outputs are repaired with a cheap follow-up request instead of failing the run.
+"""
+
+from typing import Any, Dict, List, Optional
+from utils.feature_transformer import FeatureTransformer
+import json
+import re
+
+TRANSFORMATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "enum": sorted(FeatureTransformer.get_dispatch().keys())},
+        "description": {"type": "string"},
+        "params": {"type": "object"},
+    },
+    "required": ["name", "params"],
+}
+
+FEATURE_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "apply": {"type": "boolean"},
+        "rationale": {"type": "string"},
+        "transformations": {"type": "array", "items": TRANSFORMATION_SCHEMA},
+    },
+    "required": ["apply", "rationale", "transformations"],
+}
+
+ORCHESTRATOR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "target_column": {"type": "string"},
+        "task_type": {"type": "string", "enum": ["classification", "regression"]},
+        "use_pca": {"type": "boolean"},
+        "pca_components": {"type": ["integer", "null"]},
+        "rationale": {"type": "string"},
+    },
+    "required": ["target_column", "task_type", "use_pca", "pca_components", "rationale"],
+}
+
+CONVERSATION_DECISION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reuse": {"type": "boolean"},
+        "reason": {"type": "string"},
+        "need_new_run": {"type": "boolean"},
+        "run_id": {"type": ["string", "null"]},
+    },
+    "required": ["reuse", "reason", "need_new_run"],
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "answer": {"type": "string"},
+    },
+    "required": ["answer"],
+}
+
+RESPONSE_SCHEMAS = {
+    "orchestrator": ORCHESTRATOR_SCHEMA,
+    "feature_engineer": FEATURE_PLAN_SCHEMA,
+    "feature_critic": FEATURE_PLAN_SCHEMA,
+    "conversation_orchestrator": CONVERSATION_DECISION_SCHEMA,
+    "analysis": ANALYSIS_SCHEMA,
+}
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _matches_type(value: Any, json_type: str) -> bool:
+    if json_type == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if json_type == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, _JSON_TYPES[json_type])
+
+
+def validate_json(obj: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """
+    Validate obj against the subset of JSON Schema used above (type, enum, required,
+    properties, items). Returns a list of human-readable errors; empty means valid.
+    """
+    errors = []
+
+    types = schema.get("type")
+    if types is not None:
+        types = types if isinstance(types, list) else [types]
+        if not any(_matches_type(obj, t) for t in types):
+            return [f"{path}: expected {' or '.join(types)}, got {type(obj).__name__}"]
+
+    if "enum" in schema and obj not in schema["enum"]:
+        errors.append(f"{path}: {obj!r} is not one of {schema['enum']}")
+
+    if isinstance(obj, dict):
+        for key in schema.get("required", []):
+            if key not in obj:
+                errors.append(f"{path}: missing required key '{key}'")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in obj:
+                errors.extend(validate_json(obj[key], sub_schema, f"{path}.{key}"))
+
+    if isinstance(obj, list) and "items" in schema:
+        for i, item in enumerate(obj):
+            errors.extend(validate_json(item, schema["items"], f"{path}[{i}]"))
+
+    return errors
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """Parse text as JSON, falling back to the outermost {...} block. None if neither parses."""
+    try:
+        return json.loads(text)
+    except Exception:
+        pass
+
+    m = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not m:
+        return None
+    try:
+        return json.loads(m.group(0))
+    except Exception:
+        return None
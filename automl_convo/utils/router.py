@@ -0,0 +1,178 @@
+"""
+This file defines the deterministic fast-path router that runs ahead of the
+conversation orchestrator LLM. It matches the question against the dataset's
+column names, the targets of stored runs, and a small intent lexicon, and only
+defers to the LLM when it is not confident. A stored run is only reused when the
+PCA and task type settings the question asks for (if any) match its key.
+"""
+
+from typing import Dict, Any, List, Optional
+from states.conversation_state import ConversationState
+from utils.metrics import Metrics
+import pandas as pd
+import re
+
+# Follow-ups answerable from existing results
+REUSE_CUES = [
+    "again", "remind", "recap", "summar", "explain", "elaborate", "clarify", "more detail",
+    "top feature", "most important", "which feature", "what feature", "importance",
+    "how accurate", "accuracy", "score", "performance", "how well", "which model", "best model",
+]
+
+# Questions that ask for modeling (new run unless the target is already modeled)
+MODEL_CUES = [
+    "predict", "forecast", "model", "regress", "classif", "what drives", "what affects",
+    "impact", "influence", "affect", "determin", "depend", "relationship", "factor",
+]
+
+# Explicit requests to retrain even if a matching run exists
+RETRAIN_CUES = ["rerun", "re-run", "retrain", "re-train", "from scratch", "run again", "new run"]
+
+# Run settings a question can ask for; a stored run is only reused when its key matches
+NO_PCA_CUES = ["without pca", "no pca", "without principal component", "without dimensionality reduction"]
+PCA_CUES = ["pca", "principal component", "dimensionality reduction"]
+TASK_CUES = {"classification": ["classif"], "regression": ["regress"]}
+
+_COLUMNS_CACHE: Dict[str, List[str]] = {}
+
+
+def dataset_columns(csv_path: str) -> List[str]:
+    if csv_path not in _COLUMNS_CACHE:
+        _COLUMNS_CACHE[csv_path] = [str(c) for c in pd.read_csv(csv_path, nrows=0).columns]
+    return _COLUMNS_CACHE[csv_path]
+
+
+def _words(text: str) -> List[str]:
+    # Split camelCase and separators: "GradeClass" / "grade_class" -> ["grade", "class"]
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _stem_match(a: str, b: str) -> bool:
+    """Loose word match: equal, or sharing all but the last two of at least 5 characters ("survived"/"survival")."""
+    if a == b:
+        return True
+    n = min(len(a), len(b))
+    return n >= 5 and a.isalpha() and b.isalpha() and a[: n - 2] == b[: n - 2]
+
+
+def mentioned_columns(question: str, columns: List[str]) -> List[str]:
+    """Columns named in the question: multi-word names by their joined form, single words by stem."""
+    q_words = _words(question)
+    q_joined = "".join(q_words)
+
+    found = []
+    for col in columns:
+        parts = _words(col)
+        if not parts:
+            continue
+        if len(parts) > 1:
+            if "".join(parts) in q_joined:
+                found.append(col)
+        elif any(_stem_match(parts[0], w) for w in q_words):
+            found.append(col)
+    return found
+
+
+def _has_cue(question_lc: str, cues: List[str]) -> bool:
+    return any(cue in question_lc for cue in cues)
+
+
+def requested_settings(question_lc: str) -> Dict[str, Any]:
+    """The use_pca and task_type the question asks for (absent when it does not say)."""
+    settings: Dict[str, Any] = {}
+    if _has_cue(question_lc, NO_PCA_CUES):
+        settings["use_pca"] = False
+    elif _has_cue(question_lc, PCA_CUES):
+        settings["use_pca"] = True
+    tasks = [task for task, cues in TASK_CUES.items() if _has_cue(question_lc, cues)]
+    if len(tasks) == 1:
+        settings["task_type"] = tasks[0]
+    return settings
+
+
+def _matches(state, settings: Dict[str, Any]) -> bool:
+    """Whether an AutoMLState was trained with the requested settings."""
+    return all(getattr(state, name) == value for name, value in settings.items())
+
+
+def fast_route(
+    question: str,
+    conv_state: ConversationState,
+    csv_path: str,
+    dataset_fingerprint: str,
+) -> Dict[str, Any]:
+    """
+    Return a routing decision shaped like the LLM orchestrator's, plus a
+    "confidence" in [0, 1]. Callers fall back to the LLM below the threshold.
+    """
+    question_lc = question.lower()
+    columns = dataset_columns(csv_path)
+    mentioned = mentioned_columns(question, columns)
+
+    all_stored = conv_state.run_store.find(dataset_fingerprint)
+    settings = requested_settings(question_lc)
+    # Runs trained with other settings than the question asks for are not reusable
+    stored = conv_state.run_store.find(dataset_fingerprint, **settings)
+    targets = {key.target_column: key for key in stored}
+    mentioned_targets = [c for c in mentioned if c in targets]
+    last_state = conv_state.last_automl_state
+    if all_stored:
+        has_results = bool(stored)
+    else:
+        has_results = last_state is not None and _matches(last_state, settings)
+
+    def decision(reuse: bool, confidence: float, reason: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "reuse": reuse,
+            "need_new_run": not reuse,
+            "reason": f"Fast-path router: {reason}",
+            "run_id": run_id,
+            "confidence": confidence,
+        }
+
+    if _has_cue(question_lc, RETRAIN_CUES):
+        return decision(False, 0.9, "explicit request to retrain.")
+
+    if not has_results:
+        if settings and (all_stored or last_state is not None):
+            return decision(False, 0.9, f"no previous results with the requested settings {settings}.")
+        if mentioned or _has_cue(question_lc, MODEL_CUES):
+            return decision(False, 0.9, "no previous results; question names columns or asks for modeling.")
+        return decision(False, 0.3, "no previous results; intent unclear.")
+
+    if mentioned_targets:
+        # Prefer the most recently stored run among the mentioned targets
+        key = max((targets[c] for c in mentioned_targets), key=stored.index)
+        return decision(True, 0.9, f"'{key.target_column}' was already modeled.", key.run_id)
+
+    other_columns = [c for c in mentioned if c not in targets]
+    if other_columns and _has_cue(question_lc, MODEL_CUES):
+        return decision(False, 0.6, f"asks about un-modeled column(s) {other_columns}.")
+
+    if not mentioned and _has_cue(question_lc, REUSE_CUES):
+        # With requested settings, point at the latest run that has them
+        run_id = stored[-1].run_id if settings and stored else None
+        return decision(True, 0.85, "follow-up about existing results.", run_id)
+
+    return decision(True, 0.2, "no confident match.")
+
+
+def router_report() -> Dict[str, Any]:
+    """
+    Router hit rate and estimated latency saved, where each hit is credited with
+    the mean observed latency of the LLM orchestrator calls it replaced.
+    """
+    metrics = Metrics()
+    snapshot = metrics.snapshot()["observations"]
+    llm_latency = snapshot.get("conversation_orchestrator.latency_s", {}).get("mean")
+    router_latency = snapshot.get("router.latency_s", {}).get("mean", 0.0)
+    hits = metrics.count("router.hits")
+
+    return {
+        "calls": metrics.count("router.calls"),
+        "hits": hits,
+        "hit_rate": metrics.rate("router.hits", "router.calls"),
+        "mean_router_latency_s": router_latency,
+        "estimated_latency_saved_s": hits * (llm_latency - router_latency) if llm_latency is not None else None,
+    }
@@ -1,10 +1,22 @@
 """
 This module contains functions to infer and build a schema from a pandas DataFrame.
 The schema includes data types, unique value counts, and missing value counts for each column.
+
+It also renders token-budgeted schema summaries for the LLM agents, so very wide
+datasets do not inline thousands of columns into every prompt.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from states.auto_ml_state import AutoMLState
+from config import SchemaConfig
 import pandas as pd
+import numpy as np
+import re
+
+# Shared cache of rendered schema summaries, keyed by schema fingerprint
+_SCHEMA_SUMMARY_CACHE: "OrderedDict[Tuple, str]" = OrderedDict()
+
 
 def infer_schema_from_df(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
     schema = {}
@@ -20,3 +32,171 @@ def infer_schema_from_df(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
             "missing": int(series.isna().sum()),
         }
     return schema
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for prompt budgeting."""
+    return len(text) // 4 + 1
+
+
+def format_schema_line(col: str, meta: Dict[str, Any]) -> str:
+    return f"- {col}: type={meta['type']}, unique={meta['unique']}, missing={meta['missing']}"
+
+
+def _target_correlations(state: AutoMLState) -> Dict[str, float]:
+    """
+    Absolute correlation of each numeric column with the target, computed on a
+    row sample. Categorical targets are label-encoded first.
+    """
+    df = state.df_current
+    target = state.target_column
+    if df is None or target is None or target not in df.columns:
+        return {}
+
+    if len(df) > SchemaConfig.SCHEMA_SAMPLE_ROWS:
+        df = df.sample(n=SchemaConfig.SCHEMA_SAMPLE_ROWS, random_state=42)
+
+    y = df[target]
+    if not pd.api.types.is_numeric_dtype(y):
+        y = pd.Series(pd.factorize(y)[0], index=y.index).where(y.notna())
+
+    numeric = df.drop(columns=[target]).select_dtypes(include="number")
+    if numeric.empty:
+        return {}
+
+    corr = numeric.corrwith(y.astype(float)).abs()
+    return {col: float(v) for col, v in corr.items() if np.isfinite(v)}
+
+
+def _latest_importances(state: AutoMLState) -> Dict[str, float]:
+    """Max-normalized feature importances from the most recent training iteration."""
+    if not state.feature_metrics_history:
+        return {}
+    importances = state.feature_metrics_history[-1].get("feature_importances") or []
+    top = max((fi["importance_norm"] for fi in importances), default=0.0) or 1.0
+    return {fi["feature"]: fi["importance_norm"] / top for fi in importances}
+
+
+def rank_schema_columns(state: AutoMLState, question: Optional[str] = None) -> List[Tuple[str, float]]:
+    """
+    Rank schema columns by cheap relevance signals:
+    - mentioned in the user question / chosen as target
+    - absolute correlation with the target
+    - recent normalized importance from feature_metrics_history
+    - fraction of missing values (candidates for missing indicators)
+    """
+    schema = state.schema or {}
+    n_rows = state.n_rows or 1
+    correlations = _target_correlations(state)
+    importances = _latest_importances(state)
+    question_lc = (question or "").lower()
+
+    ranked = []
+    for col, meta in schema.items():
+        if col == state.target_column:
+            score = 100.0
+        else:
+            score = correlations.get(col, 0.0) + importances.get(col, 0.0)
+            score += 0.5 * min(1.0, meta["missing"] / n_rows)
+            if question_lc and str(col).lower() in question_lc:
+                score += 10.0
+        ranked.append((col, score))
+
+    ranked.sort(key=lambda kv: kv[1], reverse=True)
+    return ranked
+
+
+def _column_stem(col: str) -> str:
+    """Collapse digits so related columns like sensor_1 ... sensor_999 group together."""
+    return re.sub(r"\d+", "#", str(col))
+
+
+def _render_elided_groups(
+    elided: List[str],
+    schema: Dict[str, Dict[str, Any]],
+    token_budget: int,
+) -> List[str]:
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for col in elided:
+        groups.setdefault((_column_stem(col), schema[col]["type"]), []).append(col)
+
+    lines = [f"- ... {len(elided)} lower-relevance columns summarized by group:"]
+    used = estimate_tokens(lines[0])
+    ordered = sorted(groups.items(), key=lambda kv: -len(kv[1]))
+    for i, ((stem, col_type), cols) in enumerate(ordered):
+        missing = [schema[c]["missing"] for c in cols]
+        if len(cols) == 1:
+            line = f"  - {format_schema_line(cols[0], schema[cols[0]])[2:]}"
+        else:
+            line = (
+                f"  - {stem} ({len(cols)} cols, e.g. {', '.join(map(str, cols[:3]))}): "
+                f"type={col_type}, missing={min(missing)}-{max(missing)}"
+            )
+        used += estimate_tokens(line)
+        if used > token_budget:
+            rest = sum(len(c) for _, c in ordered[i:])
+            lines.append(f"  - ... {len(ordered) - i} more groups ({rest} columns) omitted")
+            break
+        lines.append(line)
+    return lines
+
+
+def summarize_schema_for_llm(
+    state: AutoMLState,
+    question: Optional[str] = None,
+    token_budget: Optional[int] = None,
+) -> str:
+    """
+    Render state.schema for an LLM prompt within a token budget.
+
+    Small schemas are rendered in full. Wide schemas keep the highest-ranked columns
+    verbatim and collapse the rest into grouped summaries. Renderings are cached and
+    shared by all agents until the schema, target, or importances change.
+    """
+    schema = state.schema or {}
+    if token_budget is None:
+        token_budget = SchemaConfig.SCHEMA_TOKEN_BUDGET
+
+    full_lines = [format_schema_line(col, meta) for col, meta in schema.items()]
+    full = "\n".join(full_lines)
+    if estimate_tokens(full) <= token_budget:
+        return full
+
+    key = (
+        tuple((col, meta["type"], meta["unique"], meta["missing"]) for col, meta in schema.items()),
+        state.n_rows,
+        state.target_column,
+        len(state.feature_metrics_history),
+        question,
+        token_budget,
+    )
+    cached = _SCHEMA_SUMMARY_CACHE.get(key)
+    if cached is not None:
+        _SCHEMA_SUMMARY_CACHE.move_to_end(key)
+        return cached
+
+    ranked = rank_schema_columns(state, question)
+
+    # Keep roughly a quarter of the budget for the grouped summary of the rest
+    kept, used = [], 0
+    for col, _ in ranked:
+        line = format_schema_line(col, schema[col])
+        cost = estimate_tokens(line)
+        if used + cost > token_budget * 0.75:
+            break
+        kept.append(col)
+        used += cost
+
+    kept_set = set(kept)
+    elided = [col for col in schema if col not in kept_set]
+
+    lines = [f"(showing {len(kept)} of {len(schema)} columns, most relevant first)"]
+    lines += [format_schema_line(col, schema[col]) for col in kept]
+    lines += _render_elided_groups(elided, schema, token_budget - used)
+    rendered = "\n".join(lines)
+
+    _SCHEMA_SUMMARY_CACHE[key] = rendered
+    if len(_SCHEMA_SUMMARY_CACHE) > SchemaConfig.SCHEMA_CACHE_SIZE:
+        _SCHEMA_SUMMARY_CACHE.popitem(last=False)
+
+    return rendered
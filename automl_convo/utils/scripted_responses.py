@@ -0,0 +1,174 @@
+"""
+This file defines the rule-based responses used by the scripted LLM backend.
+Each agent's prompt is recognized from its system prompt, and a deterministic,
+well-formed answer is generated from the human prompt so the full AutoML graph
+can run without a live model.
+"""
+
+from typing import Dict, Any, List, Optional
+from utils.router import mentioned_columns
+import json
+import re
+
+# Phrases from each agent's system prompt, checked in order
+AGENT_MARKERS = [
+    ("json_repair", "You repair JSON responses"),
+    ("conversation_orchestrator", "meta-orchestrator"),
+    ("orchestrator", "data scientist orchestrator"),
+    ("feature_engineer", "feature engineering agent"),
+    ("feature_critic", "feature critic agent"),
+    ("model_results_explainer", "previously computed AutoML results"),
+    ("analysis", "experienced data scientist"),
+]
+
+_SCHEMA_LINE = re.compile(r"^\s*-\s+(.+?): type=(numeric|categorical), unique=(\d+), missing=(\d+)", re.MULTILINE)
+
+
+def detect_agent(system_prompt: str) -> str:
+    for agent, marker in AGENT_MARKERS:
+        if marker in system_prompt:
+            return agent
+    return "unknown"
+
+
+def _parse_schema(human_prompt: str) -> List[Dict[str, Any]]:
+    return [
+        {"name": name, "type": col_type, "unique": int(unique), "missing": int(missing)}
+        for name, col_type, unique, missing in _SCHEMA_LINE.findall(human_prompt)
+    ]
+
+
+def _section(human_prompt: str, header: str) -> str:
+    m = re.search(rf"{re.escape(header)}\s*\n(.*?)(?:\n\s*\n|$)", human_prompt, re.DOTALL)
+    return m.group(1).strip() if m else ""
+
+
+def _field(human_prompt: str, name: str) -> Optional[str]:
+    m = re.search(rf"^{re.escape(name)}:\s*(.+)$", human_prompt, re.MULTILINE)
+    return m.group(1).strip() if m else None
+
+
+def _orchestrator(human_prompt: str) -> Dict[str, Any]:
+    question = _section(human_prompt, "User question:").lower()
+    columns = _parse_schema(human_prompt)
+    if not columns:
+        raise ValueError("Scripted orchestrator could not find a schema in the prompt.")
+
+    names = mentioned_columns(question, [c["name"] for c in columns])
+    mentioned = [c for c in columns if c["name"] in names]
+    # Prefer the longest mentioned name so "Survived" beats "Age"
+    target = max(mentioned, key=lambda c: len(c["name"])) if mentioned else columns[-1]
+    is_classification = target["type"] == "categorical" or target["unique"] <= 20
+
+    return {
+        "target_column": target["name"],
+        "task_type": "classification" if is_classification else "regression",
+        "use_pca": False,
+        "pca_components": None,
+        "rationale": f"Scripted: target '{target['name']}' matched from question/schema.",
+    }
+
+
+def _propose_transforms(human_prompt: str, limit: int) -> List[Dict[str, Any]]:
+    target = _field(human_prompt, "Target column")
+    columns = [c for c in _parse_schema(human_prompt) if c["name"] != target]
+    existing = {c["name"] for c in columns}
+    numeric = [c["name"] for c in columns if c["type"] == "numeric"]
+
+    proposals = []
+    for c in columns:
+        new_name = f"{c['name']}_was_missing"
+        if c["missing"] > 0 and new_name not in existing:
+            proposals.append({
+                "name": "add_missing_indicator",
+                "description": f"Missingness indicator for {c['name']}",
+                "params": {"source_column": c["name"], "target_column": new_name},
+            })
+
+    for a, b in zip(numeric, numeric[1:]):
+        new_name = f"{a}_per_{b}"
+        if new_name not in existing:
+            proposals.append({
+                "name": "numeric_ratio",
+                "description": f"Ratio of {a} to {b}",
+                "params": {"numerator": a, "denominator": b, "target_column": new_name},
+            })
+
+    return proposals[:limit]
+
+
+def _feature_engineer(human_prompt: str) -> Dict[str, Any]:
+    transforms = _propose_transforms(human_prompt, limit=3)
+    return {
+        "apply": bool(transforms),
+        "rationale": "Scripted: missingness indicators and pairwise ratios.",
+        "transformations": transforms,
+    }
+
+
+def _feature_critic(human_prompt: str) -> Dict[str, Any]:
+    m = re.search(r"iteration (\d+) out of max (\d+)", human_prompt)
+    has_budget = bool(m) and int(m.group(1)) < int(m.group(2))
+    transforms = _propose_transforms(human_prompt, limit=2) if has_budget else []
+    return {
+        "apply": bool(transforms),
+        "rationale": "Scripted: continue while iterations and new transforms remain.",
+        "transformations": transforms,
+    }
+
+
+def _conversation_orchestrator(human_prompt: str) -> Dict[str, Any]:
+    question = _section(human_prompt, "New user question:").lower()
+    summary = human_prompt.split("Previous AutoML summary:", 1)[-1]
+    has_results = "Target column:" in summary
+
+    # Prefer a stored run whose target is named in the question
+    runs = re.findall(r"Run id: (\S+) .*?\nTarget column: (.+)", summary)
+    run_id = next((rid for rid, target in runs if target.strip().lower() in question), None)
+    return {
+        "reuse": has_results,
+        "reason": "Scripted: reuse when previous results exist.",
+        "need_new_run": not has_results,
+        "run_id": run_id,
+    }
+
+
+def _markdown_answer(human_prompt: str) -> str:
+    target = _field(human_prompt, "Target column") or "the target"
+    task = _field(human_prompt, "Task type") or "unknown"
+    results = re.findall(r"model_results: (.+)", human_prompt)
+    features = re.findall(r"top_feature_importances\w*: (.+)", human_prompt)
+
+    lines = [f"## Results for `{target}` ({task})", ""]
+    if results:
+        lines.append(f"- Final iteration model scores: {results[-1]}")
+    if features and features[-1] != "none":
+        lines.append(f"- Most important features: {features[-1]}")
+    lines.append(f"- Iterations analyzed: {len(results)}")
+    return "\n".join(lines)
+
+
+def _json_repair(human_prompt: str) -> str:
+    # Best effort: return the outermost JSON object from the invalid response
+    invalid = human_prompt.split("Invalid response:", 1)[-1]
+    m = re.search(r"\{.*\}", invalid, re.DOTALL)
+    return m.group(0) if m else "{}"
+
+
+RULES = {
+    "orchestrator": lambda hp: json.dumps(_orchestrator(hp)),
+    "feature_engineer": lambda hp: json.dumps(_feature_engineer(hp)),
+    "feature_critic": lambda hp: json.dumps(_feature_critic(hp)),
+    "conversation_orchestrator": lambda hp: json.dumps(_conversation_orchestrator(hp)),
+    "analysis": lambda hp: json.dumps({"answer": _markdown_answer(hp)}),
+    "model_results_explainer": _markdown_answer,
+    "json_repair": _json_repair,
+}
+
+
+def generate_scripted_response(agent: str, human_prompt: str) -> str:
+    """Build a deterministic response for the given agent from its human prompt."""
+    rule = RULES.get(agent)
+    if rule is None:
+        raise ValueError(f"No scripted rule for agent '{agent}'.")
+    return rule(human_prompt)
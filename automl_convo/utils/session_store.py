@@ -0,0 +1,218 @@
+"""
+This file persists conversation sessions to disk. Scalar and history fields of
+ConversationState / AutoMLState go into a compact JSON metadata file, while large
+members (dataframes, processed arrays, fitted pipelines) are written once per run
+as separate binary blobs that are only read back on first access. Loading a session
+reads meta.json alone; any other field JSON cannot hold is stored as a blob as well.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import fields
+from utils.logger import Logger
+from states.auto_ml_state import AutoMLState
+from states.conversation_state import ConversationState
+from states.run_store import RunStore
+import numpy as np
+import threading
+import pickle
+import shutil
+import json
+import uuid
+import os
+
+# AutoMLState members stored out-of-line as blobs
+LARGE_FIELDS = ("df_raw", "df_current", "X_processed", "y", "clean_pipeline")
+
+META_FILE = "meta.json"
+
+
+class LazyAutoMLState(AutoMLState):
+    """
+    AutoMLState whose blob-stored members are loaded from their files on first access.
+    Assigning such a member directly discards its pending blob.
+    """
+
+    def __getattribute__(self, name):
+        if not name.startswith("_"):
+            pending = object.__getattribute__(self, "__dict__").get("_pending_blobs")
+            if pending and name in pending:
+                with open(pending.pop(name), "rb") as f:
+                    object.__setattr__(self, name, pickle.load(f))
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        pending = self.__dict__.get("_pending_blobs")
+        if pending and name in pending:
+            pending.pop(name)
+        object.__setattr__(self, name, value)
+
+
+def json_default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def atomic_write(path: str, data: bytes):
+    # Unique temp name so concurrent writers of the same path do not collide
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_state_blobs(state: AutoMLState, blob_dir: str, names: List[str]) -> Dict[str, str]:
+    """Pickle each non-empty member `names` of state into blob_dir. Returns field -> file name."""
+    os.makedirs(blob_dir, exist_ok=True)
+    blobs = {}
+    for name in names:
+        value = getattr(state, name)
+        if value is None:
+            continue
+        fname = f"{name}.pkl"
+        atomic_write(os.path.join(blob_dir, fname), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        blobs[name] = fname
+    return blobs
+
+
+def split_state(state: AutoMLState) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    (metadata, blob fields): the AutoMLState fields that JSON can hold, and the names
+    of those stored as blobs instead, i.e. the large members plus any field that fails
+    JSON encoding (logged, so it can be added to LARGE_FIELDS or made serializable).
+    """
+    meta, blob_names = {}, list(LARGE_FIELDS)
+    for f in fields(AutoMLState):
+        if f.name in LARGE_FIELDS:
+            continue
+        value = getattr(state, f.name)
+        try:
+            json.dumps(value, default=json_default)
+        except (TypeError, ValueError) as e:
+            Logger().info(f"[SESSION STORE] AutoMLState.{f.name} is not JSON serializable ({e}); storing it as a blob.", style="yellow")
+            blob_names.append(f.name)
+            continue
+        meta[f.name] = value
+    return meta, blob_names
+
+
+def restore_lazy_state(meta: Dict[str, Any], blob_dir: str, blobs: Dict[str, str]) -> LazyAutoMLState:
+    """Rebuild a state from metadata, deferring large members to their blob files."""
+    known = {f.name for f in fields(AutoMLState)}
+    state = LazyAutoMLState(**{k: v for k, v in meta.items() if k in known})
+    if state.planned_models:
+        state.planned_models = [tuple(p) for p in state.planned_models]
+    object.__setattr__(
+        state,
+        "_pending_blobs",
+        {name: os.path.join(blob_dir, fname) for name, fname in blobs.items()},
+    )
+    return state
+
+
+class SessionStore:
+    """
+    Saves and loads named sessions under `root`:
+
+        <root>/<session>/meta.json             scalars, histories, Q&A, run index
+        <root>/<session>/runs/<run_uid>/*.pkl  large members of each stored AutoMLState
+
+    Completed runs do not change, so each run's blobs are written only once.
+    """
+
+    def __init__(self, root: str = "sessions"):
+        self.root = root
+        # (session, id(state)) -> (state, run record) for states already written
+        self._saved: Dict[Any, Any] = {}
+
+    def session_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.session_dir(name), META_FILE))
+
+    def list_sessions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if self.exists(d))
+
+    def _run_record(self, state: AutoMLState, session: str) -> Dict[str, Any]:
+        """Write the state's blobs on first save; afterwards reuse the stored run."""
+        saved = self._saved.get((session, id(state)))
+        if saved is not None and saved[0] is state:
+            return saved[1]
+
+        run_uid = uuid.uuid4().hex[:12]
+        meta, blob_names = split_state(state)
+        blobs = write_state_blobs(state, os.path.join(self.session_dir(session), "runs", run_uid), blob_names)
+        record = {"run_uid": run_uid, "blobs": blobs, "state": meta}
+
+        self._saved[(session, id(state))] = (state, record)
+        return record
+
+    def _remove_orphaned_runs(self, session: str, run_uids: set):
+        """Delete blob directories of runs the session no longer references."""
+        runs_dir = os.path.join(self.session_dir(session), "runs")
+        if os.path.isdir(runs_dir):
+            for run_uid in os.listdir(runs_dir):
+                if run_uid not in run_uids:
+                    shutil.rmtree(os.path.join(runs_dir, run_uid), ignore_errors=True)
+        for key in [k for k, (_, record) in self._saved.items() if k[0] == session and record["run_uid"] not in run_uids]:
+            del self._saved[key]
+
+    def save(self, name: str, conv_state: ConversationState, extra: Optional[Dict[str, Any]] = None):
+        """Persist a conversation. `extra` holds runner settings (csv_path, max_iterations, ...)."""
+        os.makedirs(self.session_dir(name), exist_ok=True)
+
+        runs, uid_by_id = [], {}
+        states = list(conv_state.run_store.runs.items())
+        if conv_state.last_automl_state is not None and conv_state.run_store.key_of(conv_state.last_automl_state) is None:
+            states.append((None, conv_state.last_automl_state))
+
+        for key, state in states:
+            record = self._run_record(state, name)
+            uid_by_id[id(state)] = record["run_uid"]
+            runs.append({**record, "dataset_fingerprint": key.dataset_fingerprint if key else None})
+
+        last = conv_state.last_automl_state
+        meta = {
+            "extra": extra or {},
+            "qa_history": conv_state.qa_history,
+            "runs": runs,
+            "last_run_uid": uid_by_id.get(id(last)) if last is not None else None,
+        }
+        atomic_write(
+            os.path.join(self.session_dir(name), META_FILE),
+            json.dumps(meta, default=json_default).encode("utf-8"),
+        )
+        # Runs replaced in the run store (same key, newer run) leave their blobs behind
+        self._remove_orphaned_runs(name, set(uid_by_id.values()))
+
+    def read_extra(self, name: str) -> Dict[str, Any]:
+        """Runner settings saved with the session, without restoring any state."""
+        with open(os.path.join(self.session_dir(name), META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)["extra"]
+
+    def load(self, name: str) -> Dict[str, Any]:
+        """
+        Load a session's metadata and return {"conv_state": ConversationState, "extra": {...}}.
+        Only meta.json is read; large members stay on disk until first accessed.
+        """
+        with open(os.path.join(self.session_dir(name), META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        conv_state = ConversationState(qa_history=meta["qa_history"], run_store=RunStore())
+        by_uid = {}
+        for run in meta["runs"]:
+            blob_dir = os.path.join(self.session_dir(name), "runs", run["run_uid"])
+            blobs = run["blobs"]
+            state = restore_lazy_state(run["state"], blob_dir, blobs)
+            self._saved[(name, id(state))] = (state, {"run_uid": run["run_uid"], "blobs": blobs, "state": run["state"]})
+            by_uid[run["run_uid"]] = state
+            if run["dataset_fingerprint"] is not None:
+                conv_state.run_store.add(run["dataset_fingerprint"], state)
+
+        conv_state.last_automl_state = by_uid.get(meta["last_run_uid"])
+        return {"conv_state": conv_state, "extra": meta["extra"]}
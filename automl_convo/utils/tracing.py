@@ -0,0 +1,247 @@
+"""
+This file defines a lightweight tracing layer. Graph node wrappers and LLM calls
+record spans (wall time, CPU time of the calling thread plus the CPU time training
+workers report for it, iteration, prompt/completion sizes, key outputs)
+into the trace active in the current context. A trace is opened per conversation
+turn or AutoML run (tracing is opt-in and sampled, see TracingConfig) under a
+unique trace id and, when it closes, is exported as Chrome trace JSON
+(chrome://tracing, Perfetto) and as JSONL, with a summary of the slowest nodes.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from utils.logger import Logger
+from utils.jobs import progress_event
+from config import TracingConfig
+import functools
+import threading
+import random
+import json
+import time
+import uuid
+import os
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # "trace", "node" or "llm"
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float  # epoch seconds
+    wall_s: float = 0.0
+    # CPU of the calling thread plus worker_cpu_s, reported by training worker processes
+    cpu_s: float = 0.0
+    worker_cpu_s: float = 0.0
+    pid: int = 0
+    thread: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class _Trace:
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+
+
+_CURRENT_TRACE: ContextVar[Optional[_Trace]] = ContextVar("current_trace", default=None)
+_CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# Running total of CPU seconds other processes spent for this context (one-element list)
+_WORKER_CPU: ContextVar[Optional[List[float]]] = ContextVar("worker_cpu", default=None)
+
+
+def record_worker_cpu(seconds: float):
+    """Charge CPU time spent in another process (e.g. a training worker) to the open spans."""
+    total = _WORKER_CPU.get()
+    if total is not None:
+        total[0] += seconds
+
+
+@contextmanager
+def span(name: str, kind: str = "node", **attributes: Any) -> Iterator[Span]:
+    """
+    Time the enclosed block as a child of the current span. Callers may add to
+    span.attributes inside the block. Outside an active trace nothing is recorded.
+    """
+    trace = _CURRENT_TRACE.get()
+    parent = _CURRENT_SPAN.get()
+    s = Span(
+        name=name,
+        kind=kind,
+        trace_id=trace.trace_id if trace else "",
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        pid=os.getpid(),
+        thread=threading.get_ident(),
+        attributes=dict(attributes),
+    )
+    token = _CURRENT_SPAN.set(s)
+    worker_cpu = _WORKER_CPU.get()
+    worker_token = None
+    if worker_cpu is None:
+        worker_cpu = [0.0]
+        worker_token = _WORKER_CPU.set(worker_cpu)
+    wall_started, cpu_started, worker_started = time.perf_counter(), time.thread_time(), worker_cpu[0]
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.wall_s = time.perf_counter() - wall_started
+        s.worker_cpu_s = worker_cpu[0] - worker_started
+        s.cpu_s = time.thread_time() - cpu_started + s.worker_cpu_s
+        if worker_token is not None:
+            _WORKER_CPU.reset(worker_token)
+        _CURRENT_SPAN.reset(token)
+        if trace is not None:
+            with trace.lock:
+                trace.spans.append(s)
+
+
+@contextmanager
+def trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Open a trace around the block, or a nested span if one is already open. The
+    outermost trace gets a fresh id (so repeated runs never share export files) and
+    is exported and summarized when it closes. Unsampled traces record nothing.
+    """
+    if not TracingConfig.TRACING_ENABLED:
+        yield None
+        return
+
+    if _CURRENT_TRACE.get() is not None:
+        with span(name, kind="trace", **attributes) as s:
+            yield s
+        return
+
+    if random.random() >= TracingConfig.TRACE_SAMPLE_RATE:
+        yield None
+        return
+
+    t = _Trace(uuid.uuid4().hex[:12], name)
+    token = _CURRENT_TRACE.set(t)
+    try:
+        with span(name, kind="trace", **attributes) as s:
+            yield s
+    finally:
+        _CURRENT_TRACE.reset(token)
+        finish_trace(t)
+
+
+def traced_node(name: str):
+    """
+    Decorator for graph node wrappers: records a "node" span with the iteration
+    number it started in and the node's key outputs.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(gs):
+            state = gs.get("state")
+            with span(name, kind="node") as s:
+                if state is not None:
+                    s.attributes["iteration_in"] = state.iteration
+                out = fn(gs)
+                s.attributes.update(_node_outputs(name, out))
+            return out
+        return wrapper
+    return decorator
+
+
+def _node_outputs(name: str, gs: Dict[str, Any]) -> Dict[str, Any]:
+    state = gs.get("state")
+    if state is not None:
+        event = progress_event(name, state)
+        return {k: v for k, v in event.items() if k not in ("node", "time", "final_answer")}
+
+    decision = gs.get("decision") or {}
+    outputs = {k: decision[k] for k in ("reuse", "need_new_run", "run_id", "confidence") if k in decision}
+    if gs.get("answer") is not None:
+        outputs["answer_chars"] = len(gs["answer"])
+    return outputs
+
+
+def slowest_nodes(spans: List[Span], top_n: int = TracingConfig.TRACE_SUMMARY_TOP_N) -> List[Dict[str, Any]]:
+    """Aggregate node and LLM spans by name, slowest total wall time first."""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for s in spans:
+        if s.kind == "trace":
+            continue
+        label = f"llm:{s.attributes.get('agent') or s.name}" if s.kind == "llm" else s.name
+        row = rows.setdefault(label, {"name": label, "count": 0, "wall_s": 0.0, "cpu_s": 0.0, "max_s": 0.0})
+        row["count"] += 1
+        row["wall_s"] += s.wall_s
+        row["cpu_s"] += s.cpu_s
+        row["max_s"] = max(row["max_s"], s.wall_s)
+
+    total = sum(s.wall_s for s in spans if s.kind == "trace" and s.parent_id is None) or 1.0
+    ordered = sorted(rows.values(), key=lambda r: r["wall_s"], reverse=True)[:top_n]
+    for row in ordered:
+        row["share"] = row["wall_s"] / total
+    return ordered
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'span':<28}{'count':>6}{'wall s':>9}{'cpu s':>9}{'max s':>9}{'share':>8}"]
+    for r in rows:
+        lines.append(
+            f"{r['name'][:27]:<28}{r['count']:>6}{r['wall_s']:>9.3f}{r['cpu_s']:>9.3f}"
+            f"{r['max_s']:>9.3f}{r['share']:>8.1%}"
+        )
+    return "\n".join(lines)
+
+
+def export_chrome_trace(spans: List[Span], path: str):
+    """Write spans as Chrome trace "complete" events (microseconds)."""
+    events = [
+        {
+            "name": s.name,
+            "cat": s.kind,
+            "ph": "X",
+            "ts": s.start * 1e6,
+            "dur": s.wall_s * 1e6,
+            "pid": s.pid,
+            "tid": s.thread,
+            "args": {**s.attributes, "cpu_s": s.cpu_s, "worker_cpu_s": s.worker_cpu_s, "error": s.error},
+        }
+        for s in spans
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+
+def export_jsonl(spans: List[Span], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for s in sorted(spans, key=lambda s: s.start):
+            f.write(json.dumps(asdict(s), default=str) + "\n")
+
+
+def finish_trace(t: _Trace):
+    """Export a closed trace to TracingConfig.TRACE_DIR and log its slowest spans."""
+    with t.lock:
+        spans = list(t.spans)
+    if not spans:
+        return
+
+    os.makedirs(TracingConfig.TRACE_DIR, exist_ok=True)
+    base = os.path.join(TracingConfig.TRACE_DIR, f"{t.name}-{t.trace_id}")
+    formats = {fmt.strip() for fmt in TracingConfig.TRACE_EXPORT.split(",")}
+    if "chrome" in formats:
+        export_chrome_trace(spans, f"{base}.trace.json")
+    if "jsonl" in formats:
+        export_jsonl(spans, f"{base}.spans.jsonl")
+
+    if TracingConfig.TRACE_SUMMARY:
+        root = next((s for s in spans if s.parent_id is None), spans[-1])
+        Logger().box(
+            f"TRACE SUMMARY ({t.name}, {root.wall_s:.2f}s)",
+            format_summary(slowest_nodes(spans)) + f"\n\nExported: {base}.*",
+            style="grey50",
+        )
@@ -0,0 +1,369 @@
+"""
+This file defines the cancellable training workers used to enforce time budgets.
+scikit-learn fits cannot be interrupted inside a thread, so cross-validation runs
+fold by fold in a spawned worker process that reports each finished fold; when a
+model runs past its deadline the worker is killed and the model is reported as
+timed out with the folds it completed. A model's hyperparameter search runs in the
+same worker under the same deadline, reporting each completed rung. Healthy workers are kept for reuse, so the
+spawn and import cost is paid once per process rather than once per model.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from config import TrainingConfig
+import multiprocessing
+import threading
+import time
+
+MODEL_OK = "ok"
+MODEL_TIMED_OUT = "timed_out"
+MODEL_FAILED = "failed"
+MODEL_SKIPPED = "skipped"
+
+_IDLE_WORKERS: List["TrainingWorker"] = []
+_IDLE_LOCK = threading.Lock()
+
+
+def _worker_main(conn):
+    """Worker loop: ("data", X, y) holds the data until "drop"; ("search", ...), ("cv", ...) and ("fit", ...) train on it."""
+    from sklearn.metrics import get_scorer
+    from utils.llm import build_model
+    from utils.hyperparameter_search import search_hyperparameters
+
+    conn.send(("started",))
+    X = y = None
+    cpu_reported = time.process_time()
+
+    def send(reply):
+        # Each reply is preceded by the CPU time used since the last one, for tracing
+        nonlocal cpu_reported
+        now = time.process_time()
+        conn.send(("cpu", now - cpu_reported))
+        cpu_reported = now
+        conn.send(reply)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        kind = message[0]
+        if kind == "stop":
+            return
+        if kind == "data":
+            _, X, y = message
+            send(("ready",))
+            continue
+        if kind == "drop":
+            X = y = None
+            continue
+
+        try:
+            if kind == "search":
+                _, name, params, folds, scoring, budget_s, fold_s = message
+                result = search_hyperparameters(
+                    name, params, X, y, folds, scoring, budget_s, fold_s,
+                    on_progress=lambda partial: send(("rung", partial)),
+                )
+                send(("searched", result))
+            elif kind == "cv":
+                _, name, params, folds, scoring = message
+                scorer = get_scorer(scoring)
+                for i, (train_idx, test_idx) in enumerate(folds):
+                    started = time.perf_counter()
+                    model = build_model(name, params)
+                    model.fit(X[train_idx], y[train_idx])
+                    send(("fold", i, float(scorer(model, X[test_idx], y[test_idx])), time.perf_counter() - started))
+                send(("done",))
+            elif kind == "fit":
+                _, name, params = message
+                model = build_model(name, params)
+                model.fit(X, y)
+                send(("fitted", model))
+        except Exception as e:
+            send(("error", f"{type(e).__name__}: {e}"))
+
+
+class TrainingWorker:
+    """One spawned training process and the data it currently holds."""
+
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), name="training-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.started = False
+        self.loaded = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(("stop",))
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+    def wait_started(self):
+        """Block until the worker has imported scikit-learn and is ready for work."""
+        if not self.started:
+            self.conn.recv()
+            self.started = True
+
+    def _recv(self, deadline: Optional[float]) -> Optional[Tuple]:
+        """Next message, or None when the deadline passes first. CPU reports are charged to the open trace spans."""
+        from utils.tracing import record_worker_cpu
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self.conn.poll(timeout):
+                return None
+            message = self.conn.recv()
+            if message[0] != "cpu":
+                return message
+            record_worker_cpu(message[1])
+
+    def load(self, X, y, deadline: Optional[float]) -> bool:
+        """Send the training data; False (and the worker killed) if that misses the deadline."""
+        self.conn.send(("data", X, y))
+        if self._recv(deadline) is None:
+            self.kill()
+            return False
+        self.loaded = True
+        return True
+
+    def drop(self):
+        self.conn.send(("drop",))
+        self.loaded = False
+
+    def cross_validate(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        folds: List[Tuple[Any, Any]],
+        scoring: str,
+        deadline: Optional[float],
+    ) -> Dict[str, Any]:
+        """
+        Score each fold before `deadline`. Returns {"status", "scores", "fold_time_s", "error"},
+        where fold_time_s is the fit plus scoring time of the completed folds;
+        on timeout the worker is killed and must not be reused.
+        """
+        self.conn.send(("cv", name, params, folds, scoring))
+        scores: List[float] = []
+        fold_time = 0.0
+        while True:
+            message = self._recv(deadline)
+            if message is None:
+                self.kill()
+                return {"status": MODEL_TIMED_OUT, "scores": scores, "fold_time_s": fold_time, "error": None}
+            if message[0] == "fold":
+                scores.append(message[2])
+                fold_time += message[3]
+            elif message[0] == "done":
+                return {"status": MODEL_OK, "scores": scores, "fold_time_s": fold_time, "error": None}
+            else:
+                return {"status": MODEL_FAILED, "scores": scores, "fold_time_s": fold_time, "error": message[1]}
+
+    def search(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        folds: List[Tuple[Any, Any]],
+        scoring: str,
+        budget_s: float,
+        fold_s: Optional[float],
+        deadline: Optional[float],
+    ) -> Dict[str, Any]:
+        """
+        Hyperparameter search (see utils/hyperparameter_search.py) stopped at `deadline`.
+        Returns {"status", "search", "error"}; "search" is None when the model has no
+        search space. On timeout the worker is killed and "search" holds the best
+        configuration of the last completed rung.
+        """
+        self.conn.send(("search", name, params, folds, scoring, budget_s, fold_s))
+        started = time.monotonic()
+        partial = None
+        while True:
+            message = self._recv(deadline)
+            if message is None:
+                self.kill()
+                if partial is not None:
+                    partial.update(stopped_early=True, elapsed_s=round(time.monotonic() - started, 3))
+                return {"status": MODEL_TIMED_OUT, "search": partial, "error": None}
+            if message[0] == "rung":
+                partial = message[1]
+            elif message[0] == "searched":
+                return {"status": MODEL_OK, "search": message[1], "error": None}
+            else:
+                return {"status": MODEL_FAILED, "search": None, "error": message[1]}
+
+    def fit(self, name: str, params: Dict[str, Any], deadline: Optional[float]) -> Dict[str, Any]:
+        """
+        Fit on all loaded rows before `deadline`. Returns {"status", "model", "error"};
+        on timeout the worker is killed and must not be reused.
+        """
+        self.conn.send(("fit", name, params))
+        message = self._recv(deadline)
+        if message is None:
+            self.kill()
+            return {"status": MODEL_TIMED_OUT, "model": None, "error": None}
+        if message[0] == "fitted":
+            return {"status": MODEL_OK, "model": message[1], "error": None}
+        return {"status": MODEL_FAILED, "model": None, "error": message[1]}
+
+
+def acquire_worker() -> TrainingWorker:
+    with _IDLE_LOCK:
+        while _IDLE_WORKERS:
+            worker = _IDLE_WORKERS.pop()
+            if worker.alive:
+                return worker
+    return TrainingWorker()
+
+
+def release_worker(worker: TrainingWorker):
+    """Return a healthy worker for reuse (dropping its data); dead or surplus workers are closed."""
+    if not worker.alive:
+        return
+    worker.drop()
+    with _IDLE_LOCK:
+        if len(_IDLE_WORKERS) < TrainingConfig.TRAINING_IDLE_WORKERS:
+            _IDLE_WORKERS.append(worker)
+            return
+    worker.close()
+
+
+def shutdown_workers():
+    with _IDLE_LOCK:
+        workers = list(_IDLE_WORKERS)
+        _IDLE_WORKERS.clear()
+    for worker in workers:
+        worker.close()
+
+
+class BudgetedTrainer:
+    """
+    Searches, cross-validates and fits models in a training worker under a per-model
+    budget and a budget for the whole iteration (seconds; None or 0 means unlimited).
+    The per-model clock starts at begin_model(), so a model's search and its
+    cross-validation share one budget. Use as a context manager so the worker is
+    returned to the pool afterwards.
+    """
+
+    def __init__(self, X, y, model_budget_s: Optional[float], iteration_budget_s: Optional[float]):
+        self.X = X
+        self.y = y
+        self.model_budget_s = model_budget_s or None
+        self.iteration_budget_s = iteration_budget_s or None
+        self.started = time.monotonic()
+        self.model_started: Optional[float] = None
+        self._worker: Optional[TrainingWorker] = None
+
+    def __enter__(self) -> "BudgetedTrainer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def begin_model(self):
+        """Start the per-model budget for the next search, cross-validation or refit."""
+        self.model_started = time.monotonic()
+
+    def deadline(self) -> Optional[float]:
+        deadlines = []
+        if self.model_budget_s is not None:
+            model_started = self.model_started if self.model_started is not None else time.monotonic()
+            deadlines.append(model_started + self.model_budget_s)
+        if self.iteration_budget_s is not None:
+            deadlines.append(self.started + self.iteration_budget_s)
+        return min(deadlines) if deadlines else None
+
+    def remaining_s(self) -> Optional[float]:
+        """Seconds left in the iteration budget (None when unlimited)."""
+        if self.iteration_budget_s is None:
+            return None
+        return self.started + self.iteration_budget_s - time.monotonic()
+
+    def _ready_worker(self) -> TrainingWorker:
+        # A worker killed on timeout is replaced; starting one (spawn and imports)
+        # is not charged to the model or iteration budget
+        if self._worker is None or not self._worker.alive:
+            waited = time.monotonic()
+            self._worker = acquire_worker()
+            self._worker.wait_started()
+            self.started += time.monotonic() - waited
+            if self.model_started is not None:
+                self.model_started += time.monotonic() - waited
+        return self._worker
+
+    def _loaded_worker(self, deadline: Optional[float]) -> Optional[TrainingWorker]:
+        """The worker holding the data, or None if sending it missed the deadline."""
+        if not self._worker.loaded and not self._worker.load(self.X, self.y, deadline):
+            self._worker = None
+        return self._worker
+
+    def search(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        folds: List[Tuple[Any, Any]],
+        scoring: str,
+        budget_s: float,
+        fold_s: Optional[float],
+    ) -> Dict[str, Any]:
+        """
+        Hyperparameter search stopped at `budget_s` or the model's deadline, whichever
+        comes first; returns {"status", "search", "error"} (see TrainingWorker.search).
+        """
+        self._ready_worker()
+        search_deadline = time.monotonic() + budget_s
+        deadline = self.deadline()
+        if deadline is not None:
+            search_deadline = min(search_deadline, deadline)
+        if search_deadline <= time.monotonic():
+            return {"status": MODEL_SKIPPED, "search": None, "error": "model time budget exhausted"}
+        worker = self._loaded_worker(search_deadline)
+        if worker is None:
+            return {"status": MODEL_TIMED_OUT, "search": None, "error": "budget ran out while sending data"}
+        return worker.search(name, params, folds, scoring, budget_s, fold_s, search_deadline)
+
+    def cross_validate(self, name: str, params: Dict[str, Any], folds: List[Tuple[Any, Any]], scoring: str) -> Dict[str, Any]:
+        self._ready_worker()
+        deadline = self.deadline()
+        budget_s = None if deadline is None else deadline - time.monotonic()
+        if budget_s is not None and budget_s <= 0:
+            outcome = {"status": MODEL_SKIPPED, "scores": [], "fold_time_s": 0.0, "error": "iteration time budget exhausted"}
+        else:
+            worker = self._loaded_worker(deadline)
+            if worker is None:
+                outcome = {"status": MODEL_TIMED_OUT, "scores": [], "fold_time_s": 0.0, "error": "budget ran out while sending data"}
+            else:
+                outcome = worker.cross_validate(name, params, folds, scoring, deadline)
+        outcome["budget_s"] = None if budget_s is None else round(max(budget_s, 0.0), 3)
+        return outcome
+
+    def fit(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fit on all rows within the remaining budget; returns {"status", "model", "error"}."""
+        self._ready_worker()
+        deadline = self.deadline()
+        if deadline is not None and deadline <= time.monotonic():
+            return {"status": MODEL_SKIPPED, "model": None, "error": "iteration time budget exhausted"}
+        worker = self._loaded_worker(deadline)
+        if worker is None:
+            return {"status": MODEL_TIMED_OUT, "model": None, "error": "budget ran out while sending data"}
+        return worker.fit(name, params, deadline)
+
+    def close(self):
+        if self._worker is not None:
+            release_worker(self._worker)
+            self._worker = None